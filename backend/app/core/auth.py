@@ -1,52 +1,130 @@
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
+from typing import Optional
+import asyncio
+import hashlib
+import logging
+import time
 import httpx
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.http import get_http_client
 
+logger = logging.getLogger(__name__)
 security = HTTPBearer()
-_jwks_cache = None
 
 
-async def get_jwks():
-    global _jwks_cache
-    if _jwks_cache is None:
-        async with httpx.AsyncClient() as client:
-            r = await client.get(
-                f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+class JWKSCache:
+    """
+    Supabase signing keys, cached in-process.
+
+    - Keys older than `ttl` are still served while a background refresh runs
+      (a cold cache blocks until the first fetch completes).
+    - Concurrent refreshes share one in-flight fetch (single-flight).
+    - A token with an unknown `kid` (key rotation) forces a refetch, at most
+      once per `min_refresh_interval` seconds so bogus kids can't hammer Supabase.
+    """
+
+    def __init__(self, url: str, ttl: float, min_refresh_interval: float):
+        self.url = url
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._jwks: Optional[dict] = None
+        self._fetched_at = 0.0
+        self._last_forced = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+
+    async def _fetch(self) -> dict:
+        r = await get_http_client().get(self.url)
+        r.raise_for_status()
+        jwks = r.json()
+        self._jwks = jwks
+        self._fetched_at = time.monotonic()
+        return jwks
+
+    def _refresh(self) -> asyncio.Task:
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._fetch())
+            # Background refreshes may never be awaited; retrieve their errors
+            self._inflight.add_done_callback(
+                lambda t: t.cancelled() or t.exception()
             )
-            r.raise_for_status()
-            _jwks_cache = r.json()
-    return _jwks_cache
+        return self._inflight
 
+    async def get(self) -> dict:
+        if self._jwks is None:
+            return await asyncio.shield(self._refresh())
+        if time.monotonic() - self._fetched_at >= self.ttl:
+            self._refresh()
+        return self._jwks
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        jwks = await self.get()
+        key = _find_key(jwks, kid)
+        if key is not None:
+            return key
+        if time.monotonic() - self._last_forced >= self.min_refresh_interval:
+            self._last_forced = time.monotonic()
+            refresh = self._refresh()
+        elif self._inflight is not None and not self._inflight.done():
+            # Tokens arriving during a rotation wait for the refetch under way
+            refresh = self._inflight
+        else:
+            return None
+        try:
+            jwks = await asyncio.shield(refresh)
+        except httpx.HTTPError:
+            return None
+        return _find_key(jwks, kid)
+
+
+def _find_key(jwks: dict, kid: Optional[str]) -> Optional[dict]:
+    return next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
+
+
+jwks_cache = JWKSCache(
+    f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json",
+    ttl=settings.JWKS_TTL_SECONDS,
+    min_refresh_interval=settings.JWKS_MIN_REFRESH_SECONDS,
+)
+
+
+async def get_jwks():
+    return await jwks_cache.get()
+
+
+# Verified claims keyed by sha256(token), each entry expiring with the token's
+# `exp`, so a token reused across a screen's requests is ES256-verified once.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=0)
+
+
+def _cache_verified(token_hash: str, payload: dict) -> None:
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(token_hash, payload, ttl=exp - time.time())
+
+
+async def verify_token(token: str) -> dict:
+    """
+    Verify a Supabase access token and return its claims. Raises a 401
+    HTTPException if the token is invalid. Also used by the WebSocket
+    handshake, where the token cannot travel in an Authorization header.
+    """
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    cached = token_cache.get(token_hash)
+    if cached is not None:
+        return dict(cached)
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-):
-    token = credentials.credentials
     try:
         header = jwt.get_unverified_header(token)
-        print(f"[DEBUG] JWT header: {header}")
-
-        jwks = await get_jwks()
-        print(f"[DEBUG] JWKS keys: {[k.get('kid') for k in jwks.get('keys', [])]}")
-        print(f"[DEBUG] Looking for kid: {header.get('kid')}")
+        kid = header.get("kid")
 
-        key = next((k for k in jwks["keys"] if k["kid"] == header.get("kid")), None)
+        key = await jwks_cache.get_key(kid)
         if not key:
-            print(f"[DEBUG] No matching key found for kid: {header.get('kid')}")
+            logger.debug("No matching JWKS key for kid %s", kid)
             raise HTTPException(status_code=401, detail="No matching key found")
 
-        # Validate token is properly signed
-        try:
-            unverified_payload = jwt.decode(
-                token, "", options={"verify_signature": False}
-            )
-            print(f"[DEBUG] JWT aud claim: {unverified_payload.get('aud')}")
-            print(f"[DEBUG] Full JWT payload keys: {list(unverified_payload.keys())}")
-        except Exception as e:
-            print(f"[DEBUG] Error decoding unverified: {e}")
-
         payload = jwt.decode(
             token,
             key,
@@ -59,11 +137,16 @@ async def get_current_user(
 
         # Extract admin role from JWT claims (set during user creation/registration)
         payload["is_admin"] = payload.get("custom_claims", {}).get("is_admin", False)
-        print(f"[DEBUG] Successfully authenticated user: {user_id}")
-        return payload
+        logger.debug("Authenticated user %s", user_id)
+        _cache_verified(token_hash, payload)
+        return dict(payload)
 
     except JWTError as e:
-        print(f"[DEBUG] JWT Error: {e}")
-        print(f"[DEBUG] Error type: {type(e).__name__}")
-        print(f"[DEBUG] Full error: {str(e)}")
+        logger.info("Rejected JWT (%s): %s", type(e).__name__, e)
         raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+):
+    return await verify_token(credentials.credentials)
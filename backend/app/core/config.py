@@ -3,6 +3,15 @@ from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+
+    # Connection pool (see db/session.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+
     SUPABASE_URL: str
     SUPABASE_ANON_KEY: str
     GOOGLE_MAPS_API_KEY: str
@@ -12,11 +21,72 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     PORT: int = 8000
 
+    # Logging (see core/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""  # e.g. "app.core.auth=DEBUG,sqlalchemy.engine=INFO"
+    SQL_ECHO: bool = False
+
+    # Supabase JWKS caching (see core/auth.py)
+    JWKS_TTL_SECONDS: int = 600
+    JWKS_MIN_REFRESH_SECONDS: int = 30  # rate limit for unknown-kid refetches
+    TOKEN_CACHE_SIZE: int = 1024  # verified-token LRU entries; 0 disables
+    PROFILE_CACHE_SIZE: int = 4096  # JWT sub -> profile id entries
+    PROFILE_CACHE_TTL_SECONDS: int = 300
+
+    # Inbox query for GET /messages (see routers/messages.py):
+    #   summary | distinct_on | scan
+    # summary reads the conversations table, which migrate.py backfills
+    INBOX_ENGINE: str = "summary"
+    # How far back ?since= syncs look again. created_at is the sending
+    # transaction's start time, so a message can commit after newer ones were
+    # synced; keep this above DB_STATEMENT_TIMEOUT_MS.
+    MESSAGES_SYNC_OVERLAP_SECONDS: int = 30
+
     # Ads / email settings
     ADMIN_SECRET: str = "change-me-secret"
     ADMIN_EMAIL: str = "admin@example.com"
     RESEND_API_KEY: str = ""
+    RESEND_API_URL: str = "https://api.resend.com"
+    EMAIL_FROM: str = "onboarding@resend.dev"  # Resend's default domain - change after verifying yours
     API_BASE_URL: str = "http://localhost:8000"
+    ADS_CACHE_TTL_SECONDS: int = 60  # approved-ads feed; other workers catch up within this
+
+    # Email outbox worker (see core/outbox.py)
+    OUTBOX_POLL_SECONDS: float = 5
+    OUTBOX_BATCH_SIZE: int = 20
+    OUTBOX_MAX_ATTEMPTS: int = 8  # then the email is marked failed
+    OUTBOX_LEASE_SECONDS: int = 60  # a claimed email is retried if not settled by then
+
+    # Shared outbound HTTP client (see core/http.py)
+    HTTP_HTTP2: bool = True  # needs the h2 package (httpx[http2]); falls back to HTTP/1.1
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    HTTP_TIMEOUT_SECONDS: float = 10
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 5
+
+    # Google Places proxy cache (see routers/maps.py)
+    MAPS_CACHE_SIZE: int = 5000
+    MAPS_CACHE_TTL_SECONDS: int = 86400
+    MAPS_CACHE_PERSIST: bool = False  # also keep responses in the maps_cache table
+    MAPS_NEARBY_PRECISION: int = 2  # decimal places lat/lng are rounded to (~1 km)
+
+    # Nearby-lakes gazetteer (see core/lakes.py)
+    LAKES_DATA_PATH: str = ""  # empty uses the bundled app/data/michigan_lakes.csv
+    LAKES_MAX_DISTANCE_KM: float = 50
+    LAKES_GOOGLE_FALLBACK: bool = True  # also ask Google Places when no bundled lake is close by
+    LAKES_LOCAL_MATCH_KM: float = 1.5  # a bundled point this close answers without Google
+    LAKES_LINK_RADIUS_KM: float = 25  # how far a community may sit from the lake point it is linked to
+
+    # Uploaded image storage (see core/media.py)
+    MEDIA_BACKEND: str = "local"
+    MEDIA_ROOT: str = "media"
+    # Set when MEDIA_ROOT is on persistent storage (the fly.toml volume);
+    # migrate_media.py will not move inline images off the rows until then
+    MEDIA_ROOT_DURABLE: bool = False
+    THUMBNAIL_WORKERS: int = 1  # process pool size; 0 disables renditions
+    THUMBNAIL_SIZE: int = 320
+    MEDIUM_SIZE: int = 1024
 
     class Config:
         env_file = ".env"
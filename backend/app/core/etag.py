@@ -0,0 +1,28 @@
+"""
+core/etag.py
+────────────
+Conditional GET support for routes that set an ETag.
+
+If-None-Match may list several validators ("a", W/"b") or be "*", and
+clients and proxies weaken strong tags they pass on, so the header is
+compared with the weak comparison RFC 9110 prescribes for it rather than as
+one exact string. The ETags this API issues are quoted hex digests, so
+splitting the list on commas is safe.
+"""
+
+from typing import Optional
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if the If-None-Match header value matches `etag` (answer 304)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    target = _opaque_tag(etag)
+    return any(_opaque_tag(tag) == target for tag in if_none_match.split(","))
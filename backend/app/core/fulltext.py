@@ -0,0 +1,36 @@
+"""
+core/fulltext.py
+────────────────
+Helpers for the Postgres full-text search used by routers/search.py.
+
+Searchable tables carry a generated `search_vector` tsvector column with a
+GIN index (see db/models.py and migrate_search.py). User input is turned into
+a prefix tsquery ("lake boa" → 'lake:* & boa:*') so results match while the
+user is still typing, and ranked with ts_rank.
+"""
+
+import re
+from typing import Optional
+
+from sqlalchemy import func
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def prefix_tsquery(config: str, q: str):
+    """
+    Build a prefix-matching tsquery expression from free text, or None if
+    the text contains no searchable terms.
+    """
+    terms = _TERM_RE.findall(q.lower())
+    if not terms:
+        return None
+    return func.to_tsquery(config, " & ".join(f"{t}:*" for t in terms))
+
+
+def match_and_rank(vector_col, config: str, q: str) -> Optional[tuple]:
+    """Return (where clause, rank expression) for `q`, or None if q has no terms."""
+    ts_query = prefix_tsquery(config, q)
+    if ts_query is None:
+        return None
+    return vector_col.op("@@")(ts_query), func.ts_rank(vector_col, ts_query)
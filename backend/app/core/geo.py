@@ -0,0 +1,66 @@
+"""
+core/geo.py
+───────────
+Distance helpers for the lat/lng columns on profiles and communities.
+
+There is no PostGIS, so radius queries are answered in two steps:
+within_radius() first limits rows to a lat/lng bounding box, which Postgres
+serves from the (lat, lng) btree indexes. It then applies the exact
+haversine distance to the few rows left, and distance_km() gives that same
+distance as a SQL expression for ordering.
+"""
+
+import math
+
+from sqlalchemy import and_, func
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def bounding_box(
+    lat: float, lng: float, radius_km: float
+) -> tuple[float, float, float | None, float | None]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) containing every point within
+    radius_km. The lng bounds are None when the box would reach a pole or
+    cross the antimeridian; only the lat range is used to filter then.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    min_lat, max_lat = lat - dlat, lat + dlat
+    if max_lat >= 90 or min_lat <= -90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), None, None
+    # Widest point of the box is at the latitude nearest a pole
+    dlng = dlat / math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if lng - dlng < -180 or lng + dlng > 180:
+        return min_lat, max_lat, None, None
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+def distance_km(lat_col, lng_col, lat: float, lng: float):
+    """SQL haversine distance in km from (lat, lng) to the row's point."""
+    a = func.power(func.sin(func.radians(lat_col - lat) / 2), 2) + func.cos(
+        math.radians(lat)
+    ) * func.cos(func.radians(lat_col)) * func.power(
+        func.sin(func.radians(lng_col - lng) / 2), 2
+    )
+    # least() guards asin() against rounding just above 1
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(1.0, func.sqrt(a)))
+
+
+def within_radius(lat_col, lng_col, lat: float, lng: float, radius_km: float):
+    """Condition matching rows within radius_km; rows without a location never match."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    conditions = [lat_col.between(min_lat, max_lat)]
+    if min_lng is not None:
+        conditions.append(lng_col.between(min_lng, max_lng))
+    conditions.append(distance_km(lat_col, lng_col, lat, lng) <= radius_km)
+    return and_(*conditions)
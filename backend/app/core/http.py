@@ -0,0 +1,148 @@
+"""
+core/http.py
+────────────
+One shared httpx.AsyncClient for every outbound call (Google Maps, Supabase
+auth admin and JWKS, Resend).
+
+Reusing the client keeps connections alive between requests, so calls skip
+the TCP + TLS handshake, and with HTTP/2 (when the `h2` package is
+installed) concurrent calls to one host share a single connection. The
+client is opened and closed by the app lifespan; routes receive it through
+the get_http_client dependency, which only returns it.
+
+Every request is timed per upstream host, and the latency histograms are
+exposed on GET /metrics.
+"""
+
+import importlib.util
+import logging
+import time
+from typing import Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in milliseconds
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)  # last one is +Inf
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, elapsed_ms: float, error: bool = False) -> None:
+        index = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms <= bound),
+            len(LATENCY_BUCKETS_MS),
+        )
+        self.buckets[index] += 1
+        self.count += 1
+        self.errors += error
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def stats(self) -> dict:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class TimedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the real transport and records time-to-response-headers per host.
+    Transport errors (connect failures, timeouts) are counted as errors.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self.histograms: dict[str, LatencyHistogram] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        histogram = self.histograms.get(request.url.host)
+        if histogram is None:
+            histogram = self.histograms[request.url.host] = LatencyHistogram()
+        start = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            histogram.observe((time.perf_counter() - start) * 1000, error=True)
+            raise
+        histogram.observe(
+            (time.perf_counter() - start) * 1000, error=response.status_code >= 500
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+_client: Optional[httpx.AsyncClient] = None
+_transport: Optional[TimedTransport] = None
+
+
+def open_http_client() -> httpx.AsyncClient:
+    """Create the shared client. Called once from the app lifespan."""
+    global _client, _transport
+    if _client is None:
+        http2 = settings.HTTP_HTTP2 and _http2_available()
+        if settings.HTTP_HTTP2 and not http2:
+            logger.info("h2 not installed, outbound calls use HTTP/1.1")
+        _transport = TimedTransport(
+            httpx.AsyncHTTPTransport(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+            )
+        )
+        _client = httpx.AsyncClient(
+            transport=_transport,
+            timeout=httpx.Timeout(
+                settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+    return _client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Dependency (and plain accessor) returning the shared client. It never
+    creates one: as a sync dependency it runs in the threadpool, where
+    concurrent first requests would each build their own.
+    """
+    if _client is None:
+        raise RuntimeError("HTTP client is not open; open_http_client() runs in the app lifespan")
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client, _transport
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        _transport = None
+
+
+def upstream_stats() -> dict:
+    """Latency histogram per upstream host, exposed on GET /metrics."""
+    if _transport is None:
+        return {}
+    return {host: h.stats() for host, h in _transport.histograms.items()}
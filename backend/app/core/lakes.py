@@ -0,0 +1,137 @@
+"""
+core/lakes.py
+─────────────
+In-memory gazetteer of Michigan lakes behind GET /maps/nearby-lakes.
+
+The bundled app/data/michigan_lakes.csv (or the file at LAKES_DATA_PATH)
+lists representative points as name,lat,lng. A lake can have several rows,
+since a home on the Lake Michigan shore is far from the lake's centroid.
+Points are bucketed into a grid of GRID_DEGREES cells. nearest() visits
+rings of cells outward from the query point and stops once no unvisited
+cell can hold a closer lake, so a query touches a handful of points
+instead of the whole file.
+"""
+
+import csv
+import logging
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import settings
+from app.core.geo import KM_PER_DEGREE, haversine_km
+
+logger = logging.getLogger(__name__)
+
+BUNDLED_LAKES_PATH = Path(__file__).resolve().parent.parent / "data" / "michigan_lakes.csv"
+GRID_DEGREES = 0.25
+
+
+@dataclass(frozen=True)
+class Lake:
+    name: str
+    lat: float
+    lng: float
+
+
+def lake_name_variants(name: str) -> set[str]:
+    """Treat "Lake Cadillac" and "Cadillac Lake" as the same name."""
+    lowered = " ".join(name.lower().split())
+    variants = {lowered}
+    if lowered.startswith("lake "):
+        variants.add(f"{lowered[5:]} lake")
+    elif lowered.endswith(" lake"):
+        variants.add(f"lake {lowered[:-5]}")
+    return variants
+
+
+def _cell(lat: float, lng: float) -> tuple[int, int]:
+    return math.floor(lat / GRID_DEGREES), math.floor(lng / GRID_DEGREES)
+
+
+class LakeGazetteer:
+    def __init__(self, path: Path):
+        self.path = path
+        self._cells: Optional[dict[tuple[int, int], list[Lake]]] = None
+        self._points: list[Lake] = []  # in file order
+
+    def load(self) -> None:
+        cells: dict[tuple[int, int], list[Lake]] = {}
+        points = []
+        with open(self.path, newline="", encoding="utf-8") as f:
+            rows = csv.DictReader(line for line in f if not line.startswith("#"))
+            for row in rows:
+                lake = Lake(row["name"].strip(), float(row["lat"]), float(row["lng"]))
+                cells.setdefault(_cell(lake.lat, lake.lng), []).append(lake)
+                points.append(lake)
+        self._cells = cells
+        self._points = points
+        logger.info("Loaded %s lake points from %s", len(points), self.path)
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def nearest(
+        self, lat: float, lng: float, k: int, max_km: float
+    ) -> list[tuple[Lake, float]]:
+        """Up to `k` distinct lakes within `max_km` of the point, nearest first."""
+        if self._cells is None:
+            self.load()
+
+        ci, cj = _cell(lat, lng)
+        best: dict[str, tuple[float, Lake]] = {}
+        ring = 0
+        while True:
+            for di in range(-ring, ring + 1):
+                # Interior rows of the ring only have their two edge cells
+                step = 1 if abs(di) == ring else 2 * ring
+                for dj in range(-ring, ring + 1, step):
+                    for lake in self._cells.get((ci + di, cj + dj), ()):
+                        km = haversine_km(lat, lng, lake.lat, lake.lng)
+                        if km <= max_km and (lake.name not in best or km < best[lake.name][0]):
+                            best[lake.name] = (km, lake)
+
+            # Anything not visited yet lies outside this block of cells
+            lat_gap = min(lat - (ci - ring) * GRID_DEGREES, (ci + ring + 1) * GRID_DEGREES - lat)
+            lng_gap = min(lng - (cj - ring) * GRID_DEGREES, (cj + ring + 1) * GRID_DEGREES - lng)
+            limit = max_km
+            if len(best) >= k:
+                limit = sorted(km for km, _ in best.values())[k - 1]
+            # cos() at the farthest latitude a closer point could have; 0.99
+            # allows for great circles being slightly shorter than parallels
+            cos_lat = math.cos(math.radians(min(90.0, abs(lat) + limit / KM_PER_DEGREE)))
+            bound = 0.99 * KM_PER_DEGREE * min(lat_gap, lng_gap * cos_lat)
+            if bound >= limit or ring * GRID_DEGREES > 180:
+                break
+            ring += 1
+
+        ranked = sorted(best.values(), key=lambda entry: entry[0])[:k]
+        return [(lake, km) for km, lake in ranked]
+
+    def points(self, name: str) -> list[Lake]:
+        """Every point listed for the lake called `name`, in file order."""
+        if self._cells is None:
+            self.load()
+        variants = lake_name_variants(name)
+        return [lake for lake in self._points if lake_name_variants(lake.name) & variants]
+
+    def locate(self, name: str, lat: float, lng: float) -> Optional[Lake]:
+        """The point of the lake called `name` that is closest to (lat, lng)."""
+        return min(
+            self.points(name),
+            key=lambda lake: haversine_km(lat, lng, lake.lat, lake.lng),
+            default=None,
+        )
+
+    def unique_point(self, name: str) -> Optional[Lake]:
+        """
+        The lake's point when `name` is listed exactly once. Names with several
+        rows (Lake Michigan's shore points, or the three Portage Lakes) give
+        None, since no single point stands for them.
+        """
+        points = self.points(name)
+        return points[0] if len(points) == 1 else None
+
+
+lake_gazetteer = LakeGazetteer(Path(settings.LAKES_DATA_PATH or BUNDLED_LAKES_PATH))
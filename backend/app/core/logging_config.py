@@ -0,0 +1,69 @@
+"""
+core/logging_config.py
+──────────────────────
+Application logging setup.
+
+Records are handed to a QueueHandler and written to stderr by a
+QueueListener thread, so request handlers never block on console I/O.
+Levels come from Settings:
+
+  LOG_LEVEL    root level (default INFO)
+  LOG_LEVELS   per-logger overrides, e.g. "app.core.auth=DEBUG,sqlalchemy.engine=INFO"
+  SQL_ECHO     log every SQL statement (off by default)
+
+Modules log through logging.getLogger(__name__) as usual.
+"""
+
+import logging
+import logging.handlers
+import queue
+from typing import Optional
+
+from app.core.config import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)-5.5s [%(name)s] %(message)s"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def parse_levels(spec: str) -> dict[str, str]:
+    """Parse "logger=LEVEL,other=LEVEL" into a dict, ignoring blank entries."""
+    levels = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        name, level = part.split("=", 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging() -> None:
+    """Install the queue-based handler on the root logger (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream, respect_handler_level=True
+    )
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    if settings.SQL_ECHO:
+        logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+    for name, level in parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records; called from the app lifespan on shutdown."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,174 @@
+"""
+core/media.py
+─────────────
+Content-addressed blob store for uploaded images.
+
+Clients still send images as base64 data-URIs; store_data_uri() decodes them
+once, writes the bytes under their SHA-256 digest and returns the relative
+path "/media/<key>", which goes into the Item.image / Ad.image column instead
+of the payload. Identical uploads share one blob. Values that are already URLs
+pass through.
+
+Only the relative path is stored; public_url() prefixes API_BASE_URL when a
+row is serialized, so changing the API host does not break stored images.
+Absolute /media URLs written by earlier versions are recognized on any host.
+
+Backends implement MediaStore; LocalMediaStore (the default) keeps blobs on
+disk under settings.MEDIA_ROOT, fanned out by the first two hex characters.
+MEDIA_ROOT must be on persistent storage (see the volume in fly.toml): a
+container's own filesystem is wiped when the machine is replaced.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Optional
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+
+_DATA_URI_RE = re.compile(r"^data:(?P<mime>[\w.+-]+/[\w.+-]+)?(?:;[^,]*)?;base64,", re.I)
+MEDIA_PATH_PREFIX = "/media/"
+_KEY_RE = re.compile(r"^[0-9a-f]{64}(-(thumb|medium))?\.[a-z0-9]+$")
+
+# Extension on the key lets the media route pick a Content-Type without a lookup
+MIME_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/heic": "heic",
+}
+EXTENSION_MIMES = {
+    "jpg": "image/jpeg",
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "heic": "image/heic",
+    "bin": "application/octet-stream",
+}
+
+
+class MediaStore(ABC):
+    """
+    Interface for blob backends. Keys are '<sha256>.<ext>', or
+    '<sha256>-<rendition>.<ext>' for resized copies (see core/thumbnails.py).
+    """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def write(self, key: str, data: bytes) -> None: ...
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[bytes]: ...
+
+    def put(self, data: bytes, content_type: str) -> str:
+        """Store `data` (deduplicated by digest) and return its key."""
+        ext = MIME_EXTENSIONS.get(content_type.lower(), "bin")
+        key = f"{hashlib.sha256(data).hexdigest()}.{ext}"
+        if not self.exists(key):
+            self.write(key, data)
+        return key
+
+
+class LocalMediaStore(MediaStore):
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def write(self, key: str, data: bytes) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see partial blobs
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+def _build_store() -> MediaStore:
+    if settings.MEDIA_BACKEND == "local":
+        return LocalMediaStore(settings.MEDIA_ROOT)
+    raise RuntimeError(f"Unknown MEDIA_BACKEND: {settings.MEDIA_BACKEND}")
+
+
+media_store = _build_store()
+
+
+def is_valid_key(key: str) -> bool:
+    return bool(_KEY_RE.match(key))
+
+
+def media_path(key: str) -> str:
+    """The value stored in image columns for a blob."""
+    return f"{MEDIA_PATH_PREFIX}{key}"
+
+
+def media_key(value: Optional[str]) -> Optional[str]:
+    """
+    Key of a stored image ("/media/<key>", or an absolute URL to one),
+    or None for data-URIs, external URLs and empty values.
+    """
+    if not value:
+        return None
+    if not value.startswith(MEDIA_PATH_PREFIX):
+        path = urlsplit(value).path if value.startswith(("http://", "https://")) else ""
+        if not path.startswith(MEDIA_PATH_PREFIX):
+            return None
+        value = path
+    key = value[len(MEDIA_PATH_PREFIX):]
+    return key if is_valid_key(key) else None
+
+
+def media_url(key: str) -> str:
+    return f"{settings.API_BASE_URL}{media_path(key)}"
+
+
+def public_url(value: Optional[str]) -> Optional[str]:
+    """Absolute URL for an image column value; non-media values pass through."""
+    key = media_key(value)
+    return media_url(key) if key else value
+
+
+def decode_data_uri(value: str) -> tuple[bytes, str]:
+    """Split a base64 data-URI into (bytes, mime type)."""
+    match = _DATA_URI_RE.match(value)
+    if not match:
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    try:
+        data = base64.b64decode(value[match.end():], validate=False)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid image data")
+    return data, (match.group("mime") or "application/octet-stream")
+
+
+def store_data_uri(value: Optional[str]) -> Optional[str]:
+    """
+    Persist a data-URI image and return its relative media path.
+    Empty values and values that are already URLs are returned unchanged.
+    """
+    if not value or not value.startswith("data:"):
+        return value
+    data, mime = decode_data_uri(value)
+    return media_path(media_store.put(data, mime))
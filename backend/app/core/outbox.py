@@ -0,0 +1,178 @@
+"""
+core/outbox.py
+──────────────
+Durable outbox for transactional email.
+
+Request handlers call enqueue_email() inside their own transaction, so an
+email is recorded exactly when the change that triggers it commits and the
+request never waits on the email provider. OutboxWorker, started from the
+app lifespan, drains due rows:
+
+  - claims a batch with FOR UPDATE SKIP LOCKED and pushes next_attempt_at
+    forward by OUTBOX_LEASE_SECONDS, so every uvicorn worker can drain the
+    same table and a crash mid-send only means a later retry;
+  - sends each email through Resend's HTTP API at RESEND_API_URL (point it
+    at a local stub sink when developing);
+  - retries failures with exponential backoff and marks the email failed
+    after OUTBOX_MAX_ATTEMPTS. 4xx responses other than 429 are not retried.
+"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Optional
+
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.http import get_http_client
+from app.db.models import EmailOutbox
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+SEND_TIMEOUT_SECONDS = 10
+
+
+class PermanentEmailError(Exception):
+    """The provider rejected the email; retrying will not help."""
+
+
+def backoff_seconds(attempts: int) -> float:
+    return min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+
+
+def enqueue_email(db: AsyncSession, to: str, subject: str, html: str) -> None:
+    """
+    Add an email to the caller's transaction. Call outbox_worker.wake()
+    after committing to have it sent right away instead of on the next poll.
+    """
+    db.add(EmailOutbox(to_address=to, subject=subject, html=html))
+
+
+async def send_email(client: httpx.AsyncClient, email: EmailOutbox) -> None:
+    response = await client.post(
+        f"{settings.RESEND_API_URL}/emails",
+        json={
+            "from": settings.EMAIL_FROM,
+            "to": [email.to_address],
+            "subject": email.subject,
+            "html": email.html,
+        },
+        headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+        timeout=SEND_TIMEOUT_SECONDS,
+    )
+    if 400 <= response.status_code < 500 and response.status_code != 429:
+        raise PermanentEmailError(f"{response.status_code}: {response.text[:200]}")
+    response.raise_for_status()
+
+
+class OutboxWorker:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        if not settings.RESEND_API_KEY:
+            logger.info("RESEND_API_KEY not configured, outbox worker not started")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        client = get_http_client()
+        while True:
+            try:
+                claimed = await self.drain(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox drain failed")
+                claimed = 0
+            # A full batch suggests more is due; otherwise wait for work
+            if claimed < settings.OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(), settings.OUTBOX_POLL_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def drain(self, client: httpx.AsyncClient) -> int:
+        """Claim one batch of due emails and try to send each; returns the batch size."""
+        async with AsyncSessionLocal() as db:
+            due = (
+                select(EmailOutbox.id)
+                .where(
+                    EmailOutbox.status == "pending",
+                    EmailOutbox.next_attempt_at <= func.now(),
+                )
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(settings.OUTBOX_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            emails = (await db.scalars(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due.scalar_subquery()))
+                .values(
+                    attempts=EmailOutbox.attempts + 1,
+                    next_attempt_at=func.now()
+                    + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                )
+                .returning(EmailOutbox)
+                .execution_options(synchronize_session=False)
+            )).all()
+            await db.commit()
+
+            # Settle each email as soon as it is sent, so the batch holds no
+            # transaction open across HTTP calls and a crash mid-batch does
+            # not resend the emails already delivered
+            for email in emails:
+                await self._deliver(db, client, email)
+                await db.commit()
+            return len(emails)
+
+    async def _deliver(
+        self, db: AsyncSession, client: httpx.AsyncClient, email: EmailOutbox
+    ) -> None:
+        settle = update(EmailOutbox).where(EmailOutbox.id == email.id)
+        try:
+            await send_email(client, email)
+        except (httpx.HTTPError, PermanentEmailError) as e:
+            error = f"{type(e).__name__}: {e}"
+            if isinstance(e, PermanentEmailError) or email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                logger.error("Giving up on email %s to %s: %s", email.id, email.to_address, error)
+                await db.execute(settle.values(status="failed", last_error=error))
+            else:
+                delay = backoff_seconds(email.attempts)
+                logger.warning("Email %s failed (%s), retrying in %ss", email.id, error, delay)
+                await db.execute(
+                    settle.values(
+                        next_attempt_at=func.now() + timedelta(seconds=delay),
+                        last_error=error,
+                    )
+                )
+            return
+
+        logger.info("Sent email %s to %s", email.id, email.to_address)
+        await db.execute(settle.values(status="sent", sent_at=func.now(), last_error=None))
+
+
+outbox_worker = OutboxWorker()
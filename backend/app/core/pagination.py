@@ -0,0 +1,137 @@
+"""
+core/pagination.py
+──────────────────
+Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are ordered by (created_at DESC, id DESC) and the cursor is an opaque
+base64 token holding the (created_at, id) of the last row on the page. The
+next page is fetched with a row-value comparison, which Postgres answers from
+the matching composite index no matter how deep the client has scrolled.
+
+Passing ascending=True walks forward instead (oldest first, rows after the
+cursor), which clients use to fetch only what is new since their last sync.
+
+Ranked results (full-text search) pass a `rank` expression, which becomes the
+leading sort key and is carried in the cursor alongside (created_at, id).
+
+The cursor for the following page is returned in the X-Next-Cursor response
+header so existing clients that expect a plain JSON list keep working.
+
+Sync cursors (encode_sync_cursor) hold a watermark timestamp and the ids
+already delivered close to it, for endpoints that re-read a window behind
+the watermark and skip what the client already has.
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import REAL, cast, literal, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id, rank: Optional[float] = None) -> str:
+    data = {"t": created_at.isoformat(), "id": str(row_id)}
+    if rank is not None:
+        data["r"] = rank
+    raw = json.dumps(data)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID, Optional[float]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        rank = float(data["r"]) if "r" in data else None
+        return datetime.fromisoformat(data["t"]), uuid.UUID(data["id"]), rank
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_condition(created_col, id_col, cursor: str, ascending: bool = False):
+    """The (created_at, id) comparison that selects rows after `cursor`."""
+    created_at, row_id, _ = decode_cursor(cursor)
+    keys = tuple_(created_col, id_col)
+    values = tuple_(literal(created_at, created_col.type), literal(row_id, id_col.type))
+    return keys > values if ascending else keys < values
+
+
+async def paginate(
+    db,
+    stmt,
+    created_col,
+    id_col,
+    cursor: Optional[str],
+    limit: int,
+    rank=None,
+    ascending: bool = False,
+):
+    """
+    Apply keyset ordering/filtering to the `stmt` select and fetch one page
+    with the async session `db`. Returns (rows, next_cursor); next_cursor is
+    None on the last page.
+    """
+    keys = [created_col, id_col]
+    if rank is not None:
+        keys.insert(0, rank)
+        stmt = stmt.add_columns(rank)
+
+    if cursor:
+        created_at, row_id, cursor_rank = decode_cursor(cursor)
+        # Bind with the column types so timestamptz/uuid comparisons stay exact
+        values = [literal(created_at, created_col.type), literal(row_id, id_col.type)]
+        if rank is not None:
+            if cursor_rank is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            # ts_rank returns real; compare in the same precision
+            values.insert(0, cast(cursor_rank, REAL))
+        if ascending:
+            stmt = stmt.where(tuple_(*keys) > tuple_(*values))
+        else:
+            stmt = stmt.where(tuple_(*keys) < tuple_(*values))
+
+    # Fetch one extra row to know whether another page exists
+    order = [k.asc() if ascending else k.desc() for k in keys]
+    stmt = stmt.order_by(*order).limit(limit + 1)
+    result = await db.execute(stmt)
+    rows = result.all() if rank is not None else result.scalars().all()
+    has_more = len(rows) > limit
+    rows = list(rows[:limit])
+
+    last_rank = None
+    if rank is not None:
+        if rows:
+            last_rank = rows[-1][1]
+        rows = [row[0] for row in rows]
+
+    if not has_more:
+        return rows, None
+    last = rows[-1]
+    return rows, encode_cursor(
+        getattr(last, created_col.key), getattr(last, id_col.key), last_rank
+    )
+
+
+def encode_sync_cursor(watermark: datetime, seen) -> str:
+    raw = json.dumps({"t": watermark.isoformat(), "seen": sorted(str(i) for i in seen)})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> tuple[datetime, set[uuid.UUID]]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # Sync cursors issued as plain (created_at, id) keyset cursors
+        seen = data["seen"] if "seen" in data else [data["id"]]
+        return datetime.fromisoformat(data["t"]), {uuid.UUID(i) for i in seen}
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,139 @@
+"""
+core/realtime.py
+────────────────
+In-process pub/sub hub that pushes new messages to WebSocket clients.
+
+send_message() calls publish() inside its transaction, which issues
+pg_notify on the NEW_MESSAGE_CHANNEL. Postgres delivers the notification only
+once the transaction commits, and delivers it to every listening connection,
+so each uvicorn worker learns about every committed message no matter which
+worker handled the POST. Each worker keeps one dedicated LISTEN connection
+and fans notifications out to its own subscribers (the sender and receiver
+of the message), one bounded asyncio.Queue per open socket.
+
+NOTIFY payloads are limited to 8000 bytes; larger messages are announced
+without their content ("truncated": true) and clients fetch them over HTTP.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import defaultdict
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import asyncpg_connect_params
+
+logger = logging.getLogger(__name__)
+
+NEW_MESSAGE_CHANNEL = "new_message"
+MAX_NOTIFY_BYTES = 7900  # Postgres limit is 8000, leave room for overhead
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_DELAY_SECONDS = 5
+
+
+class MessageHub:
+    def __init__(self, channel: str, queue_size: int):
+        self.channel = channel
+        self.queue_size = queue_size
+        self._subscribers: dict[uuid.UUID, set[asyncio.Queue]] = defaultdict(set)
+        self._task: Optional[asyncio.Task] = None
+
+    # ── Subscribers ──────────────────────────────────────────────────────────
+
+    def subscribe(self, profile_id: uuid.UUID) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[profile_id].add(queue)
+        return queue
+
+    def unsubscribe(self, profile_id: uuid.UUID, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(profile_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[profile_id]
+
+    def connection_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def _deliver(self, profile_id: uuid.UUID, event: dict) -> None:
+        for queue in self._subscribers.get(profile_id, ()):
+            if queue.full():
+                # Slow client: drop its oldest event rather than block the hub
+                queue.get_nowait()
+                logger.warning("Dropped a realtime event for slow client %s", profile_id)
+            queue.put_nowait(event)
+
+    def _on_notify(self, conn, pid, channel, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+            recipients = {uuid.UUID(event["sender_id"]), uuid.UUID(event["receiver_id"])}
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed %s notification", channel)
+            return
+        for profile_id in recipients:
+            self._deliver(profile_id, event)
+
+    # ── LISTEN connection ────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen_forever(self) -> None:
+        """Hold a LISTEN connection open, reconnecting if it drops."""
+        dsn, connect_kwargs = asyncpg_connect_params()
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn, **connect_kwargs)
+                closed = asyncio.Event()
+                conn.add_termination_listener(lambda _: closed.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                logger.info("Listening for %s notifications", self.channel)
+                await closed.wait()
+                logger.warning("LISTEN connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("LISTEN connection failed: %s", e)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+
+message_hub = MessageHub(NEW_MESSAGE_CHANNEL, SUBSCRIBER_QUEUE_SIZE)
+
+
+async def publish_message(db: AsyncSession, message: dict) -> None:
+    """
+    Queue a NOTIFY for `message` (the MessageOut dict) on the caller's
+    transaction; listeners receive it when that transaction commits.
+    """
+    event = {"type": "message", **message}
+    payload = json.dumps(event)
+    if len(payload.encode()) > MAX_NOTIFY_BYTES:
+        event = {
+            "type": "message",
+            "id": message["id"],
+            "sender_id": message["sender_id"],
+            "receiver_id": message["receiver_id"],
+            "truncated": True,
+        }
+        payload = json.dumps(event)
+    await db.execute(select(func.pg_notify(NEW_MESSAGE_CHANNEL, payload)))
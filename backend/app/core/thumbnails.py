@@ -0,0 +1,126 @@
+"""
+core/thumbnails.py
+──────────────────
+Background rendition pipeline for listing images.
+
+After an upload is written to the media store, schedule_renditions() hands
+its key to a process pool that renders a small thumbnail and a medium
+rendition next to the original:
+
+    <sha256>.<ext>           original
+    <sha256>-thumb.<ext>     THUMBNAIL_SIZE px on the long edge
+    <sha256>-medium.<ext>    MEDIUM_SIZE px on the long edge
+
+Rendition names are derived from the original key, so no extra columns are
+needed. Until a rendition exists (or if Pillow is not installed), the media
+route falls back to serving the original.
+"""
+
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+from app.core.media import media_key, media_url
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS = ("thumb", "medium")
+
+# Pillow format names for the extensions the media store writes
+_PIL_FORMATS = {"jpg": "JPEG", "png": "PNG", "gif": "GIF", "webp": "WEBP"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def rendition_key(key: str, rendition: str) -> str:
+    digest, ext = key.rsplit(".", 1)
+    return f"{digest}-{rendition}.{ext}"
+
+
+def original_key(key: str) -> str:
+    """Map a rendition key back to its original ('<sha>-thumb.png' → '<sha>.png')."""
+    digest, ext = key.rsplit(".", 1)
+    return f"{digest.split('-', 1)[0]}.{ext}"
+
+
+def rendition_url(url: Optional[str], rendition: str) -> Optional[str]:
+    """
+    Absolute rendition URL for a stored /media image Pillow can render, else
+    None. Legacy rows that still hold a data-URI must not have it copied into
+    the rendition fields, and formats that are never rendered (heic, bin)
+    would only ever get the full original back; clients fall back to the
+    full image.
+    """
+    key = media_key(url)
+    if key is None or key.rsplit(".", 1)[-1] not in _PIL_FORMATS:
+        return None
+    return media_url(rendition_key(key, rendition))
+
+
+def render_renditions(key: str) -> list[str]:
+    """Worker entry point: render every missing rendition of `key`."""
+    # Imported in the worker so the API process does not need Pillow loaded
+    from PIL import Image
+    from app.core.media import media_store
+
+    ext = key.rsplit(".", 1)[-1]
+    fmt = _PIL_FORMATS.get(ext)
+    if not fmt:
+        return []
+    data = media_store.read(key)
+    if data is None:
+        return []
+
+    sizes = {"thumb": settings.THUMBNAIL_SIZE, "medium": settings.MEDIUM_SIZE}
+    written = []
+    for rendition in RENDITIONS:
+        out_key = rendition_key(key, rendition)
+        if media_store.exists(out_key):
+            continue
+        with Image.open(io.BytesIO(data)) as img:
+            img.thumbnail((sizes[rendition], sizes[rendition]))
+            if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            buf = io.BytesIO()
+            img.save(buf, format=fmt, optimize=True)
+        media_store.write(out_key, buf.getvalue())
+        written.append(out_key)
+    return written
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Spawn, not fork: the server already runs the logging QueueListener
+        # and threadpool threads, and a forked child inherits any lock one of
+        # them held at that moment, which can deadlock it
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def _log_failure(future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Thumbnail rendering failed: %s", exc)
+
+
+def schedule_renditions(url: Optional[str]) -> None:
+    """Queue rendition work for a stored /media image without blocking the request."""
+    key = media_key(url)
+    if key is None or settings.THUMBNAIL_WORKERS < 1:
+        return
+    future = _get_pool().submit(render_renditions, key)
+    future.add_done_callback(_log_failure)
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,18 +1,22 @@
 from sqlalchemy import (
     Column,
+    Computed,
     String,
     Text,
     TIMESTAMP,
     DateTime,
     ForeignKey,
+    Index,
     Table,
     Enum,
     func,
     text,
     Boolean,
+    Float,
+    Integer,
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from app.db.base import Base
 from datetime import datetime
 import uuid
@@ -47,20 +51,28 @@ profile_interest = Table(
     ),
 )
 
-# Add to association tables section
+# Undirected: one row per pair, stored in canonical order (user_a_id <
+# user_b_id, see ordered_pair) so any lookup between two users is a single
+# primary-key probe. requester_id records which side sent the request.
 connections = Table(
     "connections",
     Base.metadata,
-    Column(
-        "requester_id", UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True
-    ),
-    Column(
-        "requestee_id", UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True
-    ),
+    Column("user_a_id", UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True),
+    Column("user_b_id", UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True),
+    Column("requester_id", UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=False),
     Column("status", String, default="pending"),  # "pending" | "accepted" | "declined"
     Column("created_at", TIMESTAMP(timezone=True), server_default=func.now()),
+    # "All of my connections with status X" is one probe per side
+    Index("ix_connections_user_a_id_status", "user_a_id", "status"),
+    Index("ix_connections_user_b_id_status", "user_b_id", "status"),
 )
 
+
+def ordered_pair(x: uuid.UUID, y: uuid.UUID) -> tuple[uuid.UUID, uuid.UUID]:
+    """Canonical (user_a_id, user_b_id) ordering for connections and Conversation."""
+    return (x, y) if x < y else (y, x)
+
+
 # ---------------------------
 # Models
 # ---------------------------
@@ -82,7 +94,21 @@ class Profile(Base):
     profile_image_url = Column(String)
     is_business = Column(Boolean, default=False, nullable=False, server_default='false')
     business_name = Column(String, nullable=True)
+    # Geocoded address (from /maps/place-details), for distance filters
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    # Full-text search document for /search/users ('simple' – no stemming of usernames)
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('simple', coalesce(username, '')), 'A') || "
+                "setweight(to_tsvector('simple', coalesce(bio, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
 
     communities = relationship(
         "Community", secondary=profile_community, back_populates="members"
@@ -93,12 +119,11 @@ class Profile(Base):
     posts = relationship("Post", back_populates="author")
     items = relationship("Item", back_populates="owner")
 
-    sent_requests = relationship(
-        "Profile",
-        secondary=connections,
-        primaryjoin=id == connections.c.requester_id,
-        secondaryjoin=id == connections.c.requestee_id,
-        backref="received_requests",
+    __table_args__ = (
+        Index("ix_profiles_created_at_id", "created_at", "id"),
+        Index("ix_profiles_search_vector", "search_vector", postgresql_using="gin"),
+        # Bounding-box prefilter for distance queries (see core/geo.py)
+        Index("ix_profiles_lat_lng", "lat", "lng"),
     )
 
 
@@ -114,13 +139,34 @@ class Community(Base):
     name = Column(String, nullable=False, unique=True)
     description = Column(Text)
     lake_name = Column(String)
+    # Location of the lake, for GET /communities/nearby
+    lat = Column(Float, nullable=True)
+    lng = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    # Full-text search document for /search/communities
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(lake_name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
 
     members = relationship(
         "Profile", secondary=profile_community, back_populates="communities"
     )
     posts = relationship("Post", back_populates="community")
 
+    __table_args__ = (
+        Index("ix_communities_created_at_id", "created_at", "id"),
+        Index("ix_communities_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_communities_lat_lng", "lat", "lng"),
+    )
+
 
 class Interest(Base):
     __tablename__ = "interests"
@@ -166,6 +212,14 @@ class Post(Base):
     author = relationship("Profile", back_populates="posts")
     community = relationship("Community", back_populates="posts")
 
+    # Keyset pagination indexes: (created_at, id) for the global feed, plus
+    # community/author prefixes for the filtered feeds.
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_community_created_at_id", "community_id", "created_at", "id"),
+        Index("ix_posts_author_created_at_id", "author_id", "created_at", "id"),
+    )
+
 
 class ItemCategory(enum.Enum):
     BOAT = "boat"
@@ -182,11 +236,27 @@ class Item(Base):
     name = Column(String, nullable=False)
     price = Column(String)
     description = Column(Text)
-    image = Column(Text)
+    image = Column(Text)  # /media URL (legacy rows: base64)
     category = Column(Enum(ItemCategory), default=ItemCategory.OTHER)
     created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    # Full-text search document for /search/items
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+        )
+    )
     owner = relationship("Profile", back_populates="items")
 
+    __table_args__ = (
+        Index("ix_items_created_at_id", "created_at", "id"),
+        Index("ix_items_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
 
 class Message(Base):
     __tablename__ = "messages"
@@ -206,6 +276,42 @@ class Message(Base):
     sender = relationship("Profile", foreign_keys=[sender_id], backref="sent_messages")
     receiver = relationship("Profile", foreign_keys=[receiver_id], backref="received_messages")
 
+    __table_args__ = (
+        Index(
+            "ix_messages_sender_receiver_created_at_id",
+            "sender_id",
+            "receiver_id",
+            "created_at",
+            "id",
+        ),
+        # Received side of the inbox queries (sender_id leads the index above)
+        Index("ix_messages_receiver_id_created_at", "receiver_id", "created_at"),
+    )
+
+
+class Conversation(Base):
+    """
+    Inbox summary, one row per pair of profiles that have exchanged messages.
+    The pair is stored in canonical order (user_a_id < user_b_id) and the row
+    is upserted in the same transaction as every new message.
+    """
+
+    __tablename__ = "conversations"
+
+    user_a_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True)
+    user_b_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), primary_key=True)
+    last_message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id"), nullable=False)
+    last_message_at = Column(TIMESTAMP(timezone=True), nullable=False)
+    unread_a = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_b = Column(Integer, nullable=False, default=0, server_default="0")
+
+    last_message = relationship("Message")
+
+    __table_args__ = (
+        Index("ix_conversations_user_a_last_message_at", "user_a_id", "last_message_at"),
+        Index("ix_conversations_user_b_last_message_at", "user_b_id", "last_message_at"),
+    )
+
 
 class AdStatus(enum.Enum):
     PENDING = "pending"
@@ -230,7 +336,7 @@ class Ad(Base):
     owner_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=False)
     title = Column(String, nullable=False)
     body = Column(Text, nullable=False)
-    image = Column(Text, nullable=True)      # base64 or URL
+    image = Column(Text, nullable=True)      # /media URL (legacy rows: base64)
     link_url = Column(String, nullable=True)
     status = Column(Enum(AdStatus), default=AdStatus.PENDING, nullable=False)
     ad_type = Column(Enum(AdType), default=AdType.POST, nullable=False)
@@ -238,3 +344,46 @@ class Ad(Base):
     approved_at = Column(TIMESTAMP(timezone=True), nullable=True)
 
     owner = relationship("Profile", backref="ads")
+
+
+class EmailOutbox(Base):
+    """
+    Outgoing emails, written in the same transaction as the change that
+    triggers them and delivered by the worker in core/outbox.py.
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = Column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid.uuid4,
+        server_default=text("gen_random_uuid()"),
+    )
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending", server_default="pending")  # "pending" | "sent" | "failed"
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(TIMESTAMP(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP(timezone=True), server_default=func.now())
+    sent_at = Column(TIMESTAMP(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+
+class MapsCacheEntry(Base):
+    """
+    Persisted Google Places responses (see routers/maps.py), so a restart
+    does not start the /maps/* cache cold. Only used when MAPS_CACHE_PERSIST
+    is enabled.
+    """
+
+    __tablename__ = "maps_cache"
+
+    key = Column(String, primary_key=True)
+    value = Column(JSONB, nullable=False)
+    expires_at = Column(TIMESTAMP(timezone=True), nullable=False, index=True)
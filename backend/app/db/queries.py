@@ -0,0 +1,66 @@
+"""
+db/queries.py
+─────────────
+Small async query helpers shared by several routers.
+
+Async sessions cannot lazy-load relationships, so membership checks and
+member counts are answered with explicit queries on the association table
+instead of walking Community.members.
+"""
+
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Profile, profile_community
+
+
+async def is_community_member(
+    db: AsyncSession, community_id: uuid.UUID, profile_id: uuid.UUID
+) -> bool:
+    row = await db.scalar(
+        select(profile_community.c.profile_id).where(
+            and_(
+                profile_community.c.community_id == community_id,
+                profile_community.c.profile_id == profile_id,
+            )
+        )
+    )
+    return row is not None
+
+
+async def community_member_counts(
+    db: AsyncSession, community_ids: Iterable[uuid.UUID]
+) -> dict[uuid.UUID, int]:
+    """Member count per community id, in one grouped query."""
+    ids = list(community_ids)
+    if not ids:
+        return {}
+    rows = await db.execute(
+        select(profile_community.c.community_id, func.count())
+        .where(profile_community.c.community_id.in_(ids))
+        .group_by(profile_community.c.community_id)
+    )
+    return dict(rows.all())
+
+
+async def search_origin(
+    db: AsyncSession,
+    profile_id: uuid.UUID,
+    lat: Optional[float],
+    lng: Optional[float],
+) -> Optional[tuple[float, float]]:
+    """
+    The point a distance search is measured from: the given lat/lng, else
+    the caller's geocoded address. None when neither is available.
+    """
+    if lat is not None and lng is not None:
+        return lat, lng
+    row = (await db.execute(
+        select(Profile.lat, Profile.lng).where(Profile.id == profile_id)
+    )).first()
+    if row is None or row.lat is None or row.lng is None:
+        return None
+    return row.lat, row.lng
@@ -1,18 +1,162 @@
 # app/db/session.py
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=True)
+
+class _WaitTimingMixin:
+    """Records how long pool checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._wait_lock:
+                self.wait_count += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def recreate(self):
+        # Keep stats on the replacement pool created by engine.dispose()
+        new_pool = super().recreate()
+        new_pool.wait_count = self.wait_count
+        new_pool.wait_total = self.wait_total
+        new_pool.wait_max = self.wait_max
+        return new_pool
+
+
+class TimedQueuePool(_WaitTimingMixin, QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+
+class TimedAsyncQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long checkouts wait."""
+
+
+# SQL logging goes through the sqlalchemy.engine logger (see SQL_ECHO in
+# core/logging_config.py) rather than echo=True, which writes synchronously.
+# pre_ping + recycle drop connections that went stale while the Fly machine
+# was stopped; statement_timeout stops one slow query from pinning a connection.
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"},
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# Migration, backfill and seed scripts rewrite whole tables and build large
+# indexes, which can run well past DB_STATEMENT_TIMEOUT_MS. They use this
+# engine instead: no statement timeout, and no pool sizing to tune.
+script_engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    connect_args={"options": "-c statement_timeout=0"},
+)
+ScriptSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=script_engine)
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# ─── Async engine (asyncpg) ───────────────────────────────────────────────────
+# Used by the routers so a request waiting on Postgres does not hold a
+# threadpool worker. Sync `engine` stays for create_all, scripts and main.py.
+
+
+def _async_url(url: str):
+    """Point DATABASE_URL at asyncpg; returns (url, connect_args)."""
+    u = make_url(url.replace("postgres://", "postgresql://", 1))
+    u = u.set(drivername="postgresql+asyncpg")
+    connect_args = {
+        "server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}
+    }
+    # asyncpg takes `ssl` instead of libpq's `sslmode`
+    if "sslmode" in u.query:
+        connect_args["ssl"] = u.query["sslmode"]
+        u = u.difference_update_query(["sslmode"])
+    return u, connect_args
+
+
+_async_db_url, _async_connect_args = _async_url(DATABASE_URL)
+async_engine = create_async_engine(
+    _async_db_url,
+    poolclass=TimedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_async_connect_args,
+)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def asyncpg_connect_params() -> tuple[str, dict]:
+    """
+    DSN and asyncpg.connect() kwargs for dedicated connections outside the
+    pool, e.g. the long-lived LISTEN connection in core/realtime.py.
+    """
+    dsn = _async_db_url.set(drivername="postgresql").render_as_string(
+        hide_password=False
+    )
+    return dsn, dict(_async_connect_args)
+
+
+def _stats(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": pool.wait_count,
+        "wait_avg_ms": round(pool.wait_total / pool.wait_count * 1000, 3)
+        if pool.wait_count
+        else 0.0,
+        "wait_max_ms": round(pool.wait_max * 1000, 3),
+    }
+
+
+def pool_stats() -> dict:
+    """Sync connection pool utilisation, exposed on GET /metrics."""
+    return _stats(engine.pool)
+
+
+def async_pool_stats() -> dict:
+    """Async (asyncpg) connection pool utilisation, exposed on GET /metrics."""
+    return _stats(async_engine.pool)
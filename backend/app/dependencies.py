@@ -5,19 +5,33 @@ Centralized FastAPI dependencies and database utilities.
 
 Functions:
   - get_or_create_profile(user, db): Get or create user profile from JWT claims
+  - get_current_profile: Dependency resolving the caller's Profile row
+  - get_current_profile_id: Dependency resolving only the caller's profile id
   - requires_admin(user): Dependency ensuring user has admin role in JWT
+
+FastAPI resolves each dependency once per request. Across requests, the
+JWT `sub` → profile id mapping is kept in a bounded TTL cache, so
+get_current_profile_id usually needs no query at all and get_current_profile
+needs only a primary-key lookup.
 """
 
 from fastapi import Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db.models import Profile
 from app.core.auth import get_current_user
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+profile_id_cache = TTLCache(
+    maxsize=settings.PROFILE_CACHE_SIZE, ttl=settings.PROFILE_CACHE_TTL_SECONDS
+)
 
 
-def get_or_create_profile(user: dict, db: Session) -> Profile:
+async def get_or_create_profile(user: dict, db: AsyncSession) -> Profile:
     """
     Extract email from JWT and get/create corresponding Profile row.
     Used across all routers to ensure user has a profile before creating content.
@@ -26,20 +40,50 @@ def get_or_create_profile(user: dict, db: Session) -> Profile:
     if not email:
         raise HTTPException(status_code=400, detail="No email in token")
 
-    profile = db.query(Profile).filter(Profile.email == email).first()
+    profile = await db.scalar(select(Profile).where(Profile.email == email))
     if not profile:
         # Auto-create profile with username from email prefix
         username = email.split("@")[0]
-        existing = db.query(Profile).filter(Profile.username == username).first()
+        existing = await db.scalar(select(Profile).where(Profile.username == username))
         if existing:
             username = f"{username}_{str(uuid.uuid4())[:6]}"
         profile = Profile(email=email, username=username)
         db.add(profile)
-        db.commit()
-        db.refresh(profile)
+        await db.commit()
+        await db.refresh(profile)
+    return profile
+
+
+async def get_current_profile(
+    user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
+) -> Profile:
+    """Dependency returning the authenticated caller's Profile (created if missing)."""
+    sub = user.get("sub")
+    profile_id = profile_id_cache.get(sub)
+    if profile_id is not None:
+        profile = await db.get(Profile, profile_id)
+        if profile:
+            return profile
+        profile_id_cache.pop(sub)
+
+    profile = await get_or_create_profile(user, db)
+    profile_id_cache.set(sub, profile.id)
     return profile
 
 
+async def get_current_profile_id(
+    user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)
+) -> uuid.UUID:
+    """
+    Dependency returning only the caller's profile id. Use this when the route
+    just needs the id or only needs to ensure the request is authenticated.
+    """
+    profile_id = profile_id_cache.get(user.get("sub"))
+    if profile_id is not None:
+        return profile_id
+    return (await get_current_profile(user, db)).id
+
+
 def requires_admin(user: dict = Depends(get_current_user)) -> dict:
     """
     Dependency that enforces admin role in JWT.
@@ -1,25 +1,66 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 from app.core.config import settings
-from app.core.auth import get_current_user
+from app.core.auth import get_current_user, token_cache
+from app.core.http import (
+    close_http_client,
+    get_http_client,
+    open_http_client,
+    upstream_stats,
+)
+from app.core.geo import haversine_km
+from app.core.lakes import lake_gazetteer
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.outbox import outbox_worker
+from app.core.realtime import message_hub
+from app.core.thumbnails import shutdown_pool
 from app.db.models import Profile
 from app.db.base import Base
-from app.db.session import engine
+from app.db.session import async_engine, async_pool_stats, engine, pool_stats
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.db.models import Interest, Community, Item
+from app.dependencies import requires_admin
 from app.routers.posts_items import router as posts_items_router
 from app.routers.posts_items import PostType, ItemCategory
 from app.routers.search import router as search_router
 from app.routers.connections import router as connections_router
-from app.routers.messages import router as messages_router
-from app.routers.ads import router as ads_router
-from pydantic import BaseModel
+from app.routers.messages import SYNC_CURSOR_HEADER, router as messages_router
+from app.routers.ads import ads_cache, router as ads_router
+from app.routers.maps import (
+    cache_stats as maps_cache_stats,
+    prune_persisted_cache,
+    router as maps_router,
+)
+from app.routers.media import router as media_router
+from app.routers.realtime import router as realtime_router
+from pydantic import BaseModel, Field
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 
 
-app = FastAPI(title="MyMichiganLake API")
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    open_http_client()
+    await message_hub.start()
+    await outbox_worker.start()
+    await prune_persisted_cache()
+    lake_gazetteer.load()
+    yield
+    await outbox_worker.stop()
+    await message_hub.stop()
+    await close_http_client()
+    shutdown_pool()
+    await async_engine.dispose()
+    shutdown_logging()
+
+
+app = FastAPI(title="MyMichiganLake API", lifespan=lifespan)
 from starlette.middleware import Middleware
 
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
@@ -36,6 +77,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, SYNC_CURSOR_HEADER],
 )
 
 # ─── Routers ──────────────────────────────────────────────────────────────────
@@ -45,6 +87,9 @@ app.include_router(search_router)
 app.include_router(connections_router)
 app.include_router(messages_router)
 app.include_router(ads_router)
+app.include_router(media_router)
+app.include_router(maps_router)
+app.include_router(realtime_router)
 
 
 # ─── Core routes ──────────────────────────────────────────────────────────────
@@ -55,6 +100,20 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics")
+def metrics(_=Depends(requires_admin)):
+    """In-process cache and connection pool counters (admin only)."""
+    return {
+        "auth_token_cache": token_cache.stats(),
+        "ads_cache": ads_cache.stats(),
+        "maps_cache": maps_cache_stats(),
+        "db_pool": pool_stats(),
+        "db_async_pool": async_pool_stats(),
+        "ws_connections": message_hub.connection_count(),
+        "http_upstreams": upstream_stats(),
+    }
+
+
 @app.get("/protected")
 def protected(user=Depends(get_current_user)):
     return {"user": user}
@@ -78,55 +137,6 @@ def populate_interests(interests: list[str], db: Session = Depends(get_db)):
     return {"added": added_interests, "total": len(added_interests)}
 
 
-# ─── Maps routes ──────────────────────────────────────────────────────────────
-
-
-@app.get("/maps/autocomplete")
-async def autocomplete(input: str = Query(...)):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://maps.googleapis.com/maps/api/place/autocomplete/json",
-            params={
-                "input": input,
-                "types": "address",
-                "components": "country:us",
-                "key": settings.GOOGLE_MAPS_API_KEY,
-            },
-        )
-    return res.json()
-
-
-@app.get("/maps/place-details")
-async def place_details(place_id: str = Query(...)):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://maps.googleapis.com/maps/api/place/details/json",
-            params={
-                "place_id": place_id,
-                "fields": "address_components,geometry",
-                "key": settings.GOOGLE_MAPS_API_KEY,
-            },
-        )
-    return res.json()
-
-
-@app.get("/maps/nearby-lakes")
-async def nearby_lakes(lat: float = Query(...), lng: float = Query(...)):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            "https://maps.googleapis.com/maps/api/place/nearbysearch/json",
-            params={
-                "location": f"{lat},{lng}",
-                "rankby": "distance",
-                "type": "natural_feature",
-                "keyword": "lake",
-                "key": settings.GOOGLE_MAPS_API_KEY,
-            },
-        )
-    data = res.json()
-    return {"results": (data.get("results") or [])[:5]}
-
-
 # Profiles are now handled by posts_items_router
 
 
@@ -141,30 +151,36 @@ class RegisterRequest(BaseModel):
     items: list[dict] | None = None
     is_business: bool = False
     business_name: str | None = None
+    # Coordinates of the address, from /maps/place-details
+    lat: float | None = Field(None, ge=-90, le=90)
+    lng: float | None = Field(None, ge=-180, le=180)
 
 
 @app.post("/register")
-async def register(body: RegisterRequest, db: Session = Depends(get_db)):
+async def register(
+    body: RegisterRequest,
+    db: Session = Depends(get_db),
+    client: httpx.AsyncClient = Depends(get_http_client),
+):
     # Create auth user via Supabase Admin REST API
-    async with httpx.AsyncClient() as client:
-        res = await client.post(
-            f"{settings.SUPABASE_URL}/auth/v1/admin/users",
-            headers={
-                "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
-                "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "email": body.email,
-                "password": body.password,
-                "email_confirm": True,
-            },
+    res = await client.post(
+        f"{settings.SUPABASE_URL}/auth/v1/admin/users",
+        headers={
+            "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
+            "Content-Type": "application/json",
+        },
+        json={
+            "email": body.email,
+            "password": body.password,
+            "email_confirm": True,
+        },
+    )
+    if res.status_code != 200:
+        raise HTTPException(
+            status_code=400, detail=res.json().get("msg", "Failed to create user")
         )
-        if res.status_code != 200:
-            raise HTTPException(
-                status_code=400, detail=res.json().get("msg", "Failed to create user")
-            )
-        user_id = res.json()["id"]
+    user_id = res.json()["id"]
 
     # Create profile (no community string column)
     profile = Profile(
@@ -176,6 +192,8 @@ async def register(body: RegisterRequest, db: Session = Depends(get_db)):
         profile_image_url=body.profile_image_url,
         is_business=body.is_business,
         business_name=body.business_name if body.is_business else None,
+        lat=body.lat,
+        lng=body.lng,
     )
     db.add(profile)
     db.flush()  # get profile.id into session before linking community
@@ -187,6 +205,15 @@ async def register(body: RegisterRequest, db: Session = Depends(get_db)):
             community = Community(name=body.community, lake_name=body.community)
             db.add(community)
             db.flush()
+        if community.lat is None and body.lat is not None and body.lng is not None:
+            # The lake was picked from /maps/nearby-lakes, so the right point
+            # is the one near the registrant; fall back to their location
+            # when the gazetteer has no point for it in range
+            lake = lake_gazetteer.locate(community.lake_name or community.name, body.lat, body.lng)
+            if lake and haversine_km(body.lat, body.lng, lake.lat, lake.lng) <= settings.LAKES_MAX_DISTANCE_KM:
+                community.lat, community.lng = lake.lat, lake.lng
+            else:
+                community.lat, community.lng = body.lat, body.lng
         profile.communities.append(community)
 
     # Create items
@@ -210,15 +237,16 @@ async def register(body: RegisterRequest, db: Session = Depends(get_db)):
 
 
 @app.get("/check-email")
-async def check_email(email: str = Query(...)):
-    async with httpx.AsyncClient() as client:
-        res = await client.get(
-            f"{settings.SUPABASE_URL}/auth/v1/admin/users",
-            headers={
-                "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
-                "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-            },
-            params={"filter": f"email.eq.{email}"},
-        )
+async def check_email(
+    email: str = Query(...), client: httpx.AsyncClient = Depends(get_http_client)
+):
+    res = await client.get(
+        f"{settings.SUPABASE_URL}/auth/v1/admin/users",
+        headers={
+            "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
+            "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
+        },
+        params={"filter": f"email.eq.{email}"},
+    )
     users = res.json().get("users", [])
     return {"taken": len(users) > 0}
@@ -3,36 +3,54 @@ routers/ads.py
 ──────────────
 Endpoints for business ad requests and approval flow.
 
-  POST   /ads                    – Business submits an ad (→ email to admin)
-  GET    /ads                    – Returns all APPROVED ads (for feed injection)
+  POST   /ads                    – Business submits an ad (→ queued email to admin)
+  GET    /ads                    – Returns APPROVED ads, newest first (for feed injection)
   GET    /ads/mine               – Returns current business user's ads
   POST   /ads/{id}/approve       – Admin approves ad (secured by ADMIN_SECRET)
   POST   /ads/{id}/reject        – Admin rejects ad (secured by ADMIN_SECRET)
+
+The approved-ads feed is requested on every feed load, so each page is
+serialized once and kept in ads_cache until an ad is submitted, approved or
+rejected (or ADS_CACHE_TTL_SECONDS passes, which bounds staleness on other
+workers). Responses carry an ETag so unchanged feeds revalidate with a 304.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from pydantic import BaseModel
 from typing import Optional
+import hashlib
+import json
+import logging
 import uuid
 from datetime import datetime, timezone
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db.models import Ad, AdStatus, AdType, Profile
-from app.core.auth import get_current_user
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.dependencies import get_or_create_profile, requires_admin
+from app.core.etag import etag_matches
+from app.core.media import public_url, store_data_uri
+from app.core.outbox import enqueue_email, outbox_worker
+from app.dependencies import get_current_profile, requires_admin
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# page size -> (etag, serialized JSON body)
+ads_cache = TTLCache(maxsize=16, ttl=settings.ADS_CACHE_TTL_SECONDS)
+
 
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 
-def send_approval_email(ad: Ad, owner: Profile):
-    """Send an approval-request email to the admin via Resend."""
+def queue_approval_email(db: AsyncSession, ad: Ad, owner: Profile):
+    """Queue an approval-request email to the admin (delivered by core/outbox.py)."""
     if not settings.RESEND_API_KEY:
-        print(f"[DEBUG] RESEND_API_KEY not configured, skipping email")
+        logger.debug("RESEND_API_KEY not configured, skipping email")
         return
 
     admin_email = settings.ADMIN_EMAIL
@@ -60,29 +78,12 @@ def send_approval_email(ad: Ad, owner: Profile):
     <small>Ad ID: {ad.id}</small>
     """
 
-    try:
-        import resend
-
-        resend.api_key = settings.RESEND_API_KEY
-
-        # Use Resend's default onresend.dev domain (or verify your own in Resend dashboard)
-        email = resend.Emails.send(
-            {
-                "from": "onboarding@resend.dev",  # Default Resend domain - change after verifying your domain
-                "to": admin_email,
-                "subject": f"[Ad Request] [{ad.ad_type.value.upper()}] {ad.title}",
-                "html": html,
-            }
-        )
-        print(f"[DEBUG] Email sent successfully. Response: {email}")
-    except Exception as e:
-        print(f"[ERROR] Failed to send approval email: {str(e)}")
-        import traceback
-
-        traceback.print_exc()
-        print(
-            f"[DEBUG] RESEND_API_KEY: {'SET' if settings.RESEND_API_KEY else 'NOT SET'}, ADMIN_EMAIL: {admin_email}"
-        )
+    enqueue_email(
+        db,
+        to=admin_email,
+        subject=f"[Ad Request] [{ad.ad_type.value.upper()}] {ad.title}",
+        html=html,
+    )
 
 
 # ─── Schemas ──────────────────────────────────────────────────────────────────
@@ -92,7 +93,7 @@ class AdCreate(BaseModel):
     title: str
     body: str
     ad_type: Optional[str] = "post"  # "post" | "marketplace"
-    image: Optional[str] = None
+    image: Optional[str] = None  # base64 data-URI or URL
     link_url: Optional[str] = None
 
 
@@ -116,12 +117,11 @@ class AdOut(BaseModel):
 
 
 @router.post("/ads", response_model=AdOut, status_code=status.HTTP_201_CREATED)
-def submit_ad(
+async def submit_ad(
     body: AdCreate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    owner: Profile = Depends(get_current_profile),
 ):
-    owner = get_or_create_profile(user, db)
     if not owner.is_business:
         raise HTTPException(
             status_code=403,
@@ -139,64 +139,70 @@ def submit_ad(
         title=body.title,
         body=body.body,
         ad_type=atype,
-        image=body.image,
+        image=await run_in_threadpool(store_data_uri, body.image),
         link_url=body.link_url,
         status=AdStatus.PENDING,
     )
     db.add(ad)
-    db.commit()
-    db.refresh(ad)
-
-    # Fire off the approval email (non-blocking; errors are logged not raised)
-    send_approval_email(ad, owner)
+    await db.flush()
+    # Committed together with the ad; sent in the background by the outbox worker
+    queue_approval_email(db, ad, owner)
+    await db.commit()
+    await db.refresh(ad)
+    ads_cache.clear()
+    outbox_worker.wake()
 
     return _ad_out(ad, owner)
 
 
 @router.get("/ads", response_model=list[AdOut])
-def list_approved_ads(
-    db: Session = Depends(get_db),
+async def list_approved_ads(
+    request: Request,
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Returns all approved ads — used by the frontend to inject into feeds."""
-    ads = (
-        db.query(Ad)
-        .filter(Ad.status == AdStatus.APPROVED)
-        .order_by(Ad.approved_at.desc())
-        .all()
-    )
-    results = []
-    for ad in ads:
-        owner = db.query(Profile).filter(Profile.id == ad.owner_id).first()
-        results.append(_ad_out(ad, owner))
-    return results
+    """Returns the newest approved ads — used by the frontend to inject into feeds."""
+    cached = ads_cache.get(limit)
+    if cached is None:
+        ads = await db.scalars(
+            select(Ad)
+            .options(joinedload(Ad.owner))
+            .where(Ad.status == AdStatus.APPROVED)
+            .order_by(Ad.approved_at.desc())
+            .limit(limit)
+        )
+        body = json.dumps([_ad_out(ad, ad.owner) for ad in ads]).encode()
+        cached = (f'"{hashlib.sha256(body).hexdigest()[:32]}"', body)
+        ads_cache.set(limit, cached)
+
+    etag, body = cached
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/ads/mine", response_model=list[AdOut])
-def list_my_ads(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+async def list_my_ads(
+    db: AsyncSession = Depends(get_async_db),
+    owner: Profile = Depends(get_current_profile),
 ):
     """Business user can check the status of their own ads."""
-    owner = get_or_create_profile(user, db)
-    ads = (
-        db.query(Ad)
-        .filter(Ad.owner_id == owner.id)
-        .order_by(Ad.created_at.desc())
-        .all()
+    ads = await db.scalars(
+        select(Ad).where(Ad.owner_id == owner.id).order_by(Ad.created_at.desc())
     )
     return [_ad_out(ad, owner) for ad in ads]
 
 
 @router.post("/ads/{ad_id}/approve", status_code=status.HTTP_200_OK)
-def approve_ad(
+async def approve_ad(
     ad_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(requires_admin),
 ):
     """Admin-only endpoint. Secured by JWT admin role."""
-
     try:
-        ad = db.query(Ad).filter(Ad.id == uuid.UUID(ad_id)).first()
+        ad = await db.get(Ad, uuid.UUID(ad_id))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ad_id")
 
@@ -205,20 +211,20 @@ def approve_ad(
 
     ad.status = AdStatus.APPROVED
     ad.approved_at = datetime.now(timezone.utc)
-    db.commit()
+    await db.commit()
+    ads_cache.clear()
     return {"message": "Ad approved", "ad_id": ad_id}
 
 
 @router.post("/ads/{ad_id}/reject", status_code=status.HTTP_200_OK)
-def reject_ad(
+async def reject_ad(
     ad_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     _=Depends(requires_admin),
 ):
     """Admin-only endpoint. Secured by JWT admin role."""
-
     try:
-        ad = db.query(Ad).filter(Ad.id == uuid.UUID(ad_id)).first()
+        ad = await db.get(Ad, uuid.UUID(ad_id))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid ad_id")
 
@@ -226,7 +232,8 @@ def reject_ad(
         raise HTTPException(status_code=404, detail="Ad not found")
 
     ad.status = AdStatus.REJECTED
-    db.commit()
+    await db.commit()
+    ads_cache.clear()
     return {"message": "Ad rejected", "ad_id": ad_id}
 
 
@@ -239,7 +246,7 @@ def _ad_out(ad: Ad, owner: Optional[Profile]) -> dict:
         "title": ad.title,
         "body": ad.body,
         "ad_type": ad.ad_type.value if ad.ad_type else None,
-        "image": ad.image,
+        "image": public_url(ad.image),
         "link_url": ad.link_url,
         "status": ad.status.value if ad.status else "pending",
         "owner_username": owner.username if owner else "unknown",
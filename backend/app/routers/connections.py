@@ -3,44 +3,86 @@ routers/connections.py
 ──────────────────────
 GET    /connections              – list accepted connections
 GET    /connections/requests     – list incoming pending requests
+GET    /connections/suggestions  – people you may know (friends of friends)
+GET    /connections/mutual/{user_id} – connections shared with another user
+GET    /connections/status/{user_id} – connection status with one user
+POST   /connections/status       – statuses for a list of user ids
 POST   /connections/{user_id}    – send a connection request
 PATCH  /connections/{user_id}    – accept or decline a request
 DELETE /connections/{user_id}    – cancel sent request or remove connection
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, func, or_, select, tuple_, union_all
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
 from typing import Optional
 import uuid
 
-from app.db.session import get_db
-from app.db.models import Profile, connections
-from app.core.auth import get_current_user
-from app.routers.posts_items import get_or_create_profile
+from app.db.session import get_async_db
+from app.db.models import Profile, connections, ordered_pair
+from app.dependencies import get_current_profile_id
 
 router = APIRouter(prefix="/connections", tags=["connections"])
 
 
+class StatusLookup(BaseModel):
+    user_ids: list[str] = Field(..., max_length=200)
+
+
 # ─── Helpers ──────────────────────────────────────────────────────────────────
 
 
-def get_connection_row(db: Session, user_a_id, user_b_id):
+def pair_clause(x: uuid.UUID, y: uuid.UUID):
+    """Primary-key match for the connection row between two users."""
+    user_a, user_b = ordered_pair(x, y)
+    return and_(connections.c.user_a_id == user_a, connections.c.user_b_id == user_b)
+
+
+async def get_connection_row(db: AsyncSession, user_a_id, user_b_id):
     """Return the connection row between two users regardless of direction."""
-    return db.execute(
-        connections.select().where(
-            or_(
-                and_(
-                    connections.c.requester_id == user_a_id,
-                    connections.c.requestee_id == user_b_id,
-                ),
-                and_(
-                    connections.c.requester_id == user_b_id,
-                    connections.c.requestee_id == user_a_id,
-                ),
-            )
-        )
-    ).fetchone()
+    result = await db.execute(connections.select().where(pair_clause(user_a_id, user_b_id)))
+    return result.fetchone()
+
+
+def connected_ids(profile_id: uuid.UUID, state: str):
+    """
+    Subquery of the ids on the other end of `profile_id`'s connections with
+    status `state`. Each side of the pair is its own SELECT so both can use
+    the (user_a_id, status) / (user_b_id, status) indexes.
+    """
+    c = connections.c
+    return union_all(
+        select(c.user_b_id.label("id")).where(c.user_a_id == profile_id, c.status == state),
+        select(c.user_a_id.label("id")).where(c.user_b_id == profile_id, c.status == state),
+    ).subquery()
+
+
+def related_ids(profile_id: uuid.UUID):
+    """Ids with any connection row to `profile_id` (pending or accepted)."""
+    c = connections.c
+    return union_all(
+        select(c.user_b_id).where(c.user_a_id == profile_id),
+        select(c.user_a_id).where(c.user_b_id == profile_id),
+    )
+
+
+def other_id(row, profile_id: uuid.UUID) -> uuid.UUID:
+    return row.user_b_id if row.user_a_id == profile_id else row.user_a_id
+
+
+def status_from_row(row, profile_id: uuid.UUID) -> str:
+    """Map a connection row (or None) to the status seen by profile_id."""
+    if row is None:
+        return "none"
+    if row.status == "accepted":
+        return "accepted"
+    if row.status == "pending":
+        if row.requester_id == profile_id:
+            return "pending_sent"
+        return "pending_received"
+    return "none"
 
 
 def profile_to_dict(p: Profile) -> dict:
@@ -57,215 +99,241 @@ def profile_to_dict(p: Profile) -> dict:
 
 
 @router.get("")
-def list_connections(
+async def list_connections(
     q: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    """Return all accepted connections for the current user."""
-    profile = get_or_create_profile(user, db)
-
-    rows = db.execute(
-        connections.select().where(
-            and_(
-                or_(
-                    connections.c.requester_id == profile.id,
-                    connections.c.requestee_id == profile.id,
-                ),
-                connections.c.status == "accepted",
+    """Return all accepted connections for the current user, optionally filtered by q."""
+    other_ids = connected_ids(profile_id, "accepted")
+    query = select(Profile).join(other_ids, Profile.id == other_ids.c.id)
+    if q and q.strip():
+        query = query.where(
+            or_(
+                Profile.username.icontains(q, autoescape=True),
+                Profile.bio.icontains(q, autoescape=True),
             )
         )
-    ).fetchall()
-
-    result = []
-    for row in rows:
-        other_id = (
-            row.requestee_id if row.requester_id == profile.id else row.requester_id
-        )
-        other = db.query(Profile).filter(Profile.id == other_id).first()
-        if not other:
-            continue
-        if q and q.strip():
-            ql = q.lower()
-            if ql not in other.username.lower() and ql not in (other.bio or "").lower():
-                continue
-        result.append(profile_to_dict(other))
 
-    return result
+    others = await db.scalars(query.order_by(Profile.username))
+    return [profile_to_dict(other) for other in others]
 
 
 @router.get("/requests")
-def list_requests(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+async def list_requests(
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    """Return all incoming pending requests."""
-    profile = get_or_create_profile(user, db)
-
-    rows = db.execute(
-        connections.select().where(
-            and_(
-                connections.c.requestee_id == profile.id,
-                connections.c.status == "pending",
-            )
+    """Return all incoming pending requests, newest first."""
+    c = connections.c
+    requesters = await db.scalars(
+        select(Profile)
+        .join(connections, c.requester_id == Profile.id)
+        .where(
+            or_(c.user_a_id == profile_id, c.user_b_id == profile_id),
+            c.requester_id != profile_id,
+            c.status == "pending",
         )
-    ).fetchall()
+        .order_by(c.created_at.desc())
+    )
+    return [profile_to_dict(requester) for requester in requesters]
 
-    result = []
-    for row in rows:
-        requester = db.query(Profile).filter(Profile.id == row.requester_id).first()
-        if requester:
-            result.append(profile_to_dict(requester))
 
-    return result
+@router.get("/suggestions")
+async def list_suggestions(
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
+):
+    """
+    People you may know: connections of your connections, ranked by how many
+    connections you share. Anyone you are already connected to or have a
+    pending request with is left out.
+    """
+    friends = connected_ids(profile_id, "accepted")
+    c = connections.alias("hop")
+    # Second hop, once per side so both can use the (user_x_id, status) indexes
+    hops = union_all(
+        select(c.c.user_b_id.label("id"), c.c.user_a_id.label("via"))
+        .join(friends, c.c.user_a_id == friends.c.id)
+        .where(c.c.status == "accepted"),
+        select(c.c.user_a_id.label("id"), c.c.user_b_id.label("via"))
+        .join(friends, c.c.user_b_id == friends.c.id)
+        .where(c.c.status == "accepted"),
+    ).subquery()
+    # Rank candidate ids first so only the top `limit` profiles are loaded
+    mutual_count = func.count(hops.c.via).label("mutual_count")
+    ranked = (
+        select(hops.c.id, mutual_count)
+        .where(hops.c.id != profile_id, hops.c.id.not_in(related_ids(profile_id)))
+        .group_by(hops.c.id)
+        .order_by(mutual_count.desc(), hops.c.id)
+        .limit(limit)
+        .subquery()
+    )
+
+    rows = (await db.execute(
+        select(Profile, ranked.c.mutual_count)
+        .join(ranked, Profile.id == ranked.c.id)
+        .order_by(ranked.c.mutual_count.desc(), Profile.username)
+    )).all()
+    return [{**profile_to_dict(p), "mutual_count": count} for p, count in rows]
+
+
+@router.get("/mutual/{user_id}")
+async def list_mutual_connections(
+    user_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
+):
+    """Return the accepted connections the current user shares with user_id."""
+    try:
+        target_uuid = uuid.UUID(user_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user_id")
+
+    mine = connected_ids(profile_id, "accepted")
+    theirs = connected_ids(target_uuid, "accepted")
+    mutual = await db.scalars(
+        select(Profile)
+        .join(mine, Profile.id == mine.c.id)
+        .join(theirs, Profile.id == theirs.c.id)
+        .order_by(Profile.username)
+    )
+    return [profile_to_dict(p) for p in mutual]
 
 
 @router.get("/status/{user_id}")
-def get_connection_status(
+async def get_connection_status(
     user_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
     """
     Return connection status between current user and target.
     Response: { status: 'none' | 'pending_sent' | 'pending_received' | 'accepted' }
     """
-    profile = get_or_create_profile(user, db)
     try:
         target_uuid = uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id")
 
-    row = get_connection_row(db, profile.id, target_uuid)
-    if not row:
-        return {"status": "none"}
+    row = await get_connection_row(db, profile_id, target_uuid)
+    return {"status": status_from_row(row, profile_id)}
 
-    if row.status == "accepted":
-        return {"status": "accepted"}
 
-    if row.status == "pending":
-        if row.requester_id == profile.id:
-            return {"status": "pending_sent"}
-        return {"status": "pending_received"}
+@router.post("/status")
+async def get_connection_statuses(
+    body: StatusLookup,
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
+):
+    """
+    Bulk version of GET /status/{user_id} for lists of user cards.
+    Response: { statuses: { <user_id>: 'none' | 'pending_sent' | ... } }
+    """
+    try:
+        target_ids = {uuid.UUID(user_id) for user_id in body.user_ids}
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid user_id")
 
-    return {"status": "none"}
+    # Each pair is a primary-key probe; tuple IN keeps it to one statement
+    pairs = [ordered_pair(profile_id, target_id) for target_id in target_ids]
+    rows = []
+    if pairs:
+        c = connections.c
+        rows = (await db.execute(
+            connections.select().where(tuple_(c.user_a_id, c.user_b_id).in_(pairs))
+        )).fetchall()
+
+    statuses = {str(target_id): "none" for target_id in target_ids}
+    for row in rows:
+        statuses[str(other_id(row, profile_id))] = status_from_row(row, profile_id)
+    return {"statuses": statuses}
 
 
 @router.post("/{user_id}", status_code=status.HTTP_201_CREATED)
-def send_request(
+async def send_request(
     user_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
     """Send a connection request to another user."""
-    profile = get_or_create_profile(user, db)
     try:
         target_uuid = uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id")
-    if target_uuid == profile.id:
+    if target_uuid == profile_id:
         raise HTTPException(status_code=400, detail="Cannot connect with yourself")
 
-    target = db.query(Profile).filter(Profile.id == target_uuid).first()
+    target = await db.get(Profile, target_uuid)
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
 
-    existing = get_connection_row(db, profile.id, target_uuid)
+    existing = await get_connection_row(db, profile_id, target_uuid)
     if existing:
         raise HTTPException(status_code=409, detail="Connection already exists")
 
-    db.execute(
-        connections.insert().values(
-            requester_id=profile.id,
-            requestee_id=target_uuid,
-            status="pending",
+    user_a, user_b = ordered_pair(profile_id, target_uuid)
+    try:
+        await db.execute(
+            connections.insert().values(
+                user_a_id=user_a,
+                user_b_id=user_b,
+                requester_id=profile_id,
+                status="pending",
+            )
         )
-    )
-    db.commit()
+        await db.commit()
+    except IntegrityError:
+        # The other user sent a request to us at the same moment
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Connection already exists")
     return {"status": "pending_sent"}
 
 
 @router.patch("/{user_id}")
-def respond_to_request(
+async def respond_to_request(
     user_id: str,
     action: str = Query(...),  # "accept" | "decline"
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
     """Accept or decline an incoming request."""
-    profile = get_or_create_profile(user, db)
     try:
         requester_uuid = uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id")
 
-    row = db.execute(
-        connections.select().where(
-            and_(
-                connections.c.requester_id == requester_uuid,
-                connections.c.requestee_id == profile.id,
-                connections.c.status == "pending",
-            )
-        )
-    ).fetchone()
-
-    if not row:
+    pair = pair_clause(profile_id, requester_uuid)
+    row = await get_connection_row(db, profile_id, requester_uuid)
+    if not row or row.status != "pending" or row.requester_id != requester_uuid:
         raise HTTPException(status_code=404, detail="No pending request found")
 
     if action == "accept":
-        db.execute(
-            connections.update()
-            .where(
-                and_(
-                    connections.c.requester_id == requester_uuid,
-                    connections.c.requestee_id == profile.id,
-                )
-            )
-            .values(status="accepted")
-        )
+        await db.execute(connections.update().where(pair).values(status="accepted"))
     else:
-        db.execute(
-            connections.delete().where(
-                and_(
-                    connections.c.requester_id == requester_uuid,
-                    connections.c.requestee_id == profile.id,
-                )
-            )
-        )
+        await db.execute(connections.delete().where(pair))
 
-    db.commit()
+    await db.commit()
     return {"status": "accepted" if action == "accept" else "declined"}
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_connection(
+async def remove_connection(
     user_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
     """Cancel a sent request or remove an accepted connection."""
-    profile = get_or_create_profile(user, db)
     try:
         target_uuid = uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id")
 
-    row = get_connection_row(db, profile.id, target_uuid)
+    row = await get_connection_row(db, profile_id, target_uuid)
     if not row:
         raise HTTPException(status_code=404, detail="No connection found")
 
-    db.execute(
-        connections.delete().where(
-            or_(
-                and_(
-                    connections.c.requester_id == profile.id,
-                    connections.c.requestee_id == target_uuid,
-                ),
-                and_(
-                    connections.c.requester_id == target_uuid,
-                    connections.c.requestee_id == profile.id,
-                ),
-            )
-        )
-    )
-    db.commit()
+    await db.execute(connections.delete().where(pair_clause(profile_id, target_uuid)))
+    await db.commit()
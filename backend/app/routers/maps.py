@@ -0,0 +1,332 @@
+"""
+routers/maps.py
+───────────────
+Caching proxy for the Google Places API.
+
+  GET /maps/autocomplete?input=     – address suggestions (called per keystroke)
+  GET /maps/place-details?place_id= – address components + geometry
+  GET /maps/nearby-lakes?lat=&lng=  – five closest lakes, with their community
+
+Nearby lakes come from the bundled gazetteer in core/lakes.py. The gazetteer
+only lists the larger lakes, so when none of its points is within
+LAKES_LOCAL_MATCH_KM (the caller may live on a lake it lacks, or outside
+Michigan) Google is asked as well, if LAKES_GOOGLE_FALLBACK is on, and the
+closest lakes from both are returned, one per name. Each result carries
+community_id / community_name for the community whose lake_name matches it
+("Lake X" and "X Lake" are treated as the same name), or null. Names are
+not unique (Michigan has several Portage Lakes), so a community with a
+location only matches a result within LAKES_LINK_RADIUS_KM of it, the
+nearest one winning. One without a location only matches when the
+gazetteer lists a single point for its lake.
+
+The same lookups repeat across keystrokes and users, so successful responses
+("OK" / "ZERO_RESULTS") are kept in maps_cache, an LRU bounded by
+MAPS_CACHE_SIZE whose entries expire after MAPS_CACHE_TTL_SECONDS. Keys use
+normalized parameters: autocomplete input is lower-cased with whitespace
+collapsed, and nearby-lakes coordinates are rounded to MAPS_NEARBY_PRECISION
+decimal places (the rounded point is what gets sent to Google, so a cached
+answer is the same one any caller in that cell would get).
+
+Identical lookups that arrive while one is already in flight wait for it
+instead of calling Google again. With MAPS_CACHE_PERSIST enabled, responses
+are also written to the maps_cache table and read back on an in-memory miss,
+so a restart or another worker does not start cold.
+"""
+
+import asyncio
+import logging
+import re
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+import httpx
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.geo import haversine_km
+from app.core.http import get_http_client
+from app.core.lakes import lake_gazetteer, lake_name_variants
+from app.db.models import Community, MapsCacheEntry
+from app.db.session import AsyncSessionLocal, get_async_db
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/maps", tags=["maps"])
+
+PLACES_API_URL = "https://maps.googleapis.com/maps/api/place"
+CACHEABLE_STATUSES = {"OK", "ZERO_RESULTS"}
+NEARBY_LAKES_LIMIT = 5
+
+maps_cache = TTLCache(maxsize=settings.MAPS_CACHE_SIZE, ttl=settings.MAPS_CACHE_TTL_SECONDS)
+_inflight: dict[str, asyncio.Task] = {}
+_counters = {"coalesced": 0, "persisted_hits": 0}
+
+
+def cache_stats() -> dict:
+    return {**maps_cache.stats(), **_counters, "inflight": len(_inflight)}
+
+
+# ─── Cache ────────────────────────────────────────────────────────────────────
+
+
+async def _read_persisted(key: str) -> tuple[dict, float] | None:
+    try:
+        async with AsyncSessionLocal() as db:
+            row = (await db.execute(
+                select(
+                    MapsCacheEntry.value,
+                    func.extract("epoch", MapsCacheEntry.expires_at - func.now()),
+                ).where(MapsCacheEntry.key == key, MapsCacheEntry.expires_at > func.now())
+            )).first()
+    except SQLAlchemyError as e:
+        logger.warning("Reading maps cache entry failed: %s", e)
+        return None
+    return (row[0], float(row[1])) if row else None
+
+
+async def _persist(key: str, value: dict) -> None:
+    expires_at = func.now() + timedelta(seconds=settings.MAPS_CACHE_TTL_SECONDS)
+    stmt = insert(MapsCacheEntry).values(key=key, value=value, expires_at=expires_at)
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[MapsCacheEntry.key],
+                    set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+                )
+            )
+            await db.commit()
+    except SQLAlchemyError as e:
+        logger.warning("Persisting maps cache entry failed: %s", e)
+
+
+async def prune_persisted_cache() -> None:
+    """Delete expired maps_cache rows; called once at startup."""
+    if not settings.MAPS_CACHE_PERSIST:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                delete(MapsCacheEntry).where(MapsCacheEntry.expires_at <= func.now())
+            )
+            await db.commit()
+    except SQLAlchemyError as e:
+        logger.warning("Pruning maps cache failed: %s", e)
+        return
+    logger.info("Pruned %s expired maps cache entries", result.rowcount)
+
+
+async def _load(key: str, fetch: Callable[[], Awaitable[tuple[dict, bool]]]) -> dict:
+    if settings.MAPS_CACHE_PERSIST:
+        persisted = await _read_persisted(key)
+        if persisted is not None:
+            value, remaining = persisted
+            _counters["persisted_hits"] += 1
+            maps_cache.set(key, value, ttl=remaining)
+            return value
+
+    value, cacheable = await fetch()
+    if cacheable:
+        maps_cache.set(key, value)
+        if settings.MAPS_CACHE_PERSIST:
+            await _persist(key, value)
+    return value
+
+
+async def cached(key: str, fetch: Callable[[], Awaitable[tuple[dict, bool]]]) -> dict:
+    """
+    Return the cached response for `key`, or run `fetch` (at most once at a
+    time per key). `fetch` returns the response and whether it may be cached.
+    """
+    value = maps_cache.get(key)
+    if value is not None:
+        return value
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(_load(key, fetch))
+        _inflight[key] = task
+
+        def _done(t: asyncio.Task) -> None:
+            _inflight.pop(key, None)
+            # Every waiter may have disconnected; retrieve the error anyway
+            t.cancelled() or t.exception()
+
+        task.add_done_callback(_done)
+    else:
+        _counters["coalesced"] += 1
+    # A client disconnecting must not cancel the lookup other callers share
+    return await asyncio.shield(task)
+
+
+async def _places_get(client: httpx.AsyncClient, endpoint: str, params: dict) -> dict:
+    res = await client.get(
+        f"{PLACES_API_URL}/{endpoint}/json",
+        params={**params, "key": settings.GOOGLE_MAPS_API_KEY},
+    )
+    return res.json()
+
+
+def _is_cacheable(data: dict) -> bool:
+    return data.get("status") in CACHEABLE_STATUSES
+
+
+# ─── Routes ───────────────────────────────────────────────────────────────────
+
+
+@router.get("/autocomplete")
+async def autocomplete(
+    input: str = Query(...), client: httpx.AsyncClient = Depends(get_http_client)
+):
+    normalized = re.sub(r"\s+", " ", input).strip().lower()
+
+    async def fetch():
+        data = await _places_get(
+            client,
+            "autocomplete",
+            {"input": normalized, "types": "address", "components": "country:us"},
+        )
+        return data, _is_cacheable(data)
+
+    return await cached(f"autocomplete:{normalized}", fetch)
+
+
+@router.get("/place-details")
+async def place_details(
+    place_id: str = Query(...), client: httpx.AsyncClient = Depends(get_http_client)
+):
+    async def fetch():
+        data = await _places_get(
+            client,
+            "details",
+            {"place_id": place_id, "fields": "address_components,geometry"},
+        )
+        return data, _is_cacheable(data)
+
+    return await cached(f"details:{place_id}", fetch)
+
+
+def _pick_community(result: dict, candidates: list) -> tuple:
+    """(id, name) of the community on the result's lake, or (None, None)."""
+    location = result.get("geometry", {}).get("location") or {}
+    lat, lng = location.get("lat"), location.get("lng")
+    if lat is not None and lng is not None:
+        located = [
+            (haversine_km(lat, lng, c.lat, c.lng), c)
+            for c in candidates
+            if c.lat is not None and c.lng is not None
+        ]
+        near = [(km, c) for km, c in located if km <= settings.LAKES_LINK_RADIUS_KM]
+        if near:
+            _, community = min(near, key=lambda entry: entry[0])
+            return community.id, community.name
+
+    if lake_gazetteer.unique_point(result.get("name", "")) is None:
+        return None, None
+    # Candidates are ordered to prefer the community named after the lake
+    unlocated = (c for c in candidates if c.lat is None or c.lng is None)
+    community = next(unlocated, None)
+    return (community.id, community.name) if community else (None, None)
+
+
+async def _link_communities(db: AsyncSession, results: list[dict]) -> None:
+    """Attach the community on each result's lake, if any."""
+    variants = {v for r in results for v in lake_name_variants(r.get("name", ""))}
+    by_lake: dict[str, list] = {}
+    if variants:
+        lake_name = func.lower(Community.lake_name).label("lake")
+        rows = await db.execute(
+            select(Community.id, Community.name, Community.lat, Community.lng, lake_name)
+            .where(lake_name.in_(variants))
+            .order_by((func.lower(Community.name) == lake_name).desc(), Community.name)
+        )
+        for row in rows:
+            by_lake.setdefault(row.lake, []).append(row)
+
+    for result in results:
+        candidates = [
+            row
+            for v in lake_name_variants(result.get("name", ""))
+            for row in by_lake.get(v, ())
+        ]
+        result["community_id"], result["community_name"] = _pick_community(result, candidates)
+
+
+async def _google_nearby_lakes(client: httpx.AsyncClient, lat: float, lng: float) -> list[dict]:
+    lat = round(lat, settings.MAPS_NEARBY_PRECISION)
+    lng = round(lng, settings.MAPS_NEARBY_PRECISION)
+
+    async def fetch():
+        data = await _places_get(
+            client,
+            "nearbysearch",
+            {
+                "location": f"{lat},{lng}",
+                "rankby": "distance",
+                "type": "natural_feature",
+                "keyword": "lake",
+            },
+        )
+        return {"results": (data.get("results") or [])[:NEARBY_LAKES_LIMIT]}, _is_cacheable(data)
+
+    cached_response = await cached(f"nearby:{lat},{lng}", fetch)
+    # Copy so linking communities does not modify the cached entries
+    return [{**result, "source": "google"} for result in cached_response["results"]]
+
+
+def _merge_lakes(local: list[dict], google: list[dict], lat: float, lng: float) -> list[dict]:
+    """The NEARBY_LAKES_LIMIT closest of both lists, one entry per lake name."""
+    for result in google:
+        location = result.get("geometry", {}).get("location") or {}
+        if location.get("lat") is not None and location.get("lng") is not None:
+            result["distance_km"] = round(
+                haversine_km(lat, lng, location["lat"], location["lng"]), 2
+            )
+    by_name: dict[str, dict] = {}
+    for result in local + google:
+        if result.get("distance_km") is None:
+            continue
+        key = min(lake_name_variants(result.get("name", "")))
+        if key not in by_name or result["distance_km"] < by_name[key]["distance_km"]:
+            by_name[key] = result
+    merged = sorted(by_name.values(), key=lambda result: result["distance_km"])
+    return merged[:NEARBY_LAKES_LIMIT]
+
+
+@router.get("/nearby-lakes")
+async def nearby_lakes(
+    lat: float = Query(...),
+    lng: float = Query(...),
+    client: httpx.AsyncClient = Depends(get_http_client),
+    db: AsyncSession = Depends(get_async_db),
+):
+    results = [
+        {
+            "name": lake.name,
+            "geometry": {"location": {"lat": lake.lat, "lng": lake.lng}},
+            "distance_km": round(km, 2),
+            "source": "gazetteer",
+        }
+        for lake, km in lake_gazetteer.nearest(
+            lat, lng, NEARBY_LAKES_LIMIT, settings.LAKES_MAX_DISTANCE_KM
+        )
+    ]
+    # The bundled list misses most of Michigan's smaller lakes: unless the
+    # point is right by one it has, the caller may live on one it lacks
+    local_match = bool(results) and results[0]["distance_km"] <= settings.LAKES_LOCAL_MATCH_KM
+    if not local_match and settings.LAKES_GOOGLE_FALLBACK:
+        try:
+            google = await _google_nearby_lakes(client, lat, lng)
+        except httpx.HTTPError:
+            if not results:
+                raise
+            logger.warning("Google nearby-lakes lookup failed, using the gazetteer only")
+            google = []
+        results = _merge_lakes(results, google, lat, lng)
+
+    await _link_communities(db, results)
+    return {"results": results}
@@ -0,0 +1,58 @@
+"""
+routers/media.py
+────────────────
+GET /media/{key}   – serve a stored image blob
+
+Keys are content hashes, so a given URL never changes content and responses
+can be cached indefinitely by clients and CDNs. Rendition keys whose resize
+has not finished yet fall back to the original with a short max-age.
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from app.core.etag import etag_matches
+from app.core.media import EXTENSION_MIMES, is_valid_key, media_store
+from app.core.thumbnails import original_key
+
+router = APIRouter(tags=["media"])
+
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+FALLBACK_CACHE_CONTROL = "public, max-age=60"
+
+
+@router.get("/media/{key}")
+def get_media(key: str, request: Request):
+    if not is_valid_key(key):
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    etag = f'"{key.rsplit(".", 1)[0]}"'
+    if_none_match = request.headers.get("if-none-match")
+    # "*" matches any stored blob, and this answers before reading it
+    if etag_matches(if_none_match, etag) and (
+        if_none_match.strip() != "*" or media_store.exists(key)
+    ):
+        return Response(
+            status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        )
+
+    ext = key.rsplit(".", 1)[-1]
+    media_type = EXTENSION_MIMES.get(ext, "application/octet-stream")
+
+    data = media_store.read(key)
+    if data is None and key != original_key(key):
+        # Rendition not rendered (yet) – serve the original, briefly cached
+        data = media_store.read(original_key(key))
+        if data is not None:
+            return Response(
+                content=data,
+                media_type=media_type,
+                headers={"Cache-Control": FALLBACK_CACHE_CONTROL},
+            )
+    if data is None:
+        raise HTTPException(status_code=404, detail="Media not found")
+
+    return Response(
+        content=data,
+        media_type=media_type,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -1,16 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import case, func, or_, and_, desc, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, joinedload
 from pydantic import BaseModel
+from datetime import timedelta
+from typing import Optional
 import uuid
 
-from app.db.session import get_db
-from app.db.models import Profile, Message
-from app.core.auth import get_current_user
-from app.routers.posts_items import get_or_create_profile
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.db.models import Conversation, Profile, Message, ordered_pair
+from app.core.pagination import (
+    decode_sync_cursor,
+    encode_sync_cursor,
+    keyset_condition,
+    paginate,
+    set_next_cursor,
+)
+from app.core.realtime import publish_message
+from app.dependencies import get_current_profile_id
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
+SYNC_CURSOR_HEADER = "X-Sync-Cursor"
+
 class MessageCreate(BaseModel):
     content: str
 
@@ -25,115 +39,321 @@ class MessageOut(BaseModel):
     class Config:
         from_attributes = True
 
+
+def _message_out(m: Message) -> dict:
+    return {
+        "id": str(m.id),
+        "sender_id": str(m.sender_id),
+        "receiver_id": str(m.receiver_id),
+        "content": m.content,
+        "created_at": m.created_at.isoformat() if m.created_at else "",
+        "is_read": m.is_read
+    }
+
+
+async def _record_in_conversation(db: AsyncSession, msg: Message) -> None:
+    """
+    Upsert the pair's Conversation row for a newly flushed message: move the
+    last-message pointer forward and bump the receiver's unread count.
+    """
+    user_a, user_b = ordered_pair(msg.sender_id, msg.receiver_id)
+    to_a = int(msg.receiver_id == user_a)
+    stmt = insert(Conversation).values(
+        user_a_id=user_a,
+        user_b_id=user_b,
+        last_message_id=msg.id,
+        # Same transaction as the message, so this equals its created_at
+        last_message_at=func.now(),
+        unread_a=to_a,
+        unread_b=1 - to_a,
+    )
+    table, new = Conversation.__table__.c, stmt.excluded
+    is_newer = new.last_message_at >= table.last_message_at
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.user_a_id, table.user_b_id],
+        set_={
+            "last_message_id": case(
+                (is_newer, new.last_message_id), else_=table.last_message_id
+            ),
+            "last_message_at": func.greatest(table.last_message_at, new.last_message_at),
+            "unread_a": table.unread_a + new.unread_a,
+            "unread_b": table.unread_b + new.unread_b,
+        },
+    )
+    await db.execute(stmt)
+
+
+async def _mark_conversation_read(
+    db: AsyncSession, reader_id: uuid.UUID, other_id: uuid.UUID
+) -> None:
+    user_a, user_b = ordered_pair(reader_id, other_id)
+    unread = Conversation.unread_a if reader_id == user_a else Conversation.unread_b
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.user_a_id == user_a, Conversation.user_b_id == user_b)
+        .values({unread: 0})
+    )
+
+
 @router.post("/{receiver_id}", response_model=MessageOut)
-def send_message(
+async def send_message(
     receiver_id: str,
     message: MessageCreate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    sender = get_or_create_profile(user, db)
-    
     try:
         receiver_uuid = uuid.UUID(receiver_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid receiver_id")
         
-    if receiver_uuid == sender.id:
+    if receiver_uuid == profile_id:
         raise HTTPException(status_code=400, detail="Cannot message yourself")
 
-    receiver = db.query(Profile).filter(Profile.id == receiver_uuid).first()
+    receiver = await db.get(Profile, receiver_uuid)
     if not receiver:
         raise HTTPException(status_code=404, detail="Receiver not found")
 
     new_msg = Message(
-        sender_id=sender.id,
+        sender_id=profile_id,
         receiver_id=receiver_uuid,
         content=message.content,
     )
     db.add(new_msg)
-    db.commit()
-    db.refresh(new_msg)
-    
-    return {
-        "id": str(new_msg.id),
-        "sender_id": str(new_msg.sender_id),
-        "receiver_id": str(new_msg.receiver_id),
-        "content": new_msg.content,
-        "created_at": new_msg.created_at.isoformat() if new_msg.created_at else "",
-        "is_read": new_msg.is_read
-    }
+    await db.flush()
+    await db.refresh(new_msg)
+    await _record_in_conversation(db, new_msg)
+
+    out = _message_out(new_msg)
+    # Delivered to /ws/messages subscribers once this transaction commits
+    await publish_message(db, out)
+    await db.commit()
+    return out
+
+def _both_directions(profile_id, other_id, criteria: list, ascending: bool, limit: int):
+    """
+    The pair's messages as a UNION ALL of each direction, ordered by
+    (created_at, id) and cut to `limit` per side. Each side is a range scan of
+    ix_messages_sender_receiver_created_at_id that stops after `limit` rows;
+    an OR of the two directions makes Postgres read every match and sort.
+    Returns the select over the union and the alias its rows come from.
+    """
+    order = [Message.created_at, Message.id]
+    sides = [
+        select(Message)
+        .where(Message.sender_id == sender, Message.receiver_id == receiver, *criteria)
+        .order_by(*(col.asc() if ascending else col.desc() for col in order))
+        .limit(limit)
+        for sender, receiver in ((profile_id, other_id), (other_id, profile_id))
+    ]
+    page = aliased(Message, union_all(*sides).subquery())
+    return select(page), page
+
+
+def _sync_overlap() -> timedelta:
+    return timedelta(seconds=settings.MESSAGES_SYNC_OVERLAP_SECONDS)
+
+
+async def _sync_cursor(
+    db: AsyncSession, watermark, seen: set[uuid.UUID], messages: list[Message]
+) -> str:
+    """
+    Cursor after delivering `messages` (oldest first): the newest created_at
+    so far, plus every delivered id still inside the overlap window.
+    """
+    if messages:
+        watermark = max(watermark, messages[-1].created_at)
+    window_start = watermark - _sync_overlap()
+    still_seen = set()
+    if seen:
+        still_seen = set((await db.scalars(
+            select(Message.id).where(Message.id.in_(seen), Message.created_at > window_start)
+        )).all())
+    delivered = {m.id for m in messages if m.created_at > window_start}
+    return encode_sync_cursor(watermark, still_seen | delivered)
+
 
 @router.get("/{other_user_id}", response_model=list[MessageOut])
-def get_conversation(
+async def get_conversation(
     other_user_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    response: Response,
+    since: Optional[str] = None,
+    before: Optional[str] = None,
+    cursor: Optional[str] = None,  # older name for `before`
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
-    
+    """
+    Messages with another user, oldest-first within the page.
+
+    - no cursor: the newest `limit` messages
+    - ?before=<X-Next-Cursor>: the page of older messages before that one
+    - ?since=<X-Sync-Cursor>: only messages newer than the last sync
+
+    X-Sync-Cursor marks the newest message the client now has; it is set on
+    the first page and on every `since` response. A `since` response holding
+    `limit` messages may have more behind it, so clients sync again until a
+    shorter page comes back.
+
+    created_at is when the sender's transaction started, so a message can
+    commit after newer ones were already synced. `since` therefore re-reads
+    MESSAGES_SYNC_OVERLAP_SECONDS behind the cursor and skips the ids the
+    cursor says were delivered.
+    """
     try:
         other_uuid = uuid.UUID(other_user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid other_user_id")
+    before = before or cursor
+    if since and before:
+        raise HTTPException(status_code=400, detail="Use either since or before")
 
-    messages = db.query(Message).filter(
-        or_(
-            and_(Message.sender_id == profile.id, Message.receiver_id == other_uuid),
-            and_(Message.sender_id == other_uuid, Message.receiver_id == profile.id)
+    # Read receipts: one UPDATE for everything the other user sent us
+    marked = await db.execute(
+        update(Message)
+        .where(
+            Message.sender_id == other_uuid,
+            Message.receiver_id == profile_id,
+            Message.is_read.is_(False),
         )
-    ).order_by(Message.created_at.asc()).limit(100).all()
+        .values(is_read=True)
+        .execution_options(synchronize_session=False)
+    )
+    if marked.rowcount:
+        await _mark_conversation_read(db, profile_id, other_uuid)
+        await db.commit()
 
-    # Mark as read
-    unread = [m for m in messages if m.receiver_id == profile.id and not m.is_read]
-    if unread:
-        for m in unread:
-            m.is_read = True
-        db.commit()
+    if since:
+        watermark, seen = decode_sync_cursor(since)
+        criteria = [Message.created_at > watermark - _sync_overlap()]
+        if seen:
+            criteria.append(Message.id.not_in(seen))
+        query, page = _both_directions(profile_id, other_uuid, criteria, True, limit)
+        messages = (await db.scalars(
+            query.order_by(page.created_at, page.id).limit(limit)
+        )).all()
+        sync_cursor = await _sync_cursor(db, watermark, seen, messages)
+    else:
+        # Pages walk backwards from the newest message; X-Next-Cursor fetches older ones.
+        criteria = [keyset_condition(Message.created_at, Message.id, before)] if before else []
+        # One extra row per side, for paginate() to tell whether more pages exist
+        query, page = _both_directions(profile_id, other_uuid, criteria, False, limit + 1)
+        messages, next_cursor = await paginate(
+            db, query, page.created_at, page.id, None, limit
+        )
+        set_next_cursor(response, next_cursor)
+        # Each page is still returned oldest-first for display
+        messages.reverse()
+        sync_cursor = None
+        if not before and messages:
+            sync_cursor = await _sync_cursor(db, messages[-1].created_at, set(), messages)
 
-    results = []
-    for m in messages:
-        results.append({
+    if sync_cursor:
+        response.headers[SYNC_CURSOR_HEADER] = sync_cursor
+    return [_message_out(m) for m in messages]
+
+def _conversation_out(other_user: Profile, m: Message, unread_count: int) -> dict:
+    return {
+        "other_user_id": str(other_user.id),
+        "other_username": other_user.username,
+        "profile_image_url": other_user.profile_image_url or "",
+        "unread_count": unread_count,
+        "latest_message": {
             "id": str(m.id),
             "sender_id": str(m.sender_id),
-            "receiver_id": str(m.receiver_id),
             "content": m.content,
             "created_at": m.created_at.isoformat() if m.created_at else "",
             "is_read": m.is_read
-        })
+        }
+    }
+
+
+async def _inbox_from_summary(db: AsyncSession, profile_id: uuid.UUID) -> list[dict]:
+    """One row per partner from the conversations summary table."""
+    is_a = Conversation.user_a_id == profile_id
+    other_id = case((is_a, Conversation.user_b_id), else_=Conversation.user_a_id)
+    unread = case((is_a, Conversation.unread_a), else_=Conversation.unread_b)
+    rows = (await db.execute(
+        select(Conversation, Profile, unread)
+        .join(Profile, Profile.id == other_id)
+        .options(joinedload(Conversation.last_message))
+        .where(or_(is_a, Conversation.user_b_id == profile_id))
+        .order_by(Conversation.last_message_at.desc())
+    )).all()
+    return [
+        _conversation_out(other_user, convo.last_message, unread_count)
+        for convo, other_user, unread_count in rows
+    ]
+
+
+async def _inbox_distinct_on(db: AsyncSession, profile_id: uuid.UUID) -> list[dict]:
+    """
+    Latest message per pair picked by DISTINCT ON over the user's messages,
+    with unread counts from a window over the same pair, in one statement.
+    """
+    pair = (
+        func.least(Message.sender_id, Message.receiver_id),
+        func.greatest(Message.sender_id, Message.receiver_id),
+    )
+    other_id = case(
+        (Message.sender_id == profile_id, Message.receiver_id),
+        else_=Message.sender_id,
+    )
+    unread = func.count().filter(
+        and_(Message.receiver_id == profile_id, Message.is_read.is_(False))
+    ).over(partition_by=pair)
+    latest = (
+        select(Message.id, other_id.label("other_id"), unread.label("unread"))
+        .where(or_(Message.sender_id == profile_id, Message.receiver_id == profile_id))
+        .distinct(*pair)
+        .order_by(*pair, Message.created_at.desc(), Message.id.desc())
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(Message, Profile, latest.c.unread)
+        .join(latest, Message.id == latest.c.id)
+        .join(Profile, Profile.id == latest.c.other_id)
+        .order_by(Message.created_at.desc())
+    )).all()
+    return [_conversation_out(other_user, m, unread_count) for m, other_user, unread_count in rows]
+
+
+async def _inbox_scan(db: AsyncSession, profile_id: uuid.UUID) -> list[dict]:
+    """Original implementation: walk the full history in Python (A/B baseline)."""
+    messages = (await db.scalars(
+        select(Message).where(
+            or_(Message.sender_id == profile_id, Message.receiver_id == profile_id)
+        ).order_by(Message.created_at.desc())
+    )).all()
+
+    latest, unread = {}, {}
+    for m in messages:
+        other_id = m.receiver_id if m.sender_id == profile_id else m.sender_id
+        latest.setdefault(other_id, m)
+        if m.receiver_id == profile_id and not m.is_read:
+            unread[other_id] = unread.get(other_id, 0) + 1
+
+    results = []
+    for other_id, m in latest.items():
+        other_user = await db.get(Profile, other_id)
+        if other_user:
+            results.append(_conversation_out(other_user, m, unread.get(other_id, 0)))
     return results
 
+
+_INBOX_ENGINES = {
+    "summary": _inbox_from_summary,
+    "distinct_on": _inbox_distinct_on,
+    "scan": _inbox_scan,
+}
+if settings.INBOX_ENGINE not in _INBOX_ENGINES:
+    raise RuntimeError(f"Unknown INBOX_ENGINE: {settings.INBOX_ENGINE}")
+
+
 @router.get("", response_model=list[dict])
-def get_conversations(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user)
+async def get_conversations(
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id)
 ):
-    profile = get_or_create_profile(user, db)
-    
-    # We want a list of users we have conversations with, plus the latest message.
-    messages = db.query(Message).filter(
-        or_(Message.sender_id == profile.id, Message.receiver_id == profile.id)
-    ).order_by(Message.created_at.desc()).all()
-    
-    convos = {}
-    for m in messages:
-        other_id = m.receiver_id if m.sender_id == profile.id else m.sender_id
-        if other_id not in convos:
-            other_user = db.query(Profile).filter(Profile.id == other_id).first()
-            if not other_user:
-                continue
-            
-            convos[other_id] = {
-                "other_user_id": str(other_id),
-                "other_username": other_user.username,
-                "profile_image_url": other_user.profile_image_url or "",
-                "latest_message": {
-                    "id": str(m.id),
-                    "sender_id": str(m.sender_id),
-                    "content": m.content,
-                    "created_at": m.created_at.isoformat() if m.created_at else "",
-                    "is_read": m.is_read
-                }
-            }
-            
-    return list(convos.values())
+    return await _INBOX_ENGINES[settings.INBOX_ENGINE](db, profile_id)
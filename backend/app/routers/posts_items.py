@@ -3,27 +3,39 @@ routers/posts_items.py
 ──────────────────────
 Routes for:
   POST   /posts           – create a post
-  GET    /posts           – list posts (community or all)
+  GET    /posts           – list posts (community or all), cursor-paginated
   DELETE /posts/{id}      – delete own post
 
   POST   /items           – create a marketplace item
-  GET    /items           – list items
+  GET    /items           – list items, cursor-paginated
   DELETE /items/{id}      – delete own item
 
+  GET    /communities/nearby – communities within a radius, nearest first
+
 Auth: Supabase JWT passed as  Authorization: Bearer <token>
-      get_current_user() decodes it and returns the Supabase user dict.
-      We look up (or lazy-create) a Profile row by email.
+      get_current_profile() / get_current_profile_id() (app/dependencies.py)
+      resolve the caller's Profile row, lazy-creating it by email.
+
+Pagination: list routes accept ?cursor=&limit= and return the cursor for the
+      next page in the X-Next-Cursor response header (see core/pagination.py).
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from pydantic import BaseModel, Field
 from typing import Optional
 import uuid
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db.models import Post, PostType, Item, ItemCategory, Profile, Community
-from app.core.auth import get_current_user  # returns decoded Supabase JWT payload
-from app.dependencies import get_or_create_profile  # centralized profile creation
+from app.db.queries import community_member_counts, is_community_member, search_origin
+from app.core.geo import distance_km, within_radius
+from app.core.media import public_url, store_data_uri
+from app.core.pagination import paginate, set_next_cursor
+from app.core.thumbnails import rendition_url, schedule_renditions
+from app.dependencies import get_current_profile, get_current_profile_id
 
 router = APIRouter()
 
@@ -61,7 +73,7 @@ class ItemCreate(BaseModel):
     price: str  # stored as string to match existing frontend
     description: Optional[str] = ""
     category: Optional[str] = "other"
-    image: str  # base64 data-URI
+    image: str  # base64 data-URI, stored in the media store on upload
 
 
 class ItemOut(BaseModel):
@@ -70,7 +82,9 @@ class ItemOut(BaseModel):
     price: str
     description: Optional[str]
     category: str
-    image: str
+    image: str  # full-size image, for detail views
+    thumbnail_url: Optional[str] = None  # for cards / list rows
+    medium_url: Optional[str] = None
     owner_id: str
     owner_username: str
     owner_is_business: bool = False
@@ -86,13 +100,11 @@ class ItemOut(BaseModel):
 
 
 @router.post("/posts", response_model=PostOut, status_code=status.HTTP_201_CREATED)
-def create_post(
+async def create_post(
     body: PostCreate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile: Profile = Depends(get_current_profile),
 ):
-    profile = get_or_create_profile(user, db)
-
     try:
         post_type_enum = PostType[body.post_type.upper()]
     except KeyError:
@@ -110,35 +122,40 @@ def create_post(
         community_id=community_id,
     )
     db.add(post)
-    db.commit()
-    db.refresh(post)
+    await db.commit()
+    await db.refresh(post)
 
     community = None
     if post.community_id:
-        community = (
-            db.query(Community).filter(Community.id == post.community_id).first()
-        )
+        community = await db.get(Community, post.community_id)
     return _post_out(post, profile, community)
 
 
 @router.get("/posts", response_model=list[PostOut])
-def list_posts(
+async def list_posts(
+    response: Response,
     community_id: Optional[str] = None,
     user_id: Optional[str] = None,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    _: uuid.UUID = Depends(get_current_profile_id),  # ensures a profile exists
 ):
-    profile = get_or_create_profile(user, db)
-    q = db.query(Post)
+    # Author and community are many-to-one, so a single LEFT OUTER JOIN
+    # hydrates them alongside each post instead of two lookups per row.
+    q = select(Post).options(
+        joinedload(Post.author),
+        joinedload(Post.community),
+    )
 
     if user_id:
         try:
-            q = q.filter(Post.author_id == uuid.UUID(user_id))
+            q = q.where(Post.author_id == uuid.UUID(user_id))
         except ValueError:
             return []
     elif community_id and community_id != "undefined":
         try:
-            q = q.filter(Post.community_id == uuid.UUID(community_id))
+            q = q.where(Post.community_id == uuid.UUID(community_id))
         except ValueError:
             # If invalid UUID provided for a specific community filter, return no results
             return []
@@ -146,36 +163,26 @@ def list_posts(
         # Global feed: show all posts from all communities by default
         pass
 
-    posts = q.order_by(Post.created_at.desc()).limit(100).all()
-
-    results = []
-    for post in posts:
-        author = db.query(Profile).filter(Profile.id == post.author_id).first()
-        community = None
-        if post.community_id:
-            community = (
-                db.query(Community).filter(Community.id == post.community_id).first()
-            )
-        results.append(_post_out(post, author, community))
-    return results
+    posts, next_cursor = await paginate(db, q, Post.created_at, Post.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return [_post_out(post, post.author, post.community) for post in posts]
 
 
 @router.delete("/posts/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     post_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
-    post = db.query(Post).filter(Post.id == uuid.UUID(post_id)).first()
+    post = await db.get(Post, uuid.UUID(post_id))
 
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    if post.author_id != profile.id:
+    if post.author_id != profile_id:
         raise HTTPException(status_code=403, detail="Not your post")
 
-    db.delete(post)
-    db.commit()
+    await db.delete(post)
+    await db.commit()
 
 
 class ProfileUpdate(BaseModel):
@@ -186,20 +193,27 @@ class ProfileUpdate(BaseModel):
     profile_image_url: Optional[str] = None
     is_business: Optional[bool] = None
     business_name: Optional[str] = None
+    # Coordinates of the new address, from /maps/place-details
+    lat: Optional[float] = Field(None, ge=-90, le=90)
+    lng: Optional[float] = Field(None, ge=-180, le=180)
 
 
 @router.patch("/profile/me")
-def update_my_profile(
+async def update_my_profile(
     body: ProfileUpdate,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile: Profile = Depends(get_current_profile),
 ):
-    profile = get_or_create_profile(user, db)
-
     if body.username is not None:
         profile.username = body.username
     if body.bio is not None:
         profile.bio = body.bio
+    if body.lat is not None and body.lng is not None:
+        profile.lat, profile.lng = body.lat, body.lng
+    elif body.address is not None and body.address != profile.address:
+        # The old coordinates belong to the old address; leave the profile
+        # unlocated until the new one is geocoded
+        profile.lat = profile.lng = None
     if body.address is not None:
         profile.address = body.address
     if body.profile_image_url is not None:
@@ -212,23 +226,24 @@ def update_my_profile(
     if body.community_id is not None:
         try:
             comm_uuid = uuid.UUID(body.community_id)
-            community = db.query(Community).filter(Community.id == comm_uuid).first()
+            community = await db.get(Community, comm_uuid)
             if community:
+                # Load the current collection so the replacement can be diffed
+                await db.refresh(profile, ["communities"])
                 profile.communities = [community]
         except ValueError:
             pass
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
     return {"status": "success"}
 
 
 @router.get("/profile/me")
-def get_my_profile(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+async def get_my_profile(
+    db: AsyncSession = Depends(get_async_db),
+    profile: Profile = Depends(get_current_profile),
 ):
-    profile = get_or_create_profile(user, db)
+    await db.refresh(profile, ["communities"])
 
     # Get first community name and id from the relationship
     community = profile.communities[0].name if profile.communities else ""
@@ -249,20 +264,21 @@ def get_my_profile(
 
 
 @router.get("/profile/{user_id}")
-def get_user_profile(
+async def get_user_profile(
     user_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    _: uuid.UUID = Depends(get_current_profile_id),  # ensures a profile exists
 ):
-    # Just to ensure the request is authenticated
-    get_or_create_profile(user, db)
-
     try:
         target_uuid = uuid.UUID(user_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid user_id")
 
-    target_profile = db.query(Profile).filter(Profile.id == target_uuid).first()
+    target_profile = await db.scalar(
+        select(Profile)
+        .options(selectinload(Profile.communities))
+        .where(Profile.id == target_uuid)
+    )
     if not target_profile:
         raise HTTPException(status_code=404, detail="Profile not found")
 
@@ -288,64 +304,65 @@ def get_user_profile(
 
 
 @router.post("/items", response_model=ItemOut, status_code=status.HTTP_201_CREATED)
-def create_item(
+async def create_item(
     body: ItemCreate,  # ← typed schema, not bare `body`
-    db: Session = Depends(get_db),  # ← was missing Depends
-    user=Depends(get_current_user),  # ← was missing Depends
+    db: AsyncSession = Depends(get_async_db),
+    profile: Profile = Depends(get_current_profile),
 ):
-    profile = get_or_create_profile(user, db)
     try:
         category_enum = ItemCategory[body.category.upper()]
     except KeyError:
         category_enum = ItemCategory.OTHER
 
+    # Decoding and writing the image is blocking work; keep it off the event loop
+    image_path = await run_in_threadpool(store_data_uri, body.image)
+
     item = Item(
         owner_id=profile.id,
         name=body.name,
         price=body.price,
         description=body.description,
-        image=body.image,
+        image=image_path,
         category=category_enum,
     )
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
+    schedule_renditions(item.image)
     return _item_out(item, profile)
 
 
 @router.get("/items", response_model=list[ItemOut])
-def list_items(
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+async def list_items(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(200, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+    _: uuid.UUID = Depends(get_current_profile_id),  # ensures a profile exists
 ):
-    profile = get_or_create_profile(user, db)
-    q = db.query(Item)
+    q = select(Item).options(joinedload(Item.owner))
 
     # Global marketplace - no community restriction
-    items = q.order_by(Item.created_at.desc()).limit(200).all()
-    results = []
-    for item in items:
-        owner = db.query(Profile).filter(Profile.id == item.owner_id).first()
-        results.append(_item_out(item, owner))
-    return results
+    items, next_cursor = await paginate(db, q, Item.created_at, Item.id, cursor, limit)
+    set_next_cursor(response, next_cursor)
+    return [_item_out(item, item.owner) for item in items]
 
 
 @router.delete("/items/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(
+async def delete_item(
     item_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
-    item = db.query(Item).filter(Item.id == uuid.UUID(item_id)).first()
+    item = await db.get(Item, uuid.UUID(item_id))
 
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
-    if item.owner_id != profile.id:
+    if item.owner_id != profile_id:
         raise HTTPException(status_code=403, detail="Not your item")
 
-    db.delete(item)
-    db.commit()
+    await db.delete(item)
+    await db.commit()
 
 
 # ─── Serialisation helpers ────────────────────────────────────────────────────
@@ -377,7 +394,9 @@ def _item_out(item: Item, owner: Optional[Profile]) -> dict:
         "price": item.price or "",
         "description": item.description or "",
         "category": item.category.value if item.category else "other",
-        "image": item.image or "",
+        "image": public_url(item.image) or "",
+        "thumbnail_url": rendition_url(item.image, "thumb") or "",
+        "medium_url": rendition_url(item.image, "medium") or "",
         "owner_id": str(item.owner_id),
         "owner_username": owner.username if owner else "unknown",
         "owner_is_business": owner.is_business if owner else False,
@@ -387,31 +406,74 @@ def _item_out(item: Item, owner: Optional[Profile]) -> dict:
     }
 
 
+# Declared before /communities/{community_id} so "nearby" is not taken for an id
+@router.get("/communities/nearby")
+async def nearby_communities(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: float = Query(25, gt=0, le=200),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
+):
+    """
+    Communities whose lake is within radius_km, nearest first. Distance is
+    measured from lat/lng, or from the caller's address when omitted.
+    """
+    origin = await search_origin(db, profile_id, lat, lng)
+    if origin is None:
+        raise HTTPException(
+            status_code=400, detail="Pass lat and lng, or set your address first"
+        )
+    lat, lng = origin
+
+    distance = distance_km(Community.lat, Community.lng, lat, lng)
+    rows = (await db.execute(
+        select(Community, distance)
+        .where(within_radius(Community.lat, Community.lng, lat, lng, radius_km))
+        .order_by(distance, Community.id)
+        .limit(limit)
+    )).all()
+
+    member_counts = await community_member_counts(db, [c.id for c, _ in rows])
+    return [
+        {
+            "id": str(comm.id),
+            "name": comm.name,
+            "description": comm.description or "",
+            "lake_name": comm.lake_name or "",
+            "member_count": member_counts.get(comm.id, 0),
+            "lat": comm.lat,
+            "lng": comm.lng,
+            "distance_km": round(km, 2),
+        }
+        for comm, km in rows
+    ]
+
+
 # Add this new endpoint to get community details
 @router.get("/communities/{community_id}")
-def get_community(
+async def get_community(
     community_id: str,
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
     try:
-        comm = (
-            db.query(Community).filter(Community.id == uuid.UUID(community_id)).first()
-        )
+        comm = await db.get(Community, uuid.UUID(community_id))
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid community_id")
     if not comm:
         raise HTTPException(status_code=404, detail="Community not found")
     # Ensure user is a member
-    if profile.id not in [m.id for m in comm.members]:
+    if not await is_community_member(db, comm.id, profile_id):
         raise HTTPException(
             status_code=403, detail="You are not a member of this community"
         )
+    member_counts = await community_member_counts(db, [comm.id])
     return {
         "id": str(comm.id),
         "name": comm.name,
         "description": comm.description or "",
         "lake_name": comm.lake_name or "",
-        "member_count": len(comm.members) if comm.members else 0,
+        "member_count": member_counts.get(comm.id, 0),
     }
@@ -0,0 +1,97 @@
+"""
+routers/realtime.py
+───────────────────
+WS /ws/messages   – push new messages as they are sent
+
+Browsers cannot set an Authorization header on a WebSocket, and a token in
+the URL would end up in access logs, so the socket is accepted first and the
+client's first frame must carry the Supabase access token:
+
+    {"type": "auth", "token": "<access token>"}
+
+If it does not arrive within AUTH_TIMEOUT_SECONDS or does not verify, the
+socket is closed with 1008 (policy violation); otherwise the server answers
+{"type": "ready"}. The socket is also closed with 1008 ("token expired")
+when the token's `exp` passes; the client reconnects with a refreshed
+token. Each new message the caller sends or receives is pushed as JSON:
+
+    {"type": "message", "id": ..., "sender_id": ..., "receiver_id": ...,
+     "content": ..., "created_at": ..., "is_read": false}
+
+Anything else the client sends is ignored.
+"""
+
+import asyncio
+import time
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from app.core.auth import verify_token
+from app.core.realtime import message_hub
+from app.db.session import AsyncSessionLocal
+from app.dependencies import get_current_profile_id
+
+router = APIRouter(tags=["realtime"])
+
+AUTH_TIMEOUT_SECONDS = 10
+
+
+async def _authenticate(websocket: WebSocket):
+    """Read the auth frame; returns (profile_id, exp) or None if rejected."""
+    try:
+        frame = await asyncio.wait_for(websocket.receive_json(), AUTH_TIMEOUT_SECONDS)
+        if not isinstance(frame, dict) or frame.get("type") != "auth":
+            return None
+        if not isinstance(frame.get("token"), str):
+            return None
+        user = await verify_token(frame["token"])
+        async with AsyncSessionLocal() as db:
+            profile_id = await get_current_profile_id(user, db)
+    # KeyError: a binary frame; ValueError: text that is not JSON
+    except (asyncio.TimeoutError, KeyError, ValueError, HTTPException):
+        return None
+    return profile_id, user.get("exp")
+
+
+@router.websocket("/ws/messages")
+async def messages_socket(websocket: WebSocket):
+    await websocket.accept()
+    try:
+        auth = await _authenticate(websocket)
+    except WebSocketDisconnect:
+        return
+    if auth is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    profile_id, exp = auth
+    queue = message_hub.subscribe(profile_id)
+
+    async def push():
+        await websocket.send_json({"type": "ready"})
+        while True:
+            await websocket.send_json(await queue.get())
+
+    async def drain():
+        # Returns when the client disconnects; text and binary frames alike
+        # are read and dropped
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+
+    async def expire():
+        # Never returns for a token without exp (verify_token only caches
+        # tokens that have one, but does not require it)
+        if not isinstance(exp, (int, float)):
+            await asyncio.Event().wait()
+        await asyncio.sleep(max(exp - time.time(), 0))
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="token expired")
+
+    tasks = [asyncio.create_task(push()), asyncio.create_task(drain()), asyncio.create_task(expire())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        message_hub.unsubscribe(profile_id, queue)
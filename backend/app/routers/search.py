@@ -7,22 +7,35 @@ GET /search/items        – search marketplace items
 GET /search/users        – search user profiles
 GET /search/communities  – search communities
 
+Matching uses Postgres full-text search over each table's generated
+search_vector column (GIN-indexed). Every term is prefix-matched, so
+"lake boa" finds "Lake boats", and results are ordered by ts_rank.
+
 Query Parameters:
   q              – search query string
   community_id   – (optional) filter by community
+  radius_km      – (optional, /search/items) only items whose owner lives within
+                   this distance of lat/lng, or of the caller's address
   limit          – (optional) max results (default 50)
+  cursor         – (optional) opaque cursor from a previous X-Next-Cursor header
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from fastapi import APIRouter, Depends, Query, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 from typing import Optional
 import uuid
 
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.db.models import Item, Profile, Community
-from app.core.auth import get_current_user
-from app.dependencies import get_or_create_profile  # centralized profile creation
+from app.db.queries import community_member_counts, is_community_member, search_origin
+from app.core.fulltext import match_and_rank
+from app.core.geo import within_radius
+from app.core.pagination import paginate, set_next_cursor
+from app.core.media import public_url
+from app.core.thumbnails import rendition_url
+from app.dependencies import get_current_profile_id
 
 router = APIRouter(prefix="/search", tags=["search"])
 
@@ -34,7 +47,8 @@ class SearchItemResult:
         self.price = item.price or ""
         self.description = item.description or ""
         self.category = item.category.value if item.category else "other"
-        self.image = item.image or ""
+        self.image = public_url(item.image) or ""
+        self.thumbnail_url = rendition_url(item.image, "thumb") or ""
         self.owner_id = str(item.owner_id)
         self.owner_username = owner.username if owner else "unknown"
         self.owner_is_business = owner.is_business if owner else False
@@ -49,6 +63,7 @@ class SearchItemResult:
             "description": self.description,
             "category": self.category,
             "image": self.image,
+            "thumbnail_url": self.thumbnail_url,
             "owner_id": self.owner_id,
             "owner_username": self.owner_username,
             "owner_is_business": getattr(self, "owner_is_business", False),
@@ -80,12 +95,12 @@ class SearchUserResult:
 
 
 class SearchCommunityResult:
-    def __init__(self, community):
+    def __init__(self, community, member_count: int = 0):
         self.id = str(community.id)
         self.name = community.name
         self.description = community.description or ""
         self.lake_name = community.lake_name or ""
-        self.member_count = len(community.members) if community.members else 0
+        self.member_count = member_count
 
     def to_dict(self):
         return {
@@ -97,119 +112,135 @@ class SearchCommunityResult:
         }
 
 
-def get_user_community_ids(profile: Profile) -> list[uuid.UUID]:
-    """Returns list of community UUIDs the user belongs to."""
-    return [c.id for c in profile.communities] if profile.communities else []
-
-
 @router.get("/items")
-def search_items(
+async def search_items(
+    response: Response,
     q: str = Query("", min_length=0),
     community_id: Optional[str] = None,
+    radius_km: Optional[float] = Query(None, gt=0, le=200),
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lng: Optional[float] = Query(None, ge=-180, le=180),
+    cursor: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
-    query = db.query(Item)
+    query = select(Item).options(joinedload(Item.owner))
 
-    if q and q.strip():
-        query = query.filter(
-            or_(
-                func.lower(Item.name).ilike(f"%{q.lower()}%"),
-                func.lower(Item.description).ilike(f"%{q.lower()}%"),
+    if radius_km is not None:
+        origin = await search_origin(db, profile_id, lat, lng)
+        if origin is None:
+            raise HTTPException(
+                status_code=400, detail="Pass lat and lng, or set your address first"
             )
+        nearby_owners = select(Profile.id).where(
+            within_radius(Profile.lat, Profile.lng, *origin, radius_km)
         )
+        query = query.where(Item.owner_id.in_(nearby_owners))
+
+    rank = None
+    if q and q.strip():
+        matched = match_and_rank(Item.search_vector, "english", q)
+        if matched is None:
+            return []
+        where, rank = matched
+        query = query.where(where)
 
     if community_id and community_id != "undefined":
         # ── Community screen: single community, verify membership ──
         try:
             comm_uuid = uuid.UUID(community_id)
-            comm = db.query(Community).filter(Community.id == comm_uuid).first()
-            if not comm or profile.id not in [m.id for m in comm.members]:
+            if not await is_community_member(db, comm_uuid, profile_id):
                 raise HTTPException(
                     status_code=403, detail="Not a member of this community"
                 )
-            query = query.join(Profile, Profile.id == Item.owner_id).filter(
+            query = query.join(Profile, Profile.id == Item.owner_id).where(
                 Profile.communities.any(Community.id == comm_uuid)
             )
         except (ValueError, TypeError):
             return []
     # No restriction for global search (outside of specific community screen)
 
-    results = query.order_by(Item.created_at.desc()).limit(limit).all()
-    output = []
-    for item in results:
-        owner = db.query(Profile).filter(Profile.id == item.owner_id).first()
-        output.append(SearchItemResult(item, owner).to_dict())
-    return output
+    results, next_cursor = await paginate(
+        db, query, Item.created_at, Item.id, cursor, limit, rank=rank
+    )
+    set_next_cursor(response, next_cursor)
+    return [SearchItemResult(item, item.owner).to_dict() for item in results]
 
 
 @router.get("/users")
-def search_users(
+async def search_users(
+    response: Response,
     q: str = Query("", min_length=0),
     community_id: Optional[str] = None,
+    cursor: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile(user, db)
-    query = db.query(Profile)
+    query = select(Profile)
 
     # Only filter out self if NOT searching within a specific community members list
     if not community_id:
-        query = query.filter(Profile.id != profile.id)
+        query = query.where(Profile.id != profile_id)
 
+    rank = None
     if q and q.strip():
-        query = query.filter(
-            or_(
-                func.lower(Profile.username).ilike(f"%{q.lower()}%"),
-                func.lower(Profile.bio).ilike(f"%{q.lower()}%"),
-            )
-        )
+        matched = match_and_rank(Profile.search_vector, "simple", q)
+        if matched is None:
+            return []
+        where, rank = matched
+        query = query.where(where)
 
     if community_id and community_id != "undefined":
         # ── Community screen: single community, verify membership ──
         try:
             comm_uuid = uuid.UUID(community_id)
-            comm = db.query(Community).filter(Community.id == comm_uuid).first()
-            if not comm or profile not in comm.members:
+            if not await is_community_member(db, comm_uuid, profile_id):
                 raise HTTPException(
                     status_code=403, detail="Not a member of this community"
                 )
-            query = query.filter(Profile.communities.any(Community.id == comm_uuid))
+            query = query.where(Profile.communities.any(Community.id == comm_uuid))
         except (ValueError, TypeError):
             return []
     # No restriction for global search
 
-    results = query.limit(limit).all()
+    results, next_cursor = await paginate(
+        db, query, Profile.created_at, Profile.id, cursor, limit, rank=rank
+    )
+    set_next_cursor(response, next_cursor)
     return [SearchUserResult(p).to_dict() for p in results]
 
 
 @router.get("/communities")
-def search_communities(
+async def search_communities(
+    response: Response,
     q: str = Query("", min_length=0),
+    cursor: Optional[str] = None,
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    profile_id: uuid.UUID = Depends(get_current_profile_id),
 ):
-    profile = get_or_create_profile_by_email(user, db)
-    community_ids = get_user_community_ids(profile)
-
-    query = db.query(Community)
+    query = select(Community)
 
     # Show all communities matching search or all if no search string
     # (Optional: keep restriction if we only want users to find communities they can join?)
     # The user wants "anything outside of community" to show up.
 
+    rank = None
     if q and q.strip():
-        query = query.filter(
-            or_(
-                func.lower(Community.name).ilike(f"%{q.lower()}%"),
-                func.lower(Community.lake_name).ilike(f"%{q.lower()}%"),
-                func.lower(Community.description).ilike(f"%{q.lower()}%"),
-            )
-        )
-
-    results = query.limit(limit).all()
-    return [SearchCommunityResult(c).to_dict() for c in results]
+        matched = match_and_rank(Community.search_vector, "english", q)
+        if matched is None:
+            return []
+        where, rank = matched
+        query = query.where(where)
+
+    results, next_cursor = await paginate(
+        db, query, Community.created_at, Community.id, cursor, limit, rank=rank
+    )
+    set_next_cursor(response, next_cursor)
+    member_counts = await community_member_counts(db, [c.id for c in results])
+    return [
+        SearchCommunityResult(c, member_counts.get(c.id, 0)).to_dict()
+        for c in results
+    ]
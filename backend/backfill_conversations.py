@@ -0,0 +1,90 @@
+"""
+Build the `conversations` inbox summary from existing messages.
+
+New messages keep the summary up to date (routers/messages.py); this script
+creates the table on older databases and (re)computes one row per pair of
+profiles from the full message history: the latest message and how many
+messages each side has not read yet.
+
+Safe to re-run — existing rows are overwritten with freshly computed values.
+migrate.py calls backfill_if_needed(), which only runs the backfill while
+some pair of profiles that has messages has no summary row yet.
+
+Usage:  python backfill_conversations.py
+"""
+
+from sqlalchemy import text
+
+from app.db.session import script_engine
+from app.db.models import Conversation
+
+BACKFILL_SQL = text(
+    """
+    INSERT INTO conversations
+        (user_a_id, user_b_id, last_message_id, last_message_at, unread_a, unread_b)
+    SELECT latest.user_a_id, latest.user_b_id, latest.id, latest.created_at,
+           counts.unread_a, counts.unread_b
+    FROM (
+        SELECT DISTINCT ON (user_a_id, user_b_id)
+               LEAST(sender_id, receiver_id) AS user_a_id,
+               GREATEST(sender_id, receiver_id) AS user_b_id,
+               id, created_at
+        FROM messages
+        ORDER BY user_a_id, user_b_id, created_at DESC, id DESC
+    ) AS latest
+    JOIN (
+        SELECT LEAST(sender_id, receiver_id) AS user_a_id,
+               GREATEST(sender_id, receiver_id) AS user_b_id,
+               COUNT(*) FILTER (
+                   WHERE NOT is_read AND receiver_id < sender_id
+               ) AS unread_a,
+               COUNT(*) FILTER (
+                   WHERE NOT is_read AND receiver_id > sender_id
+               ) AS unread_b
+        FROM messages
+        GROUP BY 1, 2
+    ) AS counts USING (user_a_id, user_b_id)
+    ON CONFLICT (user_a_id, user_b_id) DO UPDATE SET
+        last_message_id = EXCLUDED.last_message_id,
+        last_message_at = EXCLUDED.last_message_at,
+        unread_a = EXCLUDED.unread_a,
+        unread_b = EXCLUDED.unread_b
+    """
+)
+
+
+MISSING_SQL = text(
+    """
+    SELECT EXISTS (
+        SELECT 1 FROM messages m
+        WHERE NOT EXISTS (
+            SELECT 1 FROM conversations c
+            WHERE c.user_a_id = LEAST(m.sender_id, m.receiver_id)
+              AND c.user_b_id = GREATEST(m.sender_id, m.receiver_id)
+        )
+    )
+    """
+)
+
+
+def backfill():
+    Conversation.__table__.create(bind=script_engine, checkfirst=True)
+
+    with script_engine.begin() as conn:
+        result = conn.execute(BACKFILL_SQL)
+        print(f"✓ conversations: {result.rowcount} rows")
+
+
+def backfill_if_needed():
+    Conversation.__table__.create(bind=script_engine, checkfirst=True)
+
+    with script_engine.connect() as conn:
+        missing = conn.execute(MISSING_SQL).scalar()
+    if missing:
+        backfill()
+    else:
+        print("✓ conversations already cover every message pair")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,5 @@
+"""
+Benchmarks for the backend. Run them from backend/ as modules, e.g.
+`python -m bench.search`, so `app` is importable. They need a scratch
+database (DATABASE_URL) or a running server; never point them at production.
+"""
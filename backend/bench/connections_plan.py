@@ -0,0 +1,101 @@
+"""
+Query plans for connection lookups before and after the move to canonical
+pairs (migrate_connections.py), on the seeded connection graph.
+
+The old layout keyed rows by (requester_id, requestee_id), so finding the
+row between two users had to OR both orderings, and listing someone's
+connections OR'ed the two columns. The script copies the current graph
+into a TEMP table with that old layout and indexes, then prints EXPLAIN
+(ANALYZE, BUFFERS) for:
+  - the pair lookup: old OR of both orderings vs the primary-key probe
+    routers/connections.py now issues (pair_clause), and
+  - the accepted-connections list: old OR of both columns vs the UNION ALL
+    of one indexed SELECT per side (connected_ids).
+
+Seeds `python seed_db.py graph <users>` first if the database has no graph
+profiles. Use a scratch database.
+
+Usage:  python -m bench.connections_plan [--users 100000]
+"""
+
+import argparse
+
+from sqlalchemy import select, text
+
+from app.db.models import Profile, connections
+from app.db.session import script_engine
+from app.routers.connections import connected_ids, pair_clause
+from bench.graph import ensure_graph
+
+LEGACY_SQL = [
+    """
+    CREATE TEMP TABLE connections_old AS
+    SELECT requester_id,
+           CASE WHEN requester_id = user_a_id THEN user_b_id ELSE user_a_id END
+               AS requestee_id,
+           status, created_at
+    FROM connections
+    """,
+    "ALTER TABLE connections_old ADD PRIMARY KEY (requester_id, requestee_id)",
+    "CREATE INDEX ON connections_old (requester_id, status)",
+    "CREATE INDEX ON connections_old (requestee_id, status)",
+    "ANALYZE connections_old",
+]
+
+OLD_PAIR_SQL = """
+    SELECT * FROM connections_old
+    WHERE (requester_id = :x AND requestee_id = :y)
+       OR (requester_id = :y AND requestee_id = :x)
+"""
+
+OLD_LIST_SQL = """
+    SELECT p.id, p.username FROM profiles p
+    JOIN connections_old c
+      ON p.id = CASE WHEN c.requester_id = :x THEN c.requestee_id ELSE c.requester_id END
+    WHERE (c.requester_id = :x OR c.requestee_id = :x) AND c.status = 'accepted'
+"""
+
+
+def explain(conn, title: str, sql, params: dict | None = None) -> None:
+    """Print EXPLAIN ANALYZE for raw SQL text or a SQLAlchemy statement."""
+    print(f"\n── {title}")
+    if not isinstance(sql, str):
+        sql = str(sql.compile(script_engine, compile_kwargs={"literal_binds": True}))
+    for line in conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params or {}).scalars():
+        print(f"  {line}")
+
+
+def main(users: int) -> None:
+    ensure_graph(users)
+    with script_engine.connect() as conn:
+        x, y = conn.execute(
+            select(connections.c.user_a_id, connections.c.user_b_id)
+            .where(connections.c.status == "accepted")
+            .limit(1)
+        ).one()
+        for stmt in LEGACY_SQL:
+            conn.execute(text(stmt))
+        conn.execute(text("ANALYZE connections"))
+
+        pair = {"x": str(y), "y": str(x)}
+        explain(conn, "pair lookup, old: OR of both orderings", OLD_PAIR_SQL, pair)
+        explain(
+            conn,
+            "pair lookup, new: primary-key probe",
+            connections.select().where(pair_clause(y, x)),
+        )
+
+        others = connected_ids(x, "accepted")
+        explain(conn, "connections list, old: OR of both columns", OLD_LIST_SQL, {"x": str(x)})
+        explain(
+            conn,
+            "connections list, new: UNION ALL, one indexed side each",
+            select(Profile.id, Profile.username).join(others, Profile.id == others.c.id),
+        )
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    main(parser.parse_args().users)
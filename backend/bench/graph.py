@@ -0,0 +1,34 @@
+"""Synthetic connection graph shared by the connection benchmarks."""
+
+from sqlalchemy import text
+
+from app.db.session import script_engine
+
+GRAPH_COUNT_SQL = text("SELECT count(*) FROM profiles WHERE username LIKE 'graph\\_%'")
+
+
+def ensure_graph(users: int) -> None:
+    """Seed `python seed_db.py graph <users>` unless graph profiles already exist."""
+    with script_engine.connect() as conn:
+        have = conn.execute(GRAPH_COUNT_SQL).scalar_one()
+    if have:
+        print(f"Using the {have:,} graph profiles already seeded")
+        return
+    # Imported here: seed_db runs create_all() on import
+    import seed_db
+
+    seed_db.seed_connection_graph(users)
+
+
+def sample_users(n: int) -> list:
+    """Ids of up to `n` graph profiles, spread across the graph."""
+    with script_engine.connect() as conn:
+        return list(
+            conn.execute(
+                text(
+                    "SELECT id FROM profiles WHERE username LIKE 'graph\\_%' "
+                    "ORDER BY md5(id::text) LIMIT :n"
+                ),
+                {"n": n},
+            ).scalars()
+        )
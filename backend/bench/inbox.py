@@ -0,0 +1,169 @@
+"""
+A/B of the GET /messages inbox engines (INBOX_ENGINE) on the same data.
+
+Seeds --users `inbox_` profiles and about --messages messages between
+them. Senders are skewed towards a core of busy users (index drawn as
+users × random()²) and each one mostly writes to a few close partners with
+a long tail of others, so inbox sizes range from a handful of conversations
+to several hundred. The newest messages are left unread. The conversations
+summary is then rebuilt with backfill_conversations.py.
+
+Each engine (summary, distinct_on, scan) is called directly, as
+routers/messages.py does for the configured INBOX_ENGINE, for the busiest
+users and for a random sample. Every call gets a fresh AsyncSession so no
+engine is helped by the identity map.
+
+Seeding 1M messages takes a few minutes. The bench rows stay for re-runs;
+pass --cleanup to delete them. Use a scratch database.
+
+Usage:  python -m bench.inbox [--users 10000] [--messages 1000000] [--runs 5]
+        python -m bench.inbox --cleanup
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+import backfill_conversations
+from app.db.session import AsyncSessionLocal, async_engine, script_engine
+from app.routers.messages import _INBOX_ENGINES
+from bench.stats import format_row, summarize
+
+PROFILES_SQL = text(
+    """
+    INSERT INTO profiles (id, username, email, is_business)
+    SELECT gen_random_uuid(), 'inbox_' || n, 'inbox_' || n || '@example.com', false
+    FROM generate_series(0, :users - 1) AS n
+    ON CONFLICT (username) DO NOTHING
+    """
+)
+
+IDS_SQL = text(
+    """
+    CREATE TEMP TABLE inbox_ids ON COMMIT DROP AS
+    SELECT substr(username, 7)::int AS idx, id
+    FROM profiles WHERE username LIKE 'inbox\\_%'
+    """
+)
+
+MESSAGES_SQL = text(
+    """
+    INSERT INTO messages (id, sender_id, receiver_id, content, created_at, is_read)
+    SELECT gen_random_uuid(), s.id, r.id, 'bench message ' || m.n,
+           now() - make_interval(secs => m.n * 3), m.n > :unread
+    FROM (
+        SELECT n, si, (si + 1 + floor(:spread * random() ^ 3)::int) % :users AS ri
+        FROM (
+            SELECT n, floor(:users * random() ^ 2)::int AS si
+            FROM generate_series(:start, :stop - 1) AS n
+        ) AS picked
+    ) AS m
+    JOIN inbox_ids s ON s.idx = m.si
+    JOIN inbox_ids r ON r.idx = m.ri
+    """
+)
+
+COUNT_SQL = text(
+    "SELECT count(*) FROM messages JOIN profiles ON profiles.id = messages.sender_id "
+    "WHERE profiles.username LIKE 'inbox\\_%'"
+)
+
+BUSIEST_SQL = text(
+    """
+    SELECT p.id FROM profiles p
+    JOIN conversations c ON p.id IN (c.user_a_id, c.user_b_id)
+    WHERE p.username LIKE 'inbox\\_%'
+    GROUP BY p.id ORDER BY count(*) DESC LIMIT :n
+    """
+)
+
+SAMPLE_SQL = text(
+    "SELECT id FROM profiles WHERE username LIKE 'inbox\\_%' ORDER BY random() LIMIT :n"
+)
+
+CLEANUP_SQL = [
+    text(
+        "DELETE FROM conversations USING profiles WHERE profiles.username LIKE 'inbox\\_%' "
+        "AND profiles.id IN (conversations.user_a_id, conversations.user_b_id)"
+    ),
+    text(
+        "DELETE FROM messages USING profiles WHERE profiles.username LIKE 'inbox\\_%' "
+        "AND profiles.id IN (messages.sender_id, messages.receiver_id)"
+    ),
+    text("DELETE FROM profiles WHERE username LIKE 'inbox\\_%'"),
+]
+
+
+def seed(users: int, messages: int, batch: int = 100_000) -> None:
+    with script_engine.begin() as conn:
+        have = conn.execute(COUNT_SQL).scalar_one()
+        if have >= messages:
+            print(f"Using the {have:,} inbox messages already seeded")
+            return
+        conn.execute(PROFILES_SQL, {"users": users})
+        conn.execute(IDS_SQL)
+        for start in range(have, messages, batch):
+            conn.execute(
+                MESSAGES_SQL,
+                {
+                    "start": start,
+                    "stop": min(start + batch, messages),
+                    "users": users,
+                    "spread": max(users // 20, 10),
+                    "unread": messages // 50,
+                },
+            )
+        print(f"  seeded messages: {have:,} → {messages:,}")
+        conn.execute(text("ANALYZE profiles, messages"))
+    backfill_conversations.backfill()
+    with script_engine.begin() as conn:
+        conn.execute(text("ANALYZE conversations"))
+
+
+async def _time_engine(engine, user_ids: list, runs: int) -> dict:
+    samples = []
+    for i in range(runs + 1):
+        for user_id in user_ids:
+            async with AsyncSessionLocal() as db:
+                start = time.perf_counter()
+                await engine(db, user_id)
+                if i:  # the first round warms caches and connections
+                    samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def measure(runs: int) -> None:
+    with script_engine.connect() as conn:
+        groups = {
+            "busiest 5": list(conn.execute(BUSIEST_SQL, {"n": 5}).scalars()),
+            "random 50": list(conn.execute(SAMPLE_SQL, {"n": 50}).scalars()),
+        }
+    for group, user_ids in groups.items():
+        print(f"\n── {group} users")
+        for name, engine in _INBOX_ENGINES.items():
+            print(format_row(f"INBOX_ENGINE={name}", await _time_engine(engine, user_ids, runs)))
+    await async_engine.dispose()
+
+
+def cleanup() -> None:
+    with script_engine.begin() as conn:
+        for stmt in CLEANUP_SQL:
+            conn.execute(stmt)
+    print("✓ Deleted inbox bench rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+    else:
+        seed(args.users, args.messages)
+        asyncio.run(measure(args.runs))
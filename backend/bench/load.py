@@ -0,0 +1,159 @@
+"""
+Concurrency load test for the read endpoints the async port moved off the
+threadpool (posts, search, messages, connections).
+
+At each concurrency level, `c` clients loop over ENDPOINTS for --seconds
+against a running server and the script reports throughput, latency and
+errors. Throughput levels off once the server runs out of headroom, and
+latency and errors climb from there. On the sync routers that point is
+about the threadpool size (40 by default).
+
+Before/after comparison: serve the last sync commit and the current tree
+against the same database and run the same command against each:
+
+    git worktree add /tmp/before e2119d5   # before "Port routers to ... asyncpg"
+    (cd /tmp/before/backend && uvicorn app.main:app --port 8001)
+    uvicorn app.main:app --port 8000
+    python -m bench.load --url http://localhost:8001 > before.txt
+    python -m bench.load --url http://localhost:8000 > after.txt
+
+Run both servers with one worker on a machine the size of the Fly VM, so
+the comparison is like for like. The token is a Supabase access token for
+a user with some posts, messages and connections (BENCH_TOKEN or --token).
+
+Logging cost: --logging-ab starts the server itself (uvicorn, one worker,
+on --port), runs the same levels once with logging quiet (LOG_LEVEL=WARNING,
+SQL_ECHO off) and once verbose (LOG_LEVEL=DEBUG, SQL_ECHO on), and prints
+the throughput of both side by side. Server output goes to a temp file, as
+it would to a log collector.
+
+Usage:  python -m bench.load [--url URL] [--levels 10,25,50,100,200] [--seconds 20]
+        python -m bench.load --logging-ab [--port 8010]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench.stats import format_row, summarize
+
+ENDPOINTS = [
+    "/posts?limit=20",
+    "/search/items?q=boat",
+    "/search/users?q=a",
+    "/messages",
+    "/connections",
+]
+
+
+async def _client(client: httpx.AsyncClient, deadline: float, samples: list, errors: list):
+    n = 0
+    while time.monotonic() < deadline:
+        path = ENDPOINTS[n % len(ENDPOINTS)]
+        n += 1
+        start = time.perf_counter()
+        try:
+            res = await client.get(path)
+            if res.status_code >= 400:
+                errors.append(res.status_code)
+                continue
+        except httpx.HTTPError as e:
+            errors.append(type(e).__name__)
+            continue
+        samples.append(time.perf_counter() - start)
+
+
+async def run_level(url: str, token: str, concurrency: int, seconds: float):
+    samples: list[float] = []
+    errors: list = []
+    async with httpx.AsyncClient(
+        base_url=url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+    ) as client:
+        deadline = time.monotonic() + seconds
+        await asyncio.gather(
+            *(_client(client, deadline, samples, errors) for _ in range(concurrency))
+        )
+    rps = len(samples) / seconds
+    print(format_row(f"c={concurrency}", summarize(samples)) + f" rps={rps:>8.1f} errors={len(errors)}")
+    return rps
+
+
+async def main(url: str, token: str, levels: list[int], seconds: float) -> dict:
+    """Run every level; returns {concurrency: requests per second}."""
+    # Warm up the connection pools and caches before measuring
+    await run_level(url, token, 1, 2)
+    print("─" * 100)
+    return {c: await run_level(url, token, c, seconds) for c in levels}
+
+
+LOGGING_MODES = {
+    "quiet": {"LOG_LEVEL": "WARNING", "SQL_ECHO": "false"},
+    "verbose": {"LOG_LEVEL": "DEBUG", "SQL_ECHO": "true"},
+}
+
+
+async def _wait_healthy(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"server at {url} did not become healthy")
+
+
+async def logging_ab(port: int, token: str, levels: list[int], seconds: float) -> None:
+    url = f"http://127.0.0.1:{port}"
+    results = {}
+    for mode, env in LOGGING_MODES.items():
+        print(f"\n── logging {mode}: {env}")
+        with tempfile.TemporaryFile() as log:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+                env={**os.environ, **env},
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+            try:
+                await _wait_healthy(url)
+                results[mode] = await main(url, token, levels, seconds)
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(f"\n{'concurrency':<12} {'quiet rps':>10} {'verbose rps':>12} {'change':>8}")
+    for c in levels:
+        quiet, verbose = results["quiet"][c], results["verbose"][c]
+        change = (verbose - quiet) / quiet * 100 if quiet else 0.0
+        print(f"{c:<12} {quiet:>10.1f} {verbose:>12.1f} {change:>7.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.getenv("BENCH_TOKEN"))
+    parser.add_argument("--levels", default="10,25,50,100,200")
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--logging-ab", action="store_true")
+    parser.add_argument("--port", type=int, default=8010)
+    args = parser.parse_args()
+    if not args.token:
+        parser.error("pass --token or set BENCH_TOKEN")
+
+    levels = [int(c) for c in args.levels.split(",")]
+    if args.logging_ab:
+        asyncio.run(logging_ab(args.port, args.token, levels, args.seconds))
+    else:
+        asyncio.run(main(args.url.rstrip("/"), args.token, levels, args.seconds))
@@ -0,0 +1,199 @@
+"""
+Latency of /search/items, /search/users and /search/communities at growing
+table sizes.
+
+For each size (default 10k, 100k and 1M rows per table) the script tops up
+synthetic `bench_` profiles, communities and items in DATABASE_URL with
+INSERT … SELECT generate_series, runs ANALYZE, then times:
+  - the full-text search route handlers (routers/search.py), called directly
+    with an AsyncSession so auth and HTTP overhead are left out, and
+  - the ILIKE '%q%' queries they replaced, for comparison.
+
+Sizes are cumulative, so the 1M run reuses the rows seeded for 100k. The
+bench rows stay in place for re-runs; pass --cleanup to delete them.
+
+Needs the search_vector columns and GIN indexes (migrate_search.py).
+Seeding 1M rows per table takes several minutes and about 1 GB of disk.
+
+Usage:  python -m bench.search [--sizes 10000,100000,1000000] [--runs 30]
+        python -m bench.search --cleanup
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi import Response
+from sqlalchemy import func, or_, select, text
+
+from app.db.models import Community, Item, Profile
+from app.db.session import AsyncSessionLocal, async_engine, script_engine
+from app.routers.search import search_communities, search_items, search_users
+from bench.stats import format_row, summarize
+
+QUERIES = ["boat", "lake ka", "pontoon trailer", "xylophone"]
+
+# Vocabulary for the synthetic text; an index picks words by row number so
+# every query above matches some rows and "xylophone" matches none.
+WORDS = (
+    "ARRAY['lake','boat','pontoon','kayak','trailer','dock','fishing','cabin',"
+    "'sunset','paddle','motor','canoe','cottage','shore','pier','sail',"
+    "'anchor','island','beach','harbor']"
+)
+
+
+def _word(n: str, k: int) -> str:
+    return f"({WORDS})[1 + (({n}) * {k}) % 20]"
+
+
+SEED_SQL = {
+    "profiles": text(
+        f"""
+        INSERT INTO profiles (id, username, email, bio, is_business)
+        SELECT gen_random_uuid(), 'bench_' || n, 'bench_' || n || '@example.com',
+               {_word('n', 7)} || ' ' || {_word('n', 11)} || ' ' || {_word('n', 13)},
+               false
+        FROM generate_series(:start, :stop - 1) AS n
+        """
+    ),
+    "communities": text(
+        f"""
+        INSERT INTO communities (id, name, lake_name, description)
+        SELECT gen_random_uuid(), 'bench_' || n || ' ' || {_word('n', 3)},
+               initcap({_word('n', 5)}) || ' Lake',
+               {_word('n', 7)} || ' ' || {_word('n', 11)} || ' community'
+        FROM generate_series(:start, :stop - 1) AS n
+        """
+    ),
+    "items": text(
+        f"""
+        INSERT INTO items (id, owner_id, name, description, price, category, created_at)
+        SELECT gen_random_uuid(), owners.id,
+               initcap({_word('n', 3)}) || ' ' || {_word('n', 7)},
+               {_word('n', 11)} || ' ' || {_word('n', 13)} || ' ' || {_word('n', 17)},
+               '$' || (n % 500), 'OTHER', now() - make_interval(secs => n)
+        FROM generate_series(:start, :stop - 1) AS n
+        CROSS JOIN LATERAL (
+            SELECT id FROM profiles WHERE username = 'bench_' || (n % :owners)
+        ) AS owners
+        """
+    ),
+}
+
+COUNT_SQL = {
+    "profiles": text("SELECT count(*) FROM profiles WHERE username LIKE 'bench\\_%'"),
+    "communities": text("SELECT count(*) FROM communities WHERE name LIKE 'bench\\_%'"),
+    "items": text(
+        "SELECT count(*) FROM items JOIN profiles ON profiles.id = items.owner_id "
+        "WHERE profiles.username LIKE 'bench\\_%'"
+    ),
+}
+
+CLEANUP_SQL = [
+    text(
+        "DELETE FROM items USING profiles WHERE profiles.id = items.owner_id "
+        "AND profiles.username LIKE 'bench\\_%'"
+    ),
+    text("DELETE FROM profiles WHERE username LIKE 'bench\\_%'"),
+    text("DELETE FROM communities WHERE name LIKE 'bench\\_%'"),
+]
+
+
+def seed(size: int, batch: int = 100_000):
+    with script_engine.begin() as conn:
+        for table in ("profiles", "communities", "items"):
+            have = conn.execute(COUNT_SQL[table]).scalar_one()
+            for start in range(have, size, batch):
+                stop = min(start + batch, size)
+                params = {"start": start, "stop": stop}
+                if table == "items":
+                    params["owners"] = size
+                conn.execute(SEED_SQL[table], params)
+            if have < size:
+                print(f"  seeded {table}: {have} → {size}")
+        conn.execute(text("ANALYZE profiles, communities, items"))
+
+
+def _ilike_queries(q: str):
+    """The ILIKE '%q%' queries the full-text search replaced."""
+    like = f"%{q.lower()}%"
+    return {
+        "items": select(Item).where(
+            or_(func.lower(Item.name).ilike(like), func.lower(Item.description).ilike(like))
+        ).limit(50),
+        "users": select(Profile).where(
+            or_(func.lower(Profile.username).ilike(like), func.lower(Profile.bio).ilike(like))
+        ).limit(50),
+        "communities": select(Community).where(
+            or_(
+                func.lower(Community.name).ilike(like),
+                func.lower(Community.lake_name).ilike(like),
+                func.lower(Community.description).ilike(like),
+            )
+        ).limit(50),
+    }
+
+
+async def _time(fn, runs: int) -> dict:
+    await fn()  # warm the cache and the connection
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def measure(runs: int):
+    # Any id works: none of these queries filters on the caller
+    caller = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        for q in QUERIES:
+            routes = {
+                "items": lambda: search_items(
+                    Response(), q=q, community_id=None, radius_km=None, lat=None,
+                    lng=None, cursor=None, limit=50, db=db, profile_id=caller,
+                ),
+                "users": lambda: search_users(
+                    Response(), q=q, community_id=None, cursor=None, limit=50,
+                    db=db, profile_id=caller,
+                ),
+                "communities": lambda: search_communities(
+                    Response(), q=q, cursor=None, limit=50, db=db, profile_id=caller,
+                ),
+            }
+            for name, route in routes.items():
+                print(format_row(f"/search/{name} q={q!r}", await _time(route, runs)))
+            for name, query in _ilike_queries(q).items():
+                stmt = query
+                summary = await _time(lambda: db.execute(stmt), runs)
+                print(format_row(f"  ilike {name} q={q!r}", summary))
+
+
+async def run(sizes: list[int], runs: int):
+    for size in sizes:
+        print(f"\n── {size:,} rows per table ──")
+        await asyncio.to_thread(seed, size)
+        await measure(runs)
+    await async_engine.dispose()
+
+
+def cleanup():
+    with script_engine.begin() as conn:
+        for stmt in CLEANUP_SQL:
+            conn.execute(stmt)
+    print("✓ Deleted bench rows")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        cleanup()
+    else:
+        asyncio.run(run(sorted(int(s) for s in args.sizes.split(",")), args.runs))
@@ -0,0 +1,29 @@
+"""Latency summaries shared by the benchmark scripts."""
+
+import statistics
+
+
+def summarize(samples_s: list[float]) -> dict:
+    """p50/p95/p99/max in milliseconds for a list of durations in seconds."""
+    if not samples_s:
+        return {"n": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ms = sorted(s * 1000 for s in samples_s)
+
+    def pct(p: float) -> float:
+        return ms[min(len(ms) - 1, round(p / 100 * (len(ms) - 1)))]
+
+    return {
+        "n": len(ms),
+        "p50": round(statistics.median(ms), 2),
+        "p95": round(pct(95), 2),
+        "p99": round(pct(99), 2),
+        "max": round(ms[-1], 2),
+    }
+
+
+def format_row(label: str, summary: dict) -> str:
+    return (
+        f"{label:<40} n={summary['n']:<5} p50={summary['p50']:>8.2f}ms "
+        f"p95={summary['p95']:>8.2f}ms p99={summary['p99']:>8.2f}ms "
+        f"max={summary['max']:>8.2f}ms"
+    )
@@ -0,0 +1,75 @@
+"""
+Latency of GET /connections/suggestions and GET /connections/mutual/{id}
+on the synthetic connection graph (`python seed_db.py graph <users>`,
+seeded here first if the database has none).
+
+The route handlers are called directly with an AsyncSession, for a sample
+of graph users spread across the graph, so auth and HTTP overhead are left
+out. Mutual connections are timed between each sampled user and one of
+their own connections, the case the profile screen hits.
+
+Usage:  python -m bench.suggestions [--users 100000] [--sample 50] [--runs 5]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import select, text
+
+from app.db.models import connections
+from app.db.session import AsyncSessionLocal, async_engine
+from app.routers.connections import list_mutual_connections, list_suggestions
+from bench.graph import ensure_graph, sample_users
+from bench.stats import format_row, summarize
+
+
+async def _time(call, runs: int) -> list[float]:
+    await call()  # warm the cache and the connection
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def measure(user_ids: list, runs: int) -> None:
+    suggestions, mutual, sizes = [], [], []
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("ANALYZE connections"))
+        for user_id in user_ids:
+            c = connections.c
+            friend = (await db.execute(
+                select(c.user_a_id, c.user_b_id)
+                .where((c.user_a_id == user_id) | (c.user_b_id == user_id))
+                .limit(1)
+            )).first()
+
+            rows = await list_suggestions(limit=20, db=db, profile_id=user_id)
+            sizes.append(len(rows))
+            suggestions += await _time(
+                lambda: list_suggestions(limit=20, db=db, profile_id=user_id), runs
+            )
+            if friend is not None:
+                other = friend.user_b_id if friend.user_a_id == user_id else friend.user_a_id
+                mutual += await _time(
+                    lambda: list_mutual_connections(str(other), db=db, profile_id=user_id),
+                    runs,
+                )
+    await async_engine.dispose()
+
+    print(f"{len(user_ids)} users, {sum(sizes) / max(len(sizes), 1):.1f} suggestions each")
+    print(format_row("/connections/suggestions?limit=20", summarize(suggestions)))
+    print(format_row("/connections/mutual/{id}", summarize(mutual)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    ensure_graph(args.users)
+    asyncio.run(measure(sample_users(args.sample), args.runs))
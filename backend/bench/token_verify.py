@@ -0,0 +1,98 @@
+"""
+Cost of ES256 access-token verification against a token_cache hit.
+
+Signs a Supabase-shaped ES256 token with a throwaway P-256 key, then times:
+  - jwt.decode() with the public JWK, the work a cache miss does per request,
+  - verify_token() on a miss (cache cleared each call; the JWKS lookup is
+    answered in memory, as it is once the JWKS cache is warm),
+  - verify_token() on a token_cache hit.
+
+Needs no database or network, only the settings the app reads at import.
+
+Usage:  python -m bench.token_verify [--runs 2000]
+"""
+
+import argparse
+import asyncio
+import base64
+import statistics
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from app.core import auth
+from bench.stats import format_row, summarize
+
+KID = "bench"
+
+
+def _b64(n: int) -> str:
+    return base64.urlsafe_b64encode(n.to_bytes(32, "big")).decode().rstrip("=")
+
+
+def make_token() -> tuple[str, dict]:
+    """An ES256 token and the public JWK that verifies it."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    numbers = private_key.public_key().public_numbers()
+    jwk = {"kty": "EC", "crv": "P-256", "kid": KID, "alg": "ES256",
+           "x": _b64(numbers.x), "y": _b64(numbers.y)}
+    pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    claims = {"sub": "00000000-0000-0000-0000-000000000001", "exp": int(time.time()) + 3600,
+              "email": "bench@example.com", "role": "authenticated"}
+    return jwt.encode(claims, pem, algorithm="ES256", headers={"kid": KID}), jwk
+
+
+def _time_sync(fn, runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _time_async(fn, runs: int, before=None) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        if before:
+            before()
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def main(runs: int) -> None:
+    token, jwk = make_token()
+
+    async def get_key(kid):
+        return jwk if kid == KID else None
+
+    auth.jwks_cache.get_key = get_key
+
+    decode = _time_sync(
+        lambda: jwt.decode(token, jwk, algorithms=["ES256"], options={"verify_aud": False}),
+        runs,
+    )
+    miss = await _time_async(lambda: auth.verify_token(token), runs, auth.token_cache.clear)
+    await auth.verify_token(token)
+    hit = await _time_async(lambda: auth.verify_token(token), runs)
+
+    print(format_row("jwt.decode (ES256 verify)", summarize(decode)))
+    print(format_row("verify_token, token_cache miss", summarize(miss)))
+    print(format_row("verify_token, token_cache hit", summarize(hit)))
+    # Hits take microseconds, below format_row's 0.01 ms resolution
+    miss_us, hit_us = statistics.median(miss) * 1e6, statistics.median(hit) * 1e6
+    print(f"\np50: miss {miss_us:.1f} µs, hit {hit_us:.1f} µs ({miss_us / hit_us:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().runs))
@@ -0,0 +1,51 @@
+"""
+Bring a database up to date with app/db/models.py before the API starts.
+
+Base.metadata.create_all() only creates missing tables; columns, indexes and
+layout changes on tables that already exist come from the migrate_*.py /
+backfill_*.py scripts. This runs all of them in the order they depend on.
+Every step is safe to re-run and does nothing once applied, so the
+container runs it on each start (see the Dockerfile CMD):
+
+  1. create_all()          – tables that do not exist yet
+  2. migrate_connections.py – connections as canonical (user_a_id, user_b_id)
+     pairs; before migrate_indexes.py, which indexes the new columns
+  3. migrate_search.py     – search_vector columns and their GIN indexes
+  4. migrate_locations.py  – lat/lng on profiles and communities, which every
+     Profile and Community query selects
+  5. migrate_indexes.py    – indexes missing from existing tables
+  6. backfill_conversations.py – inbox summary rows for message history
+     that predates the conversations table (only while any are missing)
+
+migrate_media.py is not part of this: it moves images off the rows and is
+run by hand once MEDIA_ROOT is on persistent storage.
+
+Usage:  python migrate.py
+"""
+
+import backfill_conversations
+import migrate_connections
+import migrate_indexes
+import migrate_locations
+import migrate_search
+from app.db.models import Base
+from app.db.session import script_engine
+
+STEPS = [
+    ("create_all", lambda: Base.metadata.create_all(bind=script_engine)),
+    ("migrate_connections.py", migrate_connections.migrate),
+    ("migrate_search.py", migrate_search.migrate),
+    ("migrate_locations.py", migrate_locations.migrate),
+    ("migrate_indexes.py", migrate_indexes.migrate),
+    ("backfill_conversations.py", backfill_conversations.backfill_if_needed),
+]
+
+
+def main():
+    for name, step in STEPS:
+        print(f"── {name}")
+        step()
+
+
+if __name__ == "__main__":
+    main()
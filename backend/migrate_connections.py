@@ -0,0 +1,71 @@
+"""
+Convert the `connections` table to canonical undirected pairs.
+
+Old layout: (requester_id, requestee_id) primary key, one row per direction,
+so every "are A and B connected?" lookup had to OR both orderings.
+New layout: (user_a_id, user_b_id) primary key with user_a_id < user_b_id,
+plus requester_id recording who sent the request (see db/models.py).
+
+The script, in one transaction:
+  1. renames the old table to connections_legacy (and frees its constraint
+     and index names),
+  2. creates the new table with its indexes,
+  3. copies every pair across. If a pair somehow exists in both directions,
+     the accepted row (else the oldest) wins.
+
+connections_legacy is left in place; drop it once the new table checks out.
+Does nothing if the table is already in the new layout.
+
+Usage:  python migrate_connections.py
+"""
+
+from sqlalchemy import inspect, text
+
+from app.db.session import script_engine
+from app.db.models import connections
+
+COPY_SQL = text(
+    """
+    INSERT INTO connections (user_a_id, user_b_id, requester_id, status, created_at)
+    SELECT DISTINCT ON (LEAST(requester_id, requestee_id), GREATEST(requester_id, requestee_id))
+           LEAST(requester_id, requestee_id),
+           GREATEST(requester_id, requestee_id),
+           requester_id, status, created_at
+    FROM connections_legacy
+    WHERE requester_id <> requestee_id
+    ORDER BY LEAST(requester_id, requestee_id), GREATEST(requester_id, requestee_id),
+             (status = 'accepted') DESC, created_at
+    """
+)
+
+
+def migrate():
+    inspector = inspect(script_engine)
+    if not inspector.has_table("connections"):
+        connections.create(bind=script_engine)
+        print("✓ connections created")
+        return
+
+    columns = {c["name"] for c in inspector.get_columns("connections")}
+    if "requestee_id" not in columns:
+        print("✓ connections already uses canonical pairs")
+        return
+
+    with script_engine.begin() as conn:
+        conn.execute(text("ALTER TABLE connections RENAME TO connections_legacy"))
+        conn.execute(
+            text(
+                "ALTER TABLE connections_legacy "
+                "RENAME CONSTRAINT connections_pkey TO connections_legacy_pkey"
+            )
+        )
+        for index in ("ix_connections_requester_id_status", "ix_connections_requestee_id_status"):
+            conn.execute(text(f"DROP INDEX IF EXISTS {index}"))
+
+        connections.create(bind=conn)
+        result = conn.execute(COPY_SQL)
+        print(f"✓ connections: {result.rowcount} pairs copied from connections_legacy")
+
+
+if __name__ == "__main__":
+    migrate()
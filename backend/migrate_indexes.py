@@ -0,0 +1,45 @@
+"""
+Create any index declared in app/db/models.py that an existing database
+is missing.
+
+Base.metadata.create_all() only creates indexes together with new tables, so
+indexes added to tables that already exist (the keyset-pagination indexes,
+ix_connections_*_status, ...) need this script. Each one is built with
+CREATE INDEX CONCURRENTLY so reads and writes keep flowing while it runs.
+
+Tables that do not exist yet are skipped; create_all() will create them with
+their indexes. Full-text indexes that depend on a new column are handled by
+migrate_search.py.
+
+Safe to re-run.
+
+Usage:  python migrate_indexes.py
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from app.db.session import script_engine
+from app.db.models import Base
+
+
+def migrate():
+    existing_tables = set(inspect(script_engine).get_table_names())
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with script_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {c["name"] for c in inspect(conn).get_columns(table.name)}
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                if not {c.name for c in index.columns} <= columns:
+                    print(f"- {index.name} skipped (run migrate_search.py first)")
+                    continue
+                ddl = str(CreateIndex(index, if_not_exists=True).compile(dialect=script_engine.dialect))
+                conn.execute(text(ddl.replace("INDEX", "INDEX CONCURRENTLY", 1)))
+                print(f"✓ {index.name}")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,76 @@
+"""
+Add lat/lng columns to profiles and communities in an existing database.
+
+Fresh databases get these from Base.metadata.create_all(); this script
+brings older ones up to date:
+  1. adds nullable `lat` / `lng` columns to profiles and communities,
+  2. builds the (lat, lng) indexes with CREATE INDEX CONCURRENTLY, then
+  3. fills in community locations from the lake gazetteer (core/lakes.py)
+     when the community's lake is listed with a single point. Lakes with
+     several points (the Great Lakes' shores, names shared by different
+     lakes) are left NULL rather than guessed; such a community gets a
+     location when someone registers into it.
+
+Profile addresses are free text and are not geocoded here; profiles get a
+location the next time the address is saved (registration or settings).
+
+Safe to re-run.
+
+Usage:  python migrate_locations.py
+"""
+
+from sqlalchemy import select, text
+
+from app.core.lakes import lake_gazetteer
+from app.db.session import ScriptSessionLocal, script_engine
+from app.db.models import Community, Profile
+
+
+def migrate():
+    tables = [model.__table__ for model in (Profile, Community)]
+
+    with script_engine.begin() as conn:
+        for table in tables:
+            for column in ("lat", "lng"):
+                conn.execute(
+                    text(
+                        f"ALTER TABLE {table.name} "
+                        f"ADD COLUMN IF NOT EXISTS {column} double precision"
+                    )
+                )
+            print(f"✓ {table.name}.lat / {table.name}.lng")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with script_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in tables:
+            index = f"ix_{table.name}_lat_lng"
+            conn.execute(
+                text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} "
+                    f"ON {table.name} (lat, lng)"
+                )
+            )
+            print(f"✓ {index}")
+
+    backfill_communities()
+
+
+def backfill_communities():
+    db = ScriptSessionLocal()
+    try:
+        communities = db.scalars(select(Community).where(Community.lat.is_(None))).all()
+        located = 0
+        for community in communities:
+            lake = lake_gazetteer.unique_point(community.lake_name or community.name)
+            if lake is None:
+                continue
+            community.lat, community.lng = lake.lat, lake.lng
+            located += 1
+        db.commit()
+        print(f"✓ located {located} of {len(communities)} communities without coordinates")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,94 @@
+"""
+Move inline base64 images on items and ads into the media store.
+
+Rows whose image column still holds a data-URI are rewritten to the
+relative /media/<key> path of the stored blob, and item images get their
+thumbnail/medium renditions rendered inline. Absolute /media URLs stored by
+earlier versions are rewritten to the relative path too. Safe to re-run:
+rows that already hold paths or external URLs are skipped, and identical
+images are only stored once.
+
+The data-URI in the row is the only copy of an image until this runs, so
+the script refuses to rewrite rows unless MEDIA_ROOT_DURABLE says the media
+store is on persistent storage (the volume mounted in fly.toml).
+
+Usage:  python migrate_media.py
+"""
+
+import sys
+
+from app.core.config import settings
+from app.db.session import ScriptSessionLocal
+from app.db.models import Item, Ad
+from app.core.media import media_key, media_path, store_data_uri
+from app.core.thumbnails import render_renditions
+
+BATCH_SIZE = 50
+
+
+def migrate_model(db, model) -> int:
+    """Rewrite data-URI images on `model` in id-ordered batches."""
+    relativize(db, model)
+    migrated = 0
+    last_id = None
+    while True:
+        q = db.query(model.id).filter(model.image.like("data:%"))
+        if last_id is not None:
+            q = q.filter(model.id > last_id)
+        ids = [row.id for row in q.order_by(model.id).limit(BATCH_SIZE).all()]
+        if not ids:
+            return migrated
+
+        # Only load the heavy image column for the current batch
+        for row in db.query(model).filter(model.id.in_(ids)).all():
+            try:
+                row.image = store_data_uri(row.image)
+                migrated += 1
+            except Exception as e:
+                print(f"  ! Skipping {model.__tablename__} {row.id}: {e}")
+                continue
+            if model is Item:
+                try:
+                    render_renditions(row.image.rsplit("/", 1)[-1])
+                except Exception as e:
+                    print(f"  ! No renditions for item {row.id}: {e}")
+        db.commit()
+        db.expunge_all()
+        last_id = ids[-1]
+
+
+def relativize(db, model) -> None:
+    """Rewrite absolute /media URLs to the relative path."""
+    changed = 0
+    for row in db.query(model).filter(model.image.like("http%/media/%")).all():
+        key = media_key(row.image)
+        if key:
+            row.image = media_path(key)
+            changed += 1
+    db.commit()
+    if changed:
+        print(f"✓ Made {changed} {model.__tablename__} image URLs relative")
+
+
+def migrate():
+    if settings.MEDIA_BACKEND == "local" and not settings.MEDIA_ROOT_DURABLE:
+        print(
+            f"MEDIA_ROOT ({settings.MEDIA_ROOT}) is not marked durable; refusing to "
+            "replace inline images. Mount persistent storage and set MEDIA_ROOT_DURABLE=true."
+        )
+        sys.exit(1)
+    db = ScriptSessionLocal()
+    try:
+        items = migrate_model(db, Item)
+        print(f"✓ Migrated {items} item images")
+        ads = migrate_model(db, Ad)
+        print(f"✓ Migrated {ads} ad images")
+    except Exception as e:
+        print(f"Error migrating media: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    migrate()
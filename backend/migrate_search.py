@@ -0,0 +1,50 @@
+"""
+Add full-text search columns and indexes to an existing database.
+
+Fresh databases get these from Base.metadata.create_all(); this script
+brings older ones up to date:
+  1. adds the generated `search_vector` column to profiles, communities and
+     items (Postgres fills it for existing rows as part of the ALTER), then
+  2. builds each GIN index with CREATE INDEX CONCURRENTLY so reads and
+     writes keep flowing while it runs.
+
+Safe to re-run.
+
+Usage:  python migrate_search.py
+"""
+
+from sqlalchemy import text
+
+from app.db.session import script_engine
+from app.db.models import Profile, Community, Item
+
+
+def migrate():
+    tables = [model.__table__ for model in (Profile, Community, Item)]
+
+    with script_engine.begin() as conn:
+        for table in tables:
+            expr = table.c.search_vector.computed.sqltext
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS search_vector "
+                    f"tsvector GENERATED ALWAYS AS ({expr}) STORED"
+                )
+            )
+            print(f"✓ {table.name}.search_vector")
+
+    # CONCURRENTLY cannot run inside a transaction block
+    with script_engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table in tables:
+            index = f"ix_{table.name}_search_vector"
+            conn.execute(
+                text(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index} "
+                    f"ON {table.name} USING gin (search_vector)"
+                )
+            )
+            print(f"✓ {index}")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -1,8 +1,10 @@
+import sys
 import uuid
 import random
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal, engine
+from app.core.lakes import lake_gazetteer
+from app.db.session import ScriptSessionLocal, script_engine
 from app.db.models import (
     Profile,
     Community,
@@ -15,14 +17,15 @@ from app.db.models import (
     AdStatus,
     AdType,
     Base,
+    connections,
 )
 
 # Ensure tables exist
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=script_engine)
 
 
 def seed():
-    db = SessionLocal()
+    db = ScriptSessionLocal()
     try:
 
         # 1. Interests
@@ -110,6 +113,9 @@ def seed():
             comm = db.query(Community).filter(Community.name == cdata["name"]).first()
             if not comm:
                 comm = Community(**cdata)
+                lake = lake_gazetteer.unique_point(cdata["lake_name"])
+                if lake:
+                    comm.lat, comm.lng = lake.lat, lake.lng
                 db.add(comm)
             communities.append(comm)
         db.flush()
@@ -895,5 +901,61 @@ def seed():
         db.close()
 
 
+def seed_connection_graph(users=100_000, avg_degree=20, batch_size=10_000):
+    """
+    Synthetic social graph for exercising /connections/suggestions at scale.
+
+    Adds `users` throwaway profiles (graph_<n>@example.com) with about
+    `avg_degree` accepted connections each. Connections are drawn from a
+    sliding window of nearby profiles so that friends-of-friends overlap the
+    way real neighbourhoods do.
+    """
+    window = avg_degree * 10
+    ids = [uuid.uuid4() for _ in range(users)]
+
+    with script_engine.begin() as conn:
+        for start in range(0, users, batch_size):
+            conn.execute(
+                Profile.__table__.insert(),
+                [
+                    {
+                        "id": ids[n],
+                        "username": f"graph_{n}",
+                        "email": f"graph_{n}@example.com",
+                        "is_business": False,
+                    }
+                    for n in range(start, min(start + batch_size, users))
+                ],
+            )
+        print(f"✓ Seeded {users} graph profiles")
+
+        edges = set()
+        for n in range(users):
+            for _ in range(avg_degree // 2):
+                m = n + random.randint(1, window)
+                if m < users:
+                    edges.add((n, m))
+        edges = list(edges)
+        for start in range(0, len(edges), batch_size):
+            conn.execute(
+                connections.insert(),
+                [
+                    {
+                        "user_a_id": min(ids[a], ids[b]),
+                        "user_b_id": max(ids[a], ids[b]),
+                        "requester_id": ids[a],
+                        "status": "accepted",
+                    }
+                    for a, b in edges[start : start + batch_size]
+                ],
+            )
+        print(f"✓ Seeded {len(edges)} connections")
+
+
 if __name__ == "__main__":
-    seed()
+    # python seed_db.py             – demo data
+    # python seed_db.py graph [N]   – N-user synthetic connection graph
+    if len(sys.argv) > 1 and sys.argv[1] == "graph":
+        seed_connection_graph(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
+    else:
+        seed()
@@ -0,0 +1,94 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import auth
+from app.core.auth import JWKSCache
+
+URL = "https://example.supabase.co/auth/v1/.well-known/jwks.json"
+
+
+class StubJWKS:
+    """Stands in for Supabase's JWKS endpoint and counts the requests."""
+
+    def __init__(self, kids=("k1",), delay=0.05):
+        self.kids = list(kids)
+        self.delay = delay
+        self.calls = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={"keys": [{"kid": kid} for kid in self.kids]})
+
+
+@pytest.fixture
+def jwks(monkeypatch):
+    stub = StubJWKS()
+    client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handle))
+    monkeypatch.setattr(auth, "get_http_client", lambda: client)
+    return stub
+
+
+def test_cold_cache_fetches_once_for_concurrent_callers(jwks):
+    cache = JWKSCache(URL, ttl=600, min_refresh_interval=30)
+
+    async def run():
+        return await asyncio.gather(*(cache.get() for _ in range(20)))
+
+    results = asyncio.run(run())
+    assert jwks.calls == 1
+    assert all(r == {"keys": [{"kid": "k1"}]} for r in results)
+
+
+def test_stale_keys_are_served_while_one_refresh_runs(jwks):
+    cache = JWKSCache(URL, ttl=600, min_refresh_interval=30)
+
+    async def run():
+        await cache.get()
+        cache._fetched_at -= 600
+        jwks.kids = ["k2"]
+        stale = await asyncio.gather(*(cache.get() for _ in range(10)))
+        await cache._inflight
+        return stale, await cache.get()
+
+    stale, fresh = asyncio.run(run())
+    assert all(r == {"keys": [{"kid": "k1"}]} for r in stale)
+    assert fresh == {"keys": [{"kid": "k2"}]}
+    assert jwks.calls == 2
+
+
+def test_unknown_kid_refetches_at_most_once_per_interval(jwks):
+    cache = JWKSCache(URL, ttl=600, min_refresh_interval=30)
+
+    async def run():
+        await cache.get()
+        jwks.kids = ["k1", "rotated"]
+        found = await asyncio.gather(*(cache.get_key("rotated") for _ in range(5)))
+        missing = [await cache.get_key("bogus") for _ in range(5)]
+        return found, missing
+
+    found, missing = asyncio.run(run())
+    assert found == [{"kid": "rotated"}] * 5
+    assert missing == [None] * 5
+    # The initial fetch plus one forced refetch; "bogus" is rate limited
+    assert jwks.calls == 2
+
+
+def test_failed_refetch_for_unknown_kid_returns_none(monkeypatch, jwks):
+    cache = JWKSCache(URL, ttl=600, min_refresh_interval=0)
+
+    async def fail(request):
+        raise httpx.ConnectError("down")
+
+    async def run():
+        await cache.get()
+        monkeypatch.setattr(
+            auth,
+            "get_http_client",
+            lambda: httpx.AsyncClient(transport=httpx.MockTransport(fail)),
+        )
+        return await cache.get_key("unknown"), await cache.get_key("k1")
+
+    assert asyncio.run(run()) == (None, {"kid": "k1"})
@@ -0,0 +1,69 @@
+import pytest
+
+from app.core import cache
+from app.core.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_get_returns_value_until_it_expires(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1)
+    assert c.get("a") == 1
+    clock[0] += 59
+    assert c.get("a") == 1
+    clock[0] += 1
+    assert c.get("a") is None
+    assert len(c) == 0
+
+
+def test_per_entry_ttl_overrides_default(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("short", 1, ttl=5)
+    c.set("long", 2)
+    clock[0] += 10
+    assert c.get("short") is None
+    assert c.get("long") == 2
+
+
+def test_evicts_least_recently_used(clock):
+    c = TTLCache(maxsize=2, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")  # "b" is now the least recently used
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1
+    assert c.get("c") == 3
+
+
+def test_zero_size_or_ttl_disables_caching(clock):
+    for c in (TTLCache(maxsize=0, ttl=60), TTLCache(maxsize=10, ttl=0)):
+        c.set("a", 1)
+        assert c.get("a", "missing") == "missing"
+
+
+def test_pop_and_clear(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.pop("a")
+    c.pop("not there")
+    assert c.get("a") is None
+    c.clear()
+    assert len(c) == 0
+
+
+def test_stats_count_hits_and_misses(clock):
+    c = TTLCache(maxsize=10, ttl=60)
+    c.set("a", 1)
+    c.get("a")
+    c.get("a")
+    c.get("b")
+    c.get("c")
+    assert c.stats() == {"size": 1, "maxsize": 10, "hits": 2, "misses": 2, "hit_rate": 0.5}
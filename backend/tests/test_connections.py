@@ -0,0 +1,44 @@
+import asyncio
+import uuid
+
+import pytest
+
+from app.db.models import Profile
+from app.routers.connections import list_connections, list_requests
+
+
+def make_profiles(n):
+    return [Profile(id=uuid.uuid4(), username=f"user{i:05}", bio="") for i in range(n)]
+
+
+@pytest.mark.parametrize("count", [1, 5000])
+def test_connections_list_is_one_statement(recording_db, count):
+    recording_db.rows = make_profiles(count)
+
+    out = asyncio.run(list_connections(q=None, db=recording_db, profile_id=uuid.uuid4()))
+
+    assert len(out) == count
+    assert len(recording_db.statements) == 1
+    assert "JOIN" in recording_db.sql()
+
+
+def test_connections_search_is_filtered_in_sql(recording_db):
+    recording_db.rows = make_profiles(5000)
+
+    asyncio.run(list_connections(q="50%", db=recording_db, profile_id=uuid.uuid4()))
+
+    assert len(recording_db.statements) == 1
+    sql = recording_db.sql()
+    assert "profiles.username ILIKE" in sql
+    assert "profiles.bio ILIKE" in sql
+
+
+@pytest.mark.parametrize("count", [1, 5000])
+def test_requests_list_is_one_statement(recording_db, count):
+    recording_db.rows = make_profiles(count)
+
+    out = asyncio.run(list_requests(db=recording_db, profile_id=uuid.uuid4()))
+
+    assert len(out) == count
+    assert len(recording_db.statements) == 1
+    assert "JOIN connections" in recording_db.sql()
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.core.etag import etag_matches
+from app.routers import ads
+
+ETAG = '"3f2a9c"'
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        '"3f2a9c"',
+        'W/"3f2a9c"',
+        '"0000", "3f2a9c"',
+        '"0000",W/"3f2a9c" ',
+        "*",
+        " * ",
+    ],
+)
+def test_matches(header):
+    assert etag_matches(header, ETAG)
+
+
+@pytest.mark.parametrize("header", [None, "", '"0000"', '"0000", W/"1111"', "3f2a9c", '"3f2a9"'])
+def test_does_not_match(header):
+    assert not etag_matches(header, ETAG)
+
+
+def test_weak_etag_matches_a_strong_validator():
+    assert etag_matches('"3f2a9c"', 'W/"3f2a9c"')
+
+
+def _request(if_none_match=None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": "/ads", "headers": headers})
+
+
+@pytest.fixture
+def cached_feed():
+    ads.ads_cache.clear()
+    ads.ads_cache.set(20, (ETAG, b"[]"))
+    yield
+    ads.ads_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [(None, 200), ('"0000"', 200), (ETAG, 304), (f'"0000", W/{ETAG}', 304), ("*", 304)],
+)
+def test_ads_feed_revalidates(cached_feed, header, status):
+    response = asyncio.run(ads.list_approved_ads(_request(header), limit=20, db=None))
+    assert response.status_code == status
+    assert response.headers["etag"] == ETAG
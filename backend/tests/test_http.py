@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core import http
+
+
+@pytest.fixture
+def closed_client():
+    asyncio.run(http.close_http_client())
+    yield
+    asyncio.run(http.close_http_client())
+
+
+def test_dependency_does_not_create_a_client(closed_client):
+    with pytest.raises(RuntimeError):
+        http.get_http_client()
+
+
+def test_open_creates_one_shared_client(closed_client):
+    client = http.open_http_client()
+    assert http.open_http_client() is client
+    assert http.get_http_client() is client
+    assert http.upstream_stats() == {}
+
+
+def test_client_gets_the_configured_limits_and_timeouts(closed_client):
+    client = http.open_http_client()
+    settings = http.settings
+
+    assert client.timeout == httpx.Timeout(
+        settings.HTTP_TIMEOUT_SECONDS, connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS
+    )
+    # The pool behind AsyncHTTPTransport is httpcore's; these are its limits
+    pool = http._transport._transport._pool
+    assert pool._max_connections == settings.HTTP_MAX_CONNECTIONS
+    assert pool._max_keepalive_connections == settings.HTTP_MAX_KEEPALIVE_CONNECTIONS
+    assert pool._keepalive_expiry == settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+
+
+def test_latency_is_bucketed_per_host(closed_client, monkeypatch):
+    # A fake clock the stub upstream advances, so latencies are exact
+    clock = [0.0]
+    monkeypatch.setattr(http.time, "perf_counter", lambda: clock[0])
+    latency_ms = {"maps.googleapis.com": 3, "api.resend.com": 120}
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        clock[0] += latency_ms[request.url.host] / 1000
+        if request.url.path == "/down":
+            return httpx.Response(503)
+        if request.url.path == "/reset":
+            raise httpx.ConnectError("reset", request=request)
+        return httpx.Response(200, json={})
+
+    monkeypatch.setattr(http, "_transport", http.TimedTransport(httpx.MockTransport(upstream)))
+
+    async def run():
+        async with httpx.AsyncClient(transport=http._transport) as client:
+            for _ in range(3):
+                await client.get("https://maps.googleapis.com/maps/api/geocode/json")
+            await client.get("https://api.resend.com/emails")
+            await client.get("https://api.resend.com/down")
+            with pytest.raises(httpx.ConnectError):
+                await client.get("https://api.resend.com/reset")
+
+    asyncio.run(run())
+    stats = http.upstream_stats()
+
+    assert set(stats) == {"maps.googleapis.com", "api.resend.com"}
+    maps, resend = stats["maps.googleapis.com"], stats["api.resend.com"]
+    assert (maps["count"], maps["errors"]) == (3, 0)
+    assert maps["buckets"]["le_5ms"] == 3
+    assert sum(maps["buckets"].values()) == 3
+    assert maps["avg_ms"] == pytest.approx(3)
+    # 503 and the connect error count as errors, and still land in a bucket
+    assert (resend["count"], resend["errors"]) == (3, 2)
+    assert resend["buckets"]["le_250ms"] == 3
+    assert sum(resend["buckets"].values()) == 3
+    assert resend["max_ms"] == pytest.approx(120)
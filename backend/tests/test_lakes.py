@@ -0,0 +1,121 @@
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from app.core.geo import haversine_km
+from app.core.lakes import BUNDLED_LAKES_PATH, LakeGazetteer, lake_name_variants
+from app.routers import maps
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    g = LakeGazetteer(BUNDLED_LAKES_PATH)
+    g.load()
+    return g
+
+
+def brute_force(g, lat, lng, k, max_km):
+    best = {}
+    for lake in g._points:
+        km = haversine_km(lat, lng, lake.lat, lake.lng)
+        if km <= max_km and (lake.name not in best or km < best[lake.name][0]):
+            best[lake.name] = (km, lake)
+    return sorted(best.values(), key=lambda entry: entry[0])[:k]
+
+
+@pytest.mark.parametrize("k,max_km", [(1, 50), (5, 50), (5, 10), (20, 300)])
+def test_nearest_matches_brute_force(gazetteer, k, max_km):
+    rng = random.Random(411)
+    for _ in range(200):
+        # Michigan plus a margin, so some points have nothing in range
+        lat, lng = rng.uniform(41.0, 48.5), rng.uniform(-91.0, -82.0)
+        got = gazetteer.nearest(lat, lng, k, max_km)
+        expected = brute_force(gazetteer, lat, lng, k, max_km)
+        assert [km for _, km in got] == pytest.approx([km for km, _ in expected])
+        assert len({lake.name for lake, _ in got}) == len(got)
+
+
+def test_nearest_far_from_any_lake_is_empty(gazetteer):
+    assert gazetteer.nearest(0.0, 0.0, 5, 50) == []
+
+
+def test_name_variants():
+    assert lake_name_variants("Lake  Cadillac") == {"lake cadillac", "cadillac lake"}
+    assert lake_name_variants("Cadillac Lake") == {"cadillac lake", "lake cadillac"}
+    assert lake_name_variants("Lake") == {"lake"}
+
+
+def test_points_and_unique_point(tmp_path):
+    csv = tmp_path / "lakes.csv"
+    csv.write_text(
+        "# test data\n"
+        "name,lat,lng\n"
+        "Portage Lake,44.36,-86.23\n"
+        "Portage Lake,47.08,-88.50\n"
+        "Lake Cadillac,44.25,-85.41\n"
+    )
+    g = LakeGazetteer(csv)
+    assert len(g.points("portage lake")) == 2
+    assert g.unique_point("Portage Lake") is None
+    assert g.unique_point("Cadillac Lake").lat == 44.25
+    assert g.unique_point("Houghton Lake") is None
+    assert g.locate("Portage Lake", 47.0, -88.4).lat == 47.08
+
+
+INDIAN_LAKE = {
+    "name": "Indian Lake",
+    "geometry": {"location": {"lat": 41.902, "lng": -86.118}},
+    "source": "google",
+}
+
+
+def nearby(monkeypatch, lat, lng, google=None, error=None):
+    calls = []
+
+    async def fake_google(client, lat, lng):
+        calls.append((lat, lng))
+        if error:
+            raise error
+        return [dict(r) for r in google or []]
+
+    async def no_communities(db, results):
+        pass
+
+    monkeypatch.setattr(maps, "_google_nearby_lakes", fake_google)
+    monkeypatch.setattr(maps, "_link_communities", no_communities)
+    out = asyncio.run(maps.nearby_lakes(lat=lat, lng=lng, client=None, db=None))
+    return out["results"], calls
+
+
+def test_lake_missing_from_gazetteer_comes_from_google(monkeypatch):
+    results, calls = nearby(monkeypatch, 41.90, -86.12, google=[INDIAN_LAKE])
+    assert len(calls) == 1
+    assert results[0]["name"] == "Indian Lake"
+    assert results[0]["distance_km"] < 1
+    # The bundled lakes further out are still offered after it
+    assert any(r["source"] == "gazetteer" for r in results)
+    assert len(results) <= maps.NEARBY_LAKES_LIMIT
+
+
+def test_point_on_a_bundled_lake_skips_google(monkeypatch, gazetteer):
+    lake = gazetteer._points[0]
+    results, calls = nearby(monkeypatch, lake.lat, lake.lng)
+    assert calls == []
+    assert results[0]["name"] == lake.name
+
+
+def test_same_lake_from_both_sources_is_listed_once(monkeypatch, gazetteer):
+    lake = gazetteer._points[0]
+    # 0.03° of latitude is over LAKES_LOCAL_MATCH_KM, so Google is asked
+    google = [{"name": lake.name, "geometry": {"location": {"lat": lake.lat, "lng": lake.lng}}}]
+    results, calls = nearby(monkeypatch, lake.lat + 0.03, lake.lng, google=google)
+    assert len(calls) == 1
+    assert [r["name"] for r in results].count(lake.name) == 1
+
+
+def test_google_failure_falls_back_to_gazetteer(monkeypatch):
+    results, _ = nearby(monkeypatch, 41.90, -86.12, error=httpx.ConnectError("down"))
+    assert results
+    assert all(r["source"] == "gazetteer" for r in results)
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.routers import maps
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(maps.settings, "MAPS_CACHE_PERSIST", False)
+    maps.maps_cache.clear()
+    yield
+    maps.maps_cache.clear()
+
+
+def counting_fetch(value, cacheable=True, delay=0.05):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value, cacheable
+
+    return fetch, calls
+
+
+def test_concurrent_lookups_share_one_fetch():
+    fetch, calls = counting_fetch({"status": "OK"})
+
+    async def run():
+        return await asyncio.gather(*(maps.cached("k", fetch) for _ in range(10)))
+
+    assert asyncio.run(run()) == [{"status": "OK"}] * 10
+    assert len(calls) == 1
+    assert maps._inflight == {}
+
+
+def test_cached_value_is_reused():
+    fetch, calls = counting_fetch({"status": "OK"})
+
+    async def run():
+        await maps.cached("k", fetch)
+        return await maps.cached("k", fetch)
+
+    assert asyncio.run(run()) == {"status": "OK"}
+    assert len(calls) == 1
+
+
+def test_uncacheable_response_is_fetched_again():
+    fetch, calls = counting_fetch({"status": "OVER_QUERY_LIMIT"}, cacheable=False)
+
+    async def run():
+        await maps.cached("k", fetch)
+        await maps.cached("k", fetch)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch():
+    fetch, calls = counting_fetch({"status": "OK"}, delay=0.1)
+
+    async def run():
+        first = asyncio.create_task(maps.cached("k", fetch))
+        second = asyncio.create_task(maps.cached("k", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == {"status": "OK"}
+    assert len(calls) == 1
+    assert maps.maps_cache.get("k") == {"status": "OK"}
+
+
+def test_failed_fetch_reaches_every_waiter():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(
+            *(maps.cached("k", fetch) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert maps._inflight == {}
@@ -0,0 +1,64 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.media import LocalMediaStore, MediaStore
+from app.routers import media as media_router
+
+
+def test_backend_missing_a_method_fails_on_creation():
+    class NoRead(MediaStore):
+        def exists(self, key):
+            return False
+
+        def write(self, key, data):
+            pass
+
+    with pytest.raises(TypeError):
+        NoRead()
+
+
+def test_local_store_deduplicates_by_digest(tmp_path):
+    store = LocalMediaStore(str(tmp_path))
+    key = store.put(b"\x89PNG...", "image/png")
+    assert store.put(b"\x89PNG...", "image/png") == key
+    assert key.endswith(".png")
+    assert store.read(key) == b"\x89PNG..."
+
+
+def _get(key, if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    request = Request({"type": "http", "method": "GET", "path": f"/media/{key}", "headers": headers})
+    return media_router.get_media(key, request)
+
+
+@pytest.fixture
+def stored_key(tmp_path, monkeypatch):
+    store = LocalMediaStore(str(tmp_path))
+    monkeypatch.setattr(media_router, "media_store", store)
+    return store.put(b"\x89PNG...", "image/png")
+
+
+@pytest.mark.parametrize(
+    "header, status",
+    [
+        (None, 200),
+        ('"0000"', 200),
+        ("{etag}", 304),
+        ("W/{etag}", 304),
+        ('"0000", {etag}', 304),
+        ("*", 304),
+    ],
+)
+def test_media_revalidates(stored_key, header, status):
+    etag = f'"{stored_key.rsplit(".", 1)[0]}"'
+    response = _get(stored_key, header and header.format(etag=etag))
+    assert response.status_code == status
+    assert response.headers["etag"] == etag
+
+
+def test_star_does_not_match_a_missing_blob(stored_key):
+    missing = "0" * len(stored_key.rsplit(".", 1)[0]) + ".png"
+    with pytest.raises(HTTPException) as e:
+        _get(missing, "*")
+    assert e.value.status_code == 404
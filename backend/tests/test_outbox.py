@@ -0,0 +1,86 @@
+import asyncio
+import json
+import uuid
+from datetime import timedelta
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.outbox import (
+    BACKOFF_BASE_SECONDS,
+    BACKOFF_MAX_SECONDS,
+    OutboxWorker,
+    backoff_seconds,
+)
+from app.db.models import EmailOutbox
+
+
+def test_backoff_doubles_from_base():
+    assert [backoff_seconds(n) for n in (1, 2, 3, 4)] == [
+        BACKOFF_BASE_SECONDS,
+        BACKOFF_BASE_SECONDS * 2,
+        BACKOFF_BASE_SECONDS * 4,
+        BACKOFF_BASE_SECONDS * 8,
+    ]
+
+
+def test_backoff_is_capped():
+    assert backoff_seconds(50) == BACKOFF_MAX_SECONDS
+    delays = [backoff_seconds(n) for n in range(1, 20)]
+    assert delays == sorted(delays)
+    assert max(delays) == BACKOFF_MAX_SECONDS
+
+
+class ResendSink:
+    """Local stand-in for Resend's HTTP API; answers every send with `status`."""
+
+    def __init__(self, status):
+        self.status = status
+        self.requests = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return httpx.Response(self.status, json={"id": "stub"})
+
+
+def deliver(recording_db, status, attempts=1):
+    sink = ResendSink(status)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(sink.handle))
+    email = EmailOutbox(
+        id=uuid.uuid4(), to_address="owner@example.com", subject="Approved",
+        html="<p>ok</p>", attempts=attempts,
+    )
+    asyncio.run(OutboxWorker()._deliver(recording_db, client, email))
+    assert len(sink.requests) == 1
+    assert len(recording_db.statements) == 1
+    return recording_db.statements[0].compile().params, sink.requests[0]
+
+
+def test_2xx_marks_email_sent(recording_db):
+    params, request = deliver(recording_db, 200)
+    assert params["status"] == "sent"
+    assert params["last_error"] is None
+    body = json.loads(request.content)
+    assert body["to"] == ["owner@example.com"]
+    assert body["subject"] == "Approved"
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_retryable_error_reschedules_with_backoff(recording_db, status):
+    params, _ = deliver(recording_db, status, attempts=3)
+    assert "status" not in params
+    assert timedelta(seconds=backoff_seconds(3)) in params.values()
+    assert str(status) in params["last_error"]
+
+
+@pytest.mark.parametrize("status", [400, 403, 422])
+def test_4xx_marks_email_failed(recording_db, status):
+    params, _ = deliver(recording_db, status)
+    assert params["status"] == "failed"
+    assert "PermanentEmailError" in params["last_error"]
+
+
+def test_last_attempt_marks_email_failed(recording_db):
+    params, _ = deliver(recording_db, 500, attempts=settings.OUTBOX_MAX_ATTEMPTS)
+    assert params["status"] == "failed"
@@ -0,0 +1,59 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.pagination import (
+    decode_cursor,
+    decode_sync_cursor,
+    encode_cursor,
+    encode_sync_cursor,
+)
+
+CREATED_AT = datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+ROW_ID = uuid.UUID("6f1c2a4e-8d3b-4b7a-9c1e-2f5d6a7b8c9d")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(CREATED_AT, ROW_ID)
+    assert decode_cursor(cursor) == (CREATED_AT, ROW_ID, None)
+
+
+def test_cursor_round_trip_with_rank():
+    cursor = encode_cursor(CREATED_AT, ROW_ID, rank=0.0607927)
+    assert decode_cursor(cursor) == (CREATED_AT, ROW_ID, 0.0607927)
+
+
+def test_cursor_is_url_safe_without_padding():
+    cursor = encode_cursor(CREATED_AT, ROW_ID)
+    assert "=" not in cursor
+    assert set(cursor) <= set(
+        "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["", "not a cursor", encode_cursor(CREATED_AT, ROW_ID)[:-4], "eyJ0IjogMX0"],
+)
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as e:
+        decode_cursor(cursor)
+    assert e.value.status_code == 400
+
+
+def test_sync_cursor_round_trip():
+    seen = {ROW_ID, uuid.uuid4()}
+    assert decode_sync_cursor(encode_sync_cursor(CREATED_AT, seen)) == (CREATED_AT, seen)
+
+
+def test_sync_cursor_accepts_keyset_cursor():
+    cursor = encode_cursor(CREATED_AT, ROW_ID)
+    assert decode_sync_cursor(cursor) == (CREATED_AT, {ROW_ID})
+
+
+def test_invalid_sync_cursor_is_a_400():
+    with pytest.raises(HTTPException) as e:
+        decode_sync_cursor("garbage")
+    assert e.value.status_code == 400
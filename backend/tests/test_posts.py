@@ -0,0 +1,81 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import Response
+
+from app.db.models import Community, Post, PostType, Profile
+from app.routers.posts_items import ProfileUpdate, list_posts, update_my_profile
+
+START = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def make_posts(n):
+    posts = []
+    for i in range(n):
+        author = Profile(id=uuid.uuid4(), username=f"user{i}", is_business=False)
+        community = Community(id=uuid.uuid4(), name=f"Lake {i}")
+        posts.append(
+            Post(
+                id=uuid.uuid4(),
+                title=f"Post {i}",
+                content="...",
+                post_type=PostType.GENERAL,
+                created_at=START - timedelta(minutes=i),
+                author_id=author.id,
+                author=author,
+                community_id=community.id,
+                community=community,
+            )
+        )
+    return posts
+
+
+@pytest.mark.parametrize("limit", [1, 100])
+def test_feed_is_one_statement_for_any_page_size(recording_db, limit):
+    recording_db.rows = make_posts(limit + 1)
+    response = Response()
+
+    out = asyncio.run(
+        list_posts(
+            response, community_id=None, user_id=None, cursor=None, limit=limit,
+            db=recording_db, _=uuid.uuid4(),
+        )
+    )
+
+    assert len(out) == limit
+    assert out[-1]["author_username"] == f"user{limit - 1}"
+    assert out[-1]["community_name"] == f"Lake {limit - 1}"
+    assert "X-Next-Cursor" in response.headers
+    assert len(recording_db.statements) == 1
+    # Author and community come back on the same rows as the posts
+    sql = recording_db.sql()
+    assert "JOIN profiles" in sql
+    assert "JOIN communities" in sql
+
+
+def located_profile():
+    return Profile(id=uuid.uuid4(), username="me", address="1 Shore Dr", lat=42.5, lng=-85.1)
+
+
+def test_new_address_without_coordinates_clears_location(recording_db):
+    profile = located_profile()
+    body = ProfileUpdate(address="9 Pier Rd")
+    asyncio.run(update_my_profile(body, db=recording_db, profile=profile))
+    assert profile.address == "9 Pier Rd"
+    assert profile.lat is None and profile.lng is None
+
+
+def test_new_address_with_coordinates_moves_location(recording_db):
+    profile = located_profile()
+    body = ProfileUpdate(address="9 Pier Rd", lat=43.0, lng=-86.0)
+    asyncio.run(update_my_profile(body, db=recording_db, profile=profile))
+    assert (profile.lat, profile.lng) == (43.0, -86.0)
+
+
+@pytest.mark.parametrize("body", [ProfileUpdate(bio="hi"), ProfileUpdate(address="1 Shore Dr")])
+def test_unchanged_address_keeps_location(recording_db, body):
+    profile = located_profile()
+    asyncio.run(update_my_profile(body, db=recording_db, profile=profile))
+    assert (profile.lat, profile.lng) == (42.5, -85.1)
@@ -0,0 +1,117 @@
+import asyncio
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.routers import realtime
+
+PROFILE_ID = uuid.uuid4()
+EVENT = {"type": "message", "id": "m1", "content": "hi"}
+
+
+class StubHub:
+    """Hands each socket a queue that already holds EVENT."""
+
+    def __init__(self):
+        self.subscribed = []
+        self.unsubscribed = []
+
+    def subscribe(self, profile_id):
+        queue = asyncio.Queue()
+        queue.put_nowait(EVENT)
+        self.subscribed.append(profile_id)
+        return queue
+
+    def unsubscribe(self, profile_id, queue):
+        self.unsubscribed.append(profile_id)
+
+
+class StubSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def socket(monkeypatch):
+    claims = {"sub": "user-1", "exp": time.time() + 3600}
+
+    async def verify_token(token):
+        if token != "good":
+            raise HTTPException(status_code=401, detail="Invalid token")
+        return dict(claims)
+
+    async def get_current_profile_id(user, db):
+        return PROFILE_ID
+
+    hub = StubHub()
+    monkeypatch.setattr(realtime, "verify_token", verify_token)
+    monkeypatch.setattr(realtime, "get_current_profile_id", get_current_profile_id)
+    monkeypatch.setattr(realtime, "AsyncSessionLocal", StubSession)
+    monkeypatch.setattr(realtime, "message_hub", hub)
+
+    app = FastAPI()
+    app.include_router(realtime.router)
+    client = TestClient(app)
+    client.claims, client.hub = claims, hub
+    return client
+
+
+def _close_code(ws) -> int:
+    with pytest.raises(WebSocketDisconnect) as closed:
+        ws.receive_json()
+    return closed.value.code
+
+
+def test_token_is_read_from_the_first_frame(socket):
+    with socket.websocket_connect("/ws/messages") as ws:
+        ws.send_json({"type": "auth", "token": "good"})
+        assert ws.receive_json() == {"type": "ready"}
+        assert ws.receive_json() == EVENT
+    assert socket.hub.subscribed == [PROFILE_ID]
+
+
+def test_token_in_the_query_string_is_not_accepted(socket):
+    with socket.websocket_connect("/ws/messages?token=good") as ws:
+        ws.send_json({"type": "hello"})
+        assert _close_code(ws) == 1008
+    assert socket.hub.subscribed == []
+
+
+@pytest.mark.parametrize(
+    "send",
+    [
+        lambda ws: ws.send_json({"type": "auth", "token": "bad"}),
+        lambda ws: ws.send_json({"type": "auth"}),
+        lambda ws: ws.send_json(["auth", "good"]),
+        lambda ws: ws.send_text("good"),
+        lambda ws: ws.send_bytes(b"good"),
+    ],
+)
+def test_bad_auth_frame_closes_with_policy_violation(socket, send):
+    with socket.websocket_connect("/ws/messages") as ws:
+        send(ws)
+        assert _close_code(ws) == 1008
+    assert socket.hub.subscribed == []
+
+
+def test_missing_auth_frame_times_out(socket, monkeypatch):
+    monkeypatch.setattr(realtime, "AUTH_TIMEOUT_SECONDS", 0.05)
+    with socket.websocket_connect("/ws/messages") as ws:
+        assert _close_code(ws) == 1008
+
+
+def test_socket_closes_when_the_token_expires(socket):
+    socket.claims["exp"] = time.time() + 0.2
+    with socket.websocket_connect("/ws/messages") as ws:
+        ws.send_json({"type": "auth", "token": "good"})
+        assert ws.receive_json() == {"type": "ready"}
+        assert ws.receive_json() == EVENT
+        assert _close_code(ws) == 1008
+    assert socket.hub.unsubscribed == [PROFILE_ID]
@@ -0,0 +1,30 @@
+import asyncio
+from unittest.mock import MagicMock
+
+from sqlalchemy.util import greenlet_spawn
+
+from app.db.session import TimedAsyncQueuePool, TimedQueuePool
+
+
+def _checkout_twice(pool):
+    pool.connect().close()
+    pool.connect().close()
+
+
+def test_sync_pool_records_checkout_waits():
+    pool = TimedQueuePool(MagicMock, pool_size=1, max_overflow=0)
+    _checkout_twice(pool)
+    assert pool.wait_count == 2
+    assert pool.wait_max >= 0.0
+
+
+def test_async_pool_records_checkout_waits():
+    pool = TimedAsyncQueuePool(MagicMock, pool_size=1, max_overflow=0)
+    asyncio.run(greenlet_spawn(_checkout_twice, pool))
+    assert pool.wait_count == 2
+
+
+def test_stats_survive_recreate():
+    pool = TimedQueuePool(MagicMock, pool_size=1, max_overflow=0)
+    _checkout_twice(pool)
+    assert pool.recreate().wait_count == 2
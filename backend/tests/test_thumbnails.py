@@ -0,0 +1,56 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.core import thumbnails
+from app.core.media import LocalMediaStore
+
+
+@pytest.fixture
+def media_root(tmp_path, monkeypatch):
+    # Workers build their own media store from the environment they inherit
+    monkeypatch.setenv("MEDIA_ROOT", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def pool():
+    yield thumbnails._get_pool()
+    thumbnails.shutdown_pool()
+
+
+def test_pool_spawns_workers(pool):
+    assert pool._mp_context.get_start_method() == "spawn"
+
+
+def test_spawned_worker_renders_renditions(media_root, pool):
+    store = LocalMediaStore(str(media_root))
+    buf = io.BytesIO()
+    Image.new("RGB", (1600, 1200), "navy").save(buf, format="PNG")
+    key = store.put(buf.getvalue(), "image/png")
+
+    written = pool.submit(thumbnails.render_renditions, key).result(timeout=60)
+
+    assert sorted(written) == sorted(
+        thumbnails.rendition_key(key, r) for r in thumbnails.RENDITIONS
+    )
+    with Image.open(io.BytesIO(store.read(thumbnails.rendition_key(key, "thumb")))) as img:
+        assert max(img.size) == thumbnails.settings.THUMBNAIL_SIZE
+
+
+DIGEST = "ab" * 32
+
+
+@pytest.mark.parametrize("ext", ["jpg", "png", "gif", "webp"])
+def test_rendition_url_for_rendered_formats(ext):
+    url = thumbnails.rendition_url(f"/media/{DIGEST}.{ext}", "thumb")
+    assert url.endswith(f"/media/{DIGEST}-thumb.{ext}")
+
+
+@pytest.mark.parametrize(
+    "value",
+    [f"/media/{DIGEST}.heic", f"/media/{DIGEST}.bin", "data:image/png;base64,AAAA", None],
+)
+def test_no_rendition_url_when_none_is_rendered(value):
+    assert thumbnails.rendition_url(value, "thumb") is None
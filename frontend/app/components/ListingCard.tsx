@@ -11,7 +11,7 @@ interface ListingCardProps {
 export function ListingCard({ item, onPress }: ListingCardProps) {
   return (
     <TouchableOpacity style={s.listingCard} onPress={onPress} activeOpacity={0.85}>
-      <Image source={{ uri: item.image }} style={s.previewImg} />
+      <Image source={{ uri: item.thumbnail_url || item.image }} style={s.previewImg} />
       <View style={s.previewPrice}>
         <Text style={s.previewPriceText}>${item.price}</Text>
       </View>
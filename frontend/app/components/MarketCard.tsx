@@ -16,7 +16,7 @@ export function MarketCard({ item, isFav, onPress, onToggleFav }: MarketCardProp
   const router = useRouter();
   return (
     <TouchableOpacity style={s.card} onPress={onPress} activeOpacity={0.85}>
-      <Image source={{ uri: item.image }} style={s.cardImg} />
+      <Image source={{ uri: item.thumbnail_url || item.image }} style={s.cardImg} />
       <View style={s.cardInfo}>
         <View style={s.cardText}>
           <Text style={s.cardName} numberOfLines={2}>{item.name}</Text>
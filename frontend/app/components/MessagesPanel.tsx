@@ -4,7 +4,7 @@ import {
   FlatList, ActivityIndicator, Alert, KeyboardAvoidingView, Platform
 } from 'react-native';
 import { Ionicons } from '@expo/vector-icons';
-import { api, ConversationOut, MessageOut } from '../../services/api';
+import { api, ConversationOut, MessageSocketEvent, MessageOut } from '../../services/api';
 import { mainStyles as s } from '../styles/main/mainStyles';
 import { UserListItem } from './ui/UserListItem';
 import { PanelHeader } from './ui/PanelHeader';
@@ -29,11 +29,23 @@ export function MessagesPanel({
   const [inputText, setInputText] = useState('');
   
   const messagesEndRef = useRef<FlatList>(null);
+  const activeChatRef = useRef<string | null>(activeChatId);
+  activeChatRef.current = activeChatId;
 
   useEffect(() => {
     loadConversations();
   }, []);
 
+  // Live updates: new messages arrive over the WebSocket instead of polling.
+  // Anything sent while the socket was down is picked up by a refetch.
+  useEffect(() => {
+    const unsubscribe = api.messages.subscribe(onSocketMessage, () => {
+      loadConversations();
+      if (activeChatRef.current) loadMessages(activeChatRef.current);
+    });
+    return unsubscribe;
+  }, []);
+
   useEffect(() => {
     if (activeChatId) {
       loadMessages(activeChatId);
@@ -64,6 +76,21 @@ export function MessagesPanel({
     }
   };
 
+  const onSocketMessage = (event: MessageSocketEvent) => {
+    const chatId = activeChatRef.current;
+    const otherId = event.sender_id === currentUserId ? event.receiver_id : event.sender_id;
+    if (chatId && otherId === chatId) {
+      if (event.truncated) {
+        loadMessages(chatId);
+      } else {
+        const msg = event as MessageOut;
+        // Our own sends are already appended from the POST response
+        setMessages(prev => (prev.some(m => m.id === msg.id) ? prev : [...prev, msg]));
+      }
+    }
+    api.messages.list().then(setConversations).catch(() => {});
+  };
+
   const sendMessage = async () => {
     if (!inputText.trim() || !activeChatId) return;
     try {
@@ -6,6 +6,8 @@ export type RegisterData = {
   password: string
   confirmPassword: string
   address: string
+  lat?: number
+  lng?: number
   community: string 
   communityId?: string 
   bio: string
@@ -351,7 +351,7 @@ export default function CommunitiesScreen() {
                         activeOpacity={0.7}
                       >
                         {item.image ? (
-                          <Image source={{ uri: item.image }} style={s.itemResultImage} />
+                          <Image source={{ uri: item.thumbnail_url || item.image }} style={s.itemResultImage} />
                         ) : (
                           <View style={[s.itemResultImage, s.centered]}>
                             <Ionicons name="cube-outline" size={32} color="#bbb" />
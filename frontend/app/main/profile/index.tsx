@@ -32,7 +32,7 @@ async function getAuthHeaders(): Promise<Record<string, string>> {
 function ListingCard({ item, onPress }: { item: ItemOut; onPress: () => void }) {
   return (
     <TouchableOpacity style={s.listingCard} onPress={onPress} activeOpacity={0.85}>
-      <Image source={{ uri: item.image }} style={s.previewImg} />
+      <Image source={{ uri: item.thumbnail_url || item.image }} style={s.previewImg} />
       <View style={s.previewPrice}>
         <Text style={s.previewPriceText}>${item.price}</Text>
       </View>
@@ -89,6 +89,7 @@ export default function SettingsScreen() {
   const [addrSearched, setAddrSearched]         = useState(false);
   const [lakeOptions, setLakeOptions]           = useState<LakeOption[]>([]);
   const [pendingCommunity, setPendingCommunity] = useState<LakeOption | null>(null);
+  const [addrLocation, setAddrLocation] = useState<{ lat: number; lng: number } | null>(null);
   const debounceRef = useRef<ReturnType<typeof setTimeout> | null>(null);
 
   // ─── Fetch profile from backend ───────────────────────────────────────────
@@ -198,6 +199,8 @@ export default function SettingsScreen() {
           address:      fullAddress,
           community:    pendingCommunity.name,
           community_id: pendingCommunity.id ?? undefined,
+          lat:          addrLocation?.lat,
+          lng:          addrLocation?.lng,
         }),
       });
       if (!res.ok) throw new Error(`HTTP ${res.status}`);
@@ -225,6 +228,7 @@ export default function SettingsScreen() {
     setLakeOptions([]);
     setAddrSearched(false);
     setPendingCommunity(null);
+    setAddrLocation(null);
   }
 
   function handleAddressInput(text: string) {
@@ -270,6 +274,7 @@ export default function SettingsScreen() {
       setPendingCommunity(null);
 
       const { lat, lng } = json.result.geometry.location;
+      setAddrLocation({ lat, lng });
       findNearbyLakes(lat, lng);
     } catch (err) {
     }
@@ -283,19 +288,12 @@ export default function SettingsScreen() {
       const placesRes  = await fetch(`${API_URL}/maps/nearby-lakes?lat=${lat}&lng=${lng}`);
       const placesData = await placesRes.json();
       const rawResults = (placesData.results ?? []).slice(0, 5);
-      const lakeNames: string[] = rawResults.map((l: any) => l.name);
 
-      if (!lakeNames.length) { setAddrSearched(true); return; }
-
-      const { data: existingCommunities } = await supabase
-        .from('communities')
-        .select('id, name')
-        .in('name', lakeNames);
-
-      const merged: LakeOption[] = rawResults.map((lake: any) => {
-        const existing = existingCommunities?.find((c) => c.name === lake.name);
-        return { name: lake.name, id: existing?.id ?? null };
-      });
+      // The API links each lake to its existing community, if there is one
+      const merged: LakeOption[] = rawResults.map((lake: any) => ({
+        name: lake.community_name ?? lake.name,
+        id: lake.community_id ?? null,
+      }));
 
       setLakeOptions(merged);
     } catch (err) {
@@ -62,6 +62,8 @@ function RegisterContent() {
           password: data.password,
           username: data.name,
           address: data.address,
+          lat: data.lat,
+          lng: data.lng,
           community: data.community,
           bio: data.bio,
           profile_image_url: data.profileImageUrl,
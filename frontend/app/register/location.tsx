@@ -125,6 +125,8 @@ export default function LocationStep() {
       checkAddressUniqueness(computedAddress)
 
       const { lat, lng } = json.result.geometry.location
+      updateField("lat", lat)
+      updateField("lng", lng)
       findNearbyLakes(lat, lng)
     } catch (err) {
     }
@@ -137,26 +139,12 @@ export default function LocationStep() {
       const placesRes = await fetch(`${API_URL}/maps/nearby-lakes?lat=${lat}&lng=${lng}`)
       const placesData = await placesRes.json()
       const rawResults = (placesData.results || []).slice(0, 5)
-      const lakeNames: string[] = rawResults.map((lake: any) => lake.name)
 
-      if (!lakeNames.length) {
-        setLakeOptions([])
-        setSearched(true)
-        return
-      }
-
-      const { data: existingCommunities } = await supabase
-        .from("communities")
-        .select("id, name")
-        .in("name", lakeNames)
-
-      const merged: LakeOption[] = rawResults.map((lake: any) => {
-        const existing = existingCommunities?.find((c) => c.name === lake.name)
-        return {
-          name: lake.name,
-          id: existing?.id ?? null,
-        }
-      })
+      // The API links each lake to its existing community, if there is one
+      const merged: LakeOption[] = rawResults.map((lake: any) => ({
+        name: lake.community_name ?? lake.name,
+        id: lake.community_id ?? null,
+      }))
 
       setLakeOptions(merged)
     } catch (err) {
@@ -25,7 +25,9 @@ export interface ItemOut {
   price: string;
   description: string;
   category: string;
-  image: string; // base64 data-URI
+  image: string; // /media URL (base64 data-URI on upload)
+  thumbnail_url?: string;
+  medium_url?: string;
   owner_id: string;
   owner_username: string;
   owner_is_business?: boolean;
@@ -41,6 +43,7 @@ export interface SearchItemResult {
   description: string;
   category: string;
   image: string;
+  thumbnail_url?: string;
   owner_id: string;
   owner_username: string;
   owner_is_business?: boolean;
@@ -66,6 +69,12 @@ export interface SearchCommunityResult {
   member_count: number;
 }
 
+export interface NearbyCommunity extends SearchCommunityResult {
+  lat: number;
+  lng: number;
+  distance_km: number;
+}
+
 export interface AdOut {
   id: string;
   title: string;
@@ -120,6 +129,125 @@ async function request<T>(
   return json as T;
 }
 
+// ── Realtime ──────────────────────────────────────────────────────────────────
+// Pushed by WS /ws/messages for every message the user sends or receives.
+// `truncated` events omit the content; refetch the conversation instead.
+export interface MessageSocketEvent extends Partial<MessageOut> {
+  type: 'message';
+  id: string;
+  sender_id: string;
+  receiver_id: string;
+  truncated?: boolean;
+}
+
+// The access token is sent as the first frame rather than in the URL, where
+// it would be logged; the server answers {type: 'ready'} once it verifies,
+// and closes the socket when the token expires.
+// The socket reconnects on its own after a drop, waiting 1s, 2s, 4s, ... up
+// to 30s between attempts (reset once the server is ready). Messages sent
+// while it was down are not replayed: onReconnect is the cue to refetch.
+// Call the returned function to close the socket and stop reconnecting.
+const SOCKET_RETRY_MIN_MS = 1000;
+const SOCKET_RETRY_MAX_MS = 30000;
+
+function subscribeToMessages(
+  onMessage: (event: MessageSocketEvent) => void,
+  onReconnect?: () => void,
+): () => void {
+  let ws: WebSocket | null = null;
+  let retryTimer: ReturnType<typeof setTimeout> | null = null;
+  let retryMs = SOCKET_RETRY_MIN_MS;
+  let dropped = false;
+  let stopped = false;
+
+  const retry = () => {
+    if (stopped) return;
+    retryTimer = setTimeout(connect, retryMs);
+    retryMs = Math.min(retryMs * 2, SOCKET_RETRY_MAX_MS);
+  };
+
+  async function connect() {
+    retryTimer = null;
+    // Fetched on every attempt so a refreshed access token is used
+    const { data } = await supabase.auth.getSession().catch(() => ({ data: { session: null } }));
+    const token = data.session?.access_token;
+    if (stopped) return;
+    if (!token) {
+      retry();
+      return;
+    }
+
+    const socket = new WebSocket(`${BASE_URL.replace(/^http/, 'ws')}/ws/messages`);
+    ws = socket;
+    socket.onopen = () => socket.send(JSON.stringify({ type: 'auth', token }));
+    socket.onmessage = (e) => {
+      const event = JSON.parse(e.data);
+      if (event.type === 'ready') {
+        retryMs = SOCKET_RETRY_MIN_MS;
+        if (dropped) onReconnect?.();
+        return;
+      }
+      onMessage(event);
+    };
+    socket.onclose = (e) => {
+      // Expiry is routine: reconnect after the shortest wait, with a fresh token
+      if (e.reason === 'token expired') retryMs = SOCKET_RETRY_MIN_MS;
+      ws = null;
+      dropped = true;
+      retry();
+    };
+  }
+
+  connect();
+  return () => {
+    stopped = true;
+    if (retryTimer) clearTimeout(retryTimer);
+    ws?.close();
+  };
+}
+
+// ── Connection status batching ────────────────────────────────────────────────
+// Lists of user cards each render a ConnectButton that asks for its status.
+// Lookups made in the same tick are collected and sent as one
+// POST /connections/status call (chunked to the server's 200-id limit).
+type StatusWaiter = {
+  resolve: (r: { status: ConnectionStatus }) => void;
+  reject: (e: unknown) => void;
+};
+const STATUS_BATCH_LIMIT = 200;
+let pendingStatus: Map<string, StatusWaiter[]> | null = null;
+
+function connectionStatus(userId: string): Promise<{ status: ConnectionStatus }> {
+  return new Promise((resolve, reject) => {
+    if (!pendingStatus) {
+      pendingStatus = new Map();
+      setTimeout(flushConnectionStatus, 0);
+    }
+    const waiters = pendingStatus.get(userId) ?? [];
+    waiters.push({ resolve, reject });
+    pendingStatus.set(userId, waiters);
+  });
+}
+
+async function flushConnectionStatus() {
+  const batch = pendingStatus!;
+  pendingStatus = null;
+  const ids = [...batch.keys()];
+  for (let i = 0; i < ids.length; i += STATUS_BATCH_LIMIT) {
+    const chunk = ids.slice(i, i + STATUS_BATCH_LIMIT);
+    try {
+      const { statuses } = await request<{ statuses: Record<string, ConnectionStatus> }>(
+        'POST', '/connections/status', { user_ids: chunk },
+      );
+      chunk.forEach(id =>
+        batch.get(id)!.forEach(w => w.resolve({ status: statuses[id] ?? 'none' })),
+      );
+    } catch (e) {
+      chunk.forEach(id => batch.get(id)!.forEach(w => w.reject(e)));
+    }
+  }
+}
+
 // ── Public API ────────────────────────────────────────────────────────────────
 export const api = {
   get: <T>(path: string) => request<T>('GET', path),
@@ -128,10 +256,12 @@ export const api = {
   patch: <T>(path: string, body: unknown) => request<T>('PATCH', path, body),
   // Search endpoints
   search: {
-    items: (q: string, communityId?: string, limit?: number) => {
+    // radiusKm: only items whose owner lives within that distance of the caller
+    items: (q: string, communityId?: string, limit?: number, radiusKm?: number) => {
       let path = `/search/items?q=${encodeURIComponent(q)}`;
       if (communityId) path += `&community_id=${communityId}`;
       if (limit) path += `&limit=${limit}`;
+      if (radiusKm) path += `&radius_km=${radiusKm}`;
       return request<SearchItemResult[]>('GET', path);
     },
     users: (q: string, communityId?: string, limit?: number) => {
@@ -153,8 +283,11 @@ export const api = {
         api.get<ConnectionProfile[]>(`/connections${q ? `?q=${encodeURIComponent(q)}` : ''}`),
       requests:   () =>
         api.get<ConnectionProfile[]>('/connections/requests'),
-      status:     (userId: string) =>
-        api.get<{ status: ConnectionStatus }>(`/connections/status/${userId}`),
+      suggestions: (limit?: number) =>
+        api.get<ConnectionSuggestion[]>(`/connections/suggestions${limit ? `?limit=${limit}` : ''}`),
+      mutual:     (userId: string) =>
+        api.get<ConnectionProfile[]>(`/connections/mutual/${userId}`),
+      status:     (userId: string) => connectionStatus(userId),
       send:       (userId: string) =>
         api.post<{ status: string }>(`/connections/${userId}`, {}),
       respond: (userId: string, action: 'accept' | 'decline') =>
@@ -166,6 +299,21 @@ export const api = {
       list: () => api.get<ConversationOut[]>('/messages'),
       get: (userId: string) => api.get<MessageOut[]>(`/messages/${userId}`),
       send: (userId: string, content: string) => api.post<MessageOut>(`/messages/${userId}`, { content }),
+      subscribe: subscribeToMessages,
+    },
+    communities: {
+      // Defaults to the caller's saved address when lat/lng are omitted
+      nearby: (opts: { lat?: number; lng?: number; radiusKm?: number; limit?: number } = {}) => {
+        const params = new URLSearchParams();
+        if (opts.lat !== undefined && opts.lng !== undefined) {
+          params.set('lat', String(opts.lat));
+          params.set('lng', String(opts.lng));
+        }
+        if (opts.radiusKm) params.set('radius_km', String(opts.radiusKm));
+        if (opts.limit) params.set('limit', String(opts.limit));
+        const qs = params.toString();
+        return api.get<NearbyCommunity[]>(`/communities/nearby${qs ? `?${qs}` : ''}`);
+      },
     },
     ads: {
       submit: (body: { title: string; body: string; ad_type?: string; image?: string; link_url?: string }) =>
@@ -188,6 +336,7 @@ export interface ConversationOut {
   other_user_id: string;
   other_username: string;
   profile_image_url: string;
+  unread_count: number;
   latest_message: MessageOut;
 }
 
@@ -201,6 +350,10 @@ export interface ConnectionProfile {
   business_name?: string;
 }
 
+export interface ConnectionSuggestion extends ConnectionProfile {
+  mutual_count: number;
+}
+
 export type ConnectionStatus = 
   | 'none' 
   | 'pending_sent' 